@@ -0,0 +1,20 @@
+// api/_lib/pages.js
+// The extractor can store a chapter's pages as a URL template instead of a
+// list (SUPABASE_COMPACT_PAGES=1, see extractor/shared/pages.py):
+//
+//   { t: [before, after], w: width, r: [first, count] }   or   { ..., i: [n, ...] }
+//
+// expandPages turns either form back into the plain list of URLs.
+
+export function expandPages(pages) {
+    if (!pages || Array.isArray(pages) || typeof pages !== 'object') return pages;
+
+    const [before, after] = pages.t;
+    const width = pages.w || 0;
+    let indices = pages.i;
+    if (pages.r) {
+        const [first, count] = pages.r;
+        indices = Array.from({ length: count }, (_, n) => first + n);
+    }
+    return indices.map(i => before + String(i).padStart(width, '0') + after);
+}
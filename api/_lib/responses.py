@@ -0,0 +1,154 @@
+# api/_lib/responses.py
+# Shared JSON response helper for the Python serverless functions in api/.
+# Lives under an underscore directory so Vercel doesn't deploy it as its own
+# function.
+from __future__ import annotations
+import os
+import json
+import gzip
+import hashlib
+from http.server import BaseHTTPRequestHandler
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Per-endpoint Cache-Control policies. Chapter page lists never change once a
+# chapter is published, so they can sit in every cache forever. Manga info and
+# search change whenever a new chapter drops, so the edge holds them briefly
+# (s-maxage) and keeps serving the stale copy while it refreshes in the
+# background. max-age=0 keeps the app itself revalidating via ETag.
+CACHE_POLICIES = {
+    "chapter_pages": "public, max-age=31536000, immutable",
+    "manga": "public, max-age=0, s-maxage=300, stale-while-revalidate=3600",
+    "search": "public, max-age=0, s-maxage=120, stale-while-revalidate=600",
+}
+NO_STORE = "no-store"
+
+# Bodies smaller than this aren't worth the CPU — headers alone are ~300 bytes.
+COMPRESS_MIN_BYTES = 1024
+# Preference order when the client accepts several encodings equally.
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli else ("gzip",)
+ETAG_SUFFIXES = {"br": "-br", "gzip": "-gz"}
+
+
+def etag_for(body: bytes) -> str:
+    """Strong validator derived from the response body."""
+    return '"' + hashlib.blake2b(body, digest_size=16).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """
+    RFC 9110 weak comparison of an If-None-Match header against etag.
+    etag carries its encoding suffix, so a validator only matches the
+    representation it was issued for: a client holding the gzip variant that
+    now asks for identity gets the full body, not a 304 for bytes it can't use.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+def negotiate_encoding(accept_encoding: str | None) -> str | None:
+    """Pick the best supported content-coding from an Accept-Encoding header."""
+    if not accept_encoding:
+        return None
+    weights = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                q = 0.0
+        weights[name] = q
+    best, best_q = None, 0.0
+    for enc in SUPPORTED_ENCODINGS:
+        q = weights.get(enc, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = enc, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=5)
+    return gzip.compress(body, compresslevel=6)
+
+
+def compact_urls(urls: list[str]) -> dict:
+    """
+    Shrink a list of page URLs to their shared prefix plus per-page suffixes,
+    e.g. {"prefix": "https://cdn/.../", "pages": ["1.jpg", "2.jpg"]}.
+    The prefix is cut back to the last "/" so suffixes stay readable.
+    """
+    prefix = os.path.commonprefix(urls) if len(urls) > 1 else ""
+    prefix = prefix[:prefix.rfind("/") + 1]
+    return {"prefix": prefix, "pages": [u[len(prefix):] for u in urls]}
+
+
+def send_json(handler: BaseHTTPRequestHandler, status: int, payload, cache: str | None = None) -> None:
+    """
+    Serialize payload and write it to handler with CORS + caching headers.
+    Successful responses get the endpoint's cache policy and an ETag, and a
+    matching If-None-Match short-circuits to an empty 304. Errors are never
+    cached. Large bodies are gzip/brotli compressed per Accept-Encoding.
+    """
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    cache_control = CACHE_POLICIES.get(cache, NO_STORE) if status == 200 else NO_STORE
+
+    encoding = None
+    if len(body) >= COMPRESS_MIN_BYTES:
+        encoding = negotiate_encoding(handler.headers.get("Accept-Encoding"))
+
+    etag = None
+    if status == 200 and cache_control != NO_STORE:
+        etag = etag_for(body)
+        if encoding:
+            etag = etag[:-1] + ETAG_SUFFIXES[encoding] + '"'
+        if etag_matches(handler.headers.get("If-None-Match"), etag):
+            handler.send_response(304)
+            handler.send_header('ETag', etag)
+            handler.send_header('Cache-Control', cache_control)
+            handler.send_header('Vary', 'Accept-Encoding')
+            handler.send_header('Access-Control-Allow-Origin', '*')
+            handler.end_headers()
+            return
+
+    if encoding:
+        body = compress(body, encoding)
+
+    handler.send_response(status)
+    handler.send_header('Content-Type', 'application/json')
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.send_header('Access-Control-Expose-Headers', 'ETag')
+    handler.send_header('Cache-Control', cache_control)
+    handler.send_header('Vary', 'Accept-Encoding')
+    if encoding:
+        handler.send_header('Content-Encoding', encoding)
+    if etag:
+        handler.send_header('ETag', etag)
+    handler.send_header('Content-Length', str(len(body)))
+    handler.end_headers()
+    handler.wfile.write(body)
+
+
+def send_options(handler: BaseHTTPRequestHandler) -> None:
+    handler.send_response(200)
+    handler.send_header('Access-Control-Allow-Origin', '*')
+    handler.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+    handler.send_header('Access-Control-Allow-Headers', 'Content-Type, If-None-Match')
+    handler.send_header('Access-Control-Max-Age', '86400')
+    handler.end_headers()
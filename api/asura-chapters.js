@@ -4,6 +4,7 @@
 //
 
 import { createClient } from '@supabase/supabase-js';
+import { expandPages } from './_lib/pages.js';
 
 const supabase = createClient(
     process.env.SUPABASE_URL,
@@ -33,7 +34,7 @@ export default async function handler(req, res) {
                 return res.status(404).json({ error: `Chapter ${chapterId} not found` });
             }
 
-            return res.status(200).json({ pages: data.pages });
+            return res.status(200).json({ pages: expandPages(data.pages) });
         }
 
         // ── Chapter list for a series ─────────────────────────────────────────
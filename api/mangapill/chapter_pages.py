@@ -2,12 +2,12 @@
 from __future__ import annotations
 import sys
 import os
-import json
 from urllib.parse import urlparse, parse_qs, unquote
 from http.server import BaseHTTPRequestHandler
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..'))
 from scrapers.mangapill_scraper import MangapillScraper
+from api._lib.responses import send_json, send_options, compact_urls
 
 scraper = MangapillScraper()
 
@@ -16,45 +16,22 @@ class handler(BaseHTTPRequestHandler):
         parsed = urlparse(self.path)
         params = parse_qs(parsed.query)
         url = unquote(params.get('url', [''])[0])
+        # compact=1 returns {"prefix": ..., "pages": [suffix, ...]} instead of
+        # a flat list of full URLs.
+        compact = params.get('compact', ['0'])[0] in ('1', 'true')
 
         if not url:
-            body = json.dumps({'error': 'url parameter required'}).encode()
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            send_json(self, 400, {'error': 'url parameter required'})
             return
 
         try:
             pages = scraper.get_chapter_pages(url)
             if not pages:
-                body = json.dumps({'error': 'No pages found'}).encode()
-                self.send_response(404)
-                self.send_header('Content-Type', 'application/json')
-                self.send_header('Content-Length', str(len(body)))
-                self.end_headers()
-                self.wfile.write(body)
+                send_json(self, 404, {'error': 'No pages found'})
                 return
-            body = json.dumps(pages).encode()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            send_json(self, 200, compact_urls(pages) if compact else pages, cache='chapter_pages')
         except Exception as e:
-            body = json.dumps({'error': str(e)}).encode()
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            send_json(self, 500, {'error': str(e)})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
\ No newline at end of file
+        send_options(self)
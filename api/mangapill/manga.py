@@ -2,12 +2,13 @@
 from __future__ import annotations
 import sys
 import os
-import json
+import math
 from urllib.parse import urlparse, parse_qs, unquote
 from http.server import BaseHTTPRequestHandler
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..'))
 from scrapers.mangapill_scraper import MangapillScraper
+from api._lib.responses import send_json, send_options
 
 scraper = MangapillScraper()
 
@@ -18,35 +19,28 @@ class handler(BaseHTTPRequestHandler):
         url = unquote(params.get('url', [''])[0])
 
         if not url:
-            body = json.dumps({'error': 'url parameter required'}).encode()
-            self.send_response(400)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            send_json(self, 400, {'error': 'url parameter required'})
             return
 
+        # Optional incremental/paged chapter list, e.g. ?since=1090 for the
+        # update badge or ?offset=0&limit=50 for lazy list rendering.
         try:
-            result = scraper.get_manga(url)
-            body = json.dumps(result).encode()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            since = params.get('since', [None])[0]
+            since = float(since) if since not in (None, '') else None
+            limit = params.get('limit', [None])[0]
+            limit = int(limit) if limit not in (None, '') else None
+            offset = int(params.get('offset', ['0'])[0] or 0)
+            if since is not None and not math.isfinite(since):
+                raise ValueError(since)
+        except ValueError:
+            send_json(self, 400, {'error': 'since, limit and offset must be finite numbers'})
+            return
+
+        try:
+            result = scraper.get_manga(url, since=since, limit=limit, offset=offset)
+            send_json(self, 200, result, cache='manga')
         except Exception as e:
-            body = json.dumps({'error': str(e)}).encode()
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            send_json(self, 500, {'error': str(e)})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
\ No newline at end of file
+        send_options(self)
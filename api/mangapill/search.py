@@ -3,12 +3,12 @@
 from __future__ import annotations
 import sys
 import os
-import json
 from urllib.parse import urlparse, parse_qs
 from http.server import BaseHTTPRequestHandler
 
 sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '..'))
 from scrapers.mangapill_scraper import MangapillScraper
+from api._lib.responses import send_json, send_options
 
 scraper = MangapillScraper()
 
@@ -21,25 +21,9 @@ class handler(BaseHTTPRequestHandler):
 
         try:
             results = scraper.search(q, limit)
-            body = json.dumps(results).encode()
-            self.send_response(200)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            send_json(self, 200, results, cache='search')
         except Exception as e:
-            body = json.dumps({'error': str(e)}).encode()
-            self.send_response(500)
-            self.send_header('Content-Type', 'application/json')
-            self.send_header('Access-Control-Allow-Origin', '*')
-            self.send_header('Content-Length', str(len(body)))
-            self.end_headers()
-            self.wfile.write(body)
+            send_json(self, 500, {'error': str(e)})
 
     def do_OPTIONS(self):
-        self.send_response(200)
-        self.send_header('Access-Control-Allow-Origin', '*')
-        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
-        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
-        self.end_headers()
\ No newline at end of file
+        send_options(self)
@@ -3,6 +3,7 @@
 // Filters out junk URLs (credits image, gifs) before returning pages.
 
 import { createClient } from '@supabase/supabase-js';
+import { expandPages } from './_lib/pages.js';
 
 const supabase = createClient(
     process.env.SUPABASE_URL,
@@ -52,7 +53,7 @@ export default async function handler(req, res) {
             }
 
             // Filter junk pages before returning
-            const pages = filterPages(data.pages);
+            const pages = filterPages(expandPages(data.pages));
             return res.status(200).json({ pages });
         }
 
@@ -0,0 +1,100 @@
+# bench/cases.py
+# What the recorder fetches and the benchmark replays: one entry per source,
+# each a list of (method, args) calls against that source's scraper class.
+# Edit the sample ids here when a title disappears upstream, then re-record.
+from __future__ import annotations
+import os
+import sys
+import importlib
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+MANGA_SCRAPERS = os.path.join(ROOT, "manga-scrapers")
+
+# source name -> (module path, class name)
+SOURCES = {
+    "mangapill": ("scrapers.mangapill_scraper", "MangapillScraper"),
+    "asura": ("scrapers.asura_scraper", "AsuraComic"),
+    "src.manganato": ("src.manganato", "Manganato"),
+    "src.mangareader": ("src.mangareader", "Mangareader"),
+    "src.mangapill": ("src.mangapill", "Mangapill"),
+    "src.asurascans": ("src.asurascans", "Asurascans"),
+    "src.flamescans": ("src.flamescans", "Flamescans"),
+    "src.mangaworld": ("src.mangaworld", "Mangaworld"),
+    "src.mangapark": ("src.mangapark", "Mangapark"),
+    "src.scanvf": ("src.scanvf", "Scanvf"),
+}
+
+CASES = {
+    "mangapill": [
+        ("search", ("one piece", 20)),
+        ("get_manga", ("https://mangapill.com/manga/2/one-piece",)),
+        ("get_chapter_pages", ("https://mangapill.com/chapters/2-11000000/one-piece-chapter-1000",)),
+    ],
+    "asura": [
+        ("info", ("solo-leveling",)),
+        ("pages", ("solo-leveling", "1")),
+    ],
+    "src.manganato": [
+        ("search", ("solo_leveling",)),
+        ("info", ("manga-dr980474",)),
+        ("pages", ("manga-dr980474/chapter-1",)),
+        ("latest", ("1",)),
+        ("newest", ("1",)),
+        ("hotest", ("1",)),
+    ],
+    "src.mangareader": [
+        ("search", ("one piece",)),
+        ("info", ("one-piece-3",)),
+        ("pages", ("chapter/one-piece-3/chapter-1",)),
+        ("latest", ("Action",)),
+    ],
+    "src.mangapill": [
+        ("search", ("one piece",)),
+        ("info", ("manga/2/one-piece",)),
+        ("pages", ("chapters/2-10001000/one-piece-chapter-1",)),
+        ("recent", ()),
+    ],
+    "src.asurascans": [
+        ("search", ("solo",)),
+        ("info", ("solo-leveling",)),
+        ("pages", ("solo-leveling-chapter-1",)),
+        ("popular", ()),
+        ("latest", ("1",)),
+        ("genres", ("action",)),
+    ],
+    "src.flamescans": [
+        ("search", ("omniscient",)),
+        ("info", ("omniscient-readers-viewpoint",)),
+        ("pages", ("omniscient-readers-viewpoint-chapter-1",)),
+        ("sort", ("popular",)),
+    ],
+    "src.mangaworld": [
+        ("search", ("one piece",)),
+        ("info", ("manga/1704/one-piece",)),
+        ("pages", ("manga/1704/one-piece/read/5fa5a9b07d5fb63b8c2cc5c6",)),
+        ("trending", ()),
+        ("popular", ("1",)),
+    ],
+    "src.mangapark": [
+        ("search", ("one piece",)),
+        ("info", ("11432-en-one-piece",)),
+        ("pages", ("11432-en-one-piece/2912937-vol-1-ch-1",)),
+        ("latest", ("1",)),
+    ],
+    "src.scanvf": [
+        ("search", ("one piece",)),
+        ("info", ("one-piece",)),
+        ("pages", ("one_piece_chapitre_1",)),
+    ],
+}
+
+
+def load_source(name: str):
+    """Import a source module and return a fresh instance of its scraper class."""
+    if ROOT not in sys.path:
+        sys.path.insert(0, ROOT)
+    if MANGA_SCRAPERS not in sys.path:
+        sys.path.insert(0, MANGA_SCRAPERS)
+    module_path, class_name = SOURCES[name]
+    module = importlib.import_module(module_path)
+    return getattr(module, class_name)()
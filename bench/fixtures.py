@@ -0,0 +1,233 @@
+# bench/fixtures.py
+# Recorded HTTP responses for the offline scraper benchmarks.
+#
+# Recording and replay both hook the HTTP client at its transport layer
+# (requests.Session.send, httpx.Client.send), so every scraper is covered
+# without touching its code, whichever client it happens to use.
+#   - record: let the real request through, save the response body
+#   - replay: rewrite the request to hit a local StubServer, which serves the
+#     recorded body for the original URL
+#   - serve:  answer the request from the FixtureStore in memory, so timing a
+#     call measures the scraper's own work (parsing) and no I/O
+#
+# The fixtures committed under bench/fixtures/ are synthetic pages shaped like
+# each site's markup (sized like a real listing, series or chapter), so the
+# suite runs offline; `python -m bench.record` replaces them with live pages.
+from __future__ import annotations
+import os
+import json
+import hashlib
+import threading
+import contextlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs, quote
+
+import httpx
+import requests
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+class FixtureStore:
+    """
+    One directory per source:
+        fixtures/<source>/index.json   { url: {"file", "status", "content_type"} }
+        fixtures/<source>/<sha1>.html  raw response body
+    """
+
+    def __init__(self, root: str = FIXTURES_DIR) -> None:
+        self.root = root
+        self._index: dict[str, dict] = {}   # url -> entry incl. "path"
+        self._lock = threading.Lock()
+
+    def _source_dir(self, source: str) -> str:
+        return os.path.join(self.root, source.replace("/", "_"))
+
+    def save(self, source: str, url: str, status: int, content_type: str, body: bytes) -> None:
+        folder = self._source_dir(source)
+        os.makedirs(folder, exist_ok=True)
+        name = hashlib.sha1(url.encode()).hexdigest()[:16] + ".html"
+        with open(os.path.join(folder, name), "wb") as f:
+            f.write(body)
+
+        with self._lock:
+            index_path = os.path.join(folder, "index.json")
+            index = {}
+            if os.path.exists(index_path):
+                with open(index_path, "r", encoding="utf-8") as f:
+                    index = json.load(f)
+            index[url] = {"file": name, "status": status, "content_type": content_type}
+            with open(index_path, "w", encoding="utf-8") as f:
+                json.dump(index, f, indent=2, sort_keys=True)
+
+    def load(self) -> int:
+        """Read every source index into memory. Returns the number of URLs."""
+        self._index = {}
+        if not os.path.isdir(self.root):
+            return 0
+        for source in os.listdir(self.root):
+            index_path = os.path.join(self.root, source, "index.json")
+            if not os.path.exists(index_path):
+                continue
+            with open(index_path, "r", encoding="utf-8") as f:
+                for url, entry in json.load(f).items():
+                    self._index[url] = {**entry, "path": os.path.join(self.root, source, entry["file"])}
+        return len(self._index)
+
+    def get(self, url: str):
+        """Returns (status, content_type, body) or None if the URL wasn't recorded."""
+        entry = self._index.get(url)
+        if not entry:
+            return None
+        with open(entry["path"], "rb") as f:
+            return entry["status"], entry["content_type"], f.read()
+
+
+# ── Stub upstream ─────────────────────────────────────────────────────────────
+
+class StubServer:
+    """
+    Local HTTP server answering GET /replay?url=<original url> from a
+    FixtureStore. Bodies are read once up front so replay cost is just the
+    loopback round-trip.
+    """
+
+    def __init__(self, store: FixtureStore, host: str = "127.0.0.1", port: int = 0) -> None:
+        cache = {}
+        for url in list(store._index):
+            cache[url] = store.get(url)
+        misses = self.misses = set()
+
+        class _Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                params = parse_qs(urlparse(self.path).query)
+                hit = cache.get(params.get("url", [""])[0])
+                if hit is None:
+                    misses.add(params.get("url", [""])[0])
+                    status, content_type, body = 404, "text/plain", b"fixture not recorded"
+                else:
+                    status, content_type, body = hit
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer((host, port), _Handler)
+        self.server.daemon_threads = True
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def replay_url(self, url: str) -> str:
+        return f"{self.base_url}/replay?url={quote(url, safe='')}"
+
+    def __enter__(self) -> "StubServer":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
+
+
+# ── Transport hooks ───────────────────────────────────────────────────────────
+
+@contextlib.contextmanager
+def recording(store: FixtureStore, source: str):
+    """Save every response fetched through requests/httpx while active."""
+    real_requests_send = requests.Session.send
+    real_httpx_send = httpx.Client.send
+
+    def requests_send(session, request, **kwargs):
+        response = real_requests_send(session, request, **kwargs)
+        store.save(source, request.url, response.status_code,
+                   response.headers.get("content-type", "text/html"), response.content)
+        return response
+
+    def httpx_send(client, request, **kwargs):
+        response = real_httpx_send(client, request, **kwargs)
+        response.read()
+        store.save(source, str(request.url), response.status_code,
+                   response.headers.get("content-type", "text/html"), response.content)
+        return response
+
+    requests.Session.send = requests_send
+    httpx.Client.send = httpx_send
+    try:
+        yield
+    finally:
+        requests.Session.send = real_requests_send
+        httpx.Client.send = real_httpx_send
+
+
+@contextlib.contextmanager
+def replaying(stub: StubServer):
+    """Redirect every requests/httpx call to stub while active."""
+    real_requests_send = requests.Session.send
+    real_httpx_send = httpx.Client.send
+
+    def requests_send(session, request, **kwargs):
+        request.url = stub.replay_url(request.url)
+        kwargs["allow_redirects"] = False
+        return real_requests_send(session, request, **kwargs)
+
+    def httpx_send(client, request, **kwargs):
+        request.url = httpx.URL(stub.replay_url(str(request.url)))
+        request.headers["Host"] = request.url.netloc.decode()
+        return real_httpx_send(client, request, **kwargs)
+
+    requests.Session.send = requests_send
+    httpx.Client.send = httpx_send
+    try:
+        yield
+    finally:
+        requests.Session.send = real_requests_send
+        httpx.Client.send = real_httpx_send
+
+
+@contextlib.contextmanager
+def serving(store: FixtureStore):
+    """
+    Answer every requests/httpx call from `store` while active, without a
+    socket. Yields the set of URLs that weren't recorded (answered 404).
+    """
+    cache = {url: store.get(url) for url in list(store._index)}
+    misses = set()
+    real_requests_send = requests.Session.send
+    real_httpx_send = httpx.Client.send
+
+    def lookup(url):
+        hit = cache.get(url)
+        if hit is None:
+            misses.add(url)
+            return 404, "text/plain", b"fixture not recorded"
+        return hit
+
+    def requests_send(session, request, **kwargs):
+        status, content_type, body = lookup(request.url)
+        response = requests.Response()
+        response.status_code = status
+        response.headers["Content-Type"] = content_type
+        response._content = body
+        response.url = request.url
+        response.request = request
+        return response
+
+    def httpx_send(client, request, **kwargs):
+        status, content_type, body = lookup(str(request.url))
+        return httpx.Response(status, headers={"Content-Type": content_type}, content=body, request=request)
+
+    requests.Session.send = requests_send
+    httpx.Client.send = httpx_send
+    try:
+        yield misses
+    finally:
+        requests.Session.send = real_requests_send
+        httpx.Client.send = real_httpx_send
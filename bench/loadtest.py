@@ -0,0 +1,213 @@
+#!/usr/bin/env python3
+"""
+Load test for the manga-scrapers API against a local stub upstream.
+
+Starts a stub "proxy" that answers every request with a small Mangapill search
+page after a fixed delay (standing in for the real sup-proxy round-trip), then runs
+the same request mix against two apps:
+  - before: the sync `def` route + blocking requests session, served from
+    FastAPI's threadpool (how api/main.py worked before the async rewrite)
+  - after:  api/main.py as it is now
+
+The default 2 s delay is roughly what a scrape through the proxy costs. With
+little latency both apps are simply CPU bound on bs4 and the comparison says
+nothing.
+
+Usage:
+    python -m bench.loadtest                         # 600 requests, 200 concurrent
+    python -m bench.loadtest -n 5000 -c 500 --latency 0.5 --cards 10
+"""
+from __future__ import annotations
+import os
+import sys
+import time
+import asyncio
+import argparse
+import statistics
+import subprocess
+import threading
+
+import httpx
+
+from bench.cases import ROOT, MANGA_SCRAPERS
+
+ENDPOINT = "/mangapill/search/one%20piece"
+
+_CARD = (
+    '<div><a class="relative block" href="/manga/{i}/title-{i}"><figure><img data-src="https://cdn/{i}.jpg"></figure></a>'
+    '<div class="mt-3 font-black leading-tight line-clamp-2">Title {i}</div>'
+    '<div class="line-clamp-2 text-xs text-secondary mt-1">Alt {i}</div>'
+    '<div class="flex flex-wrap gap-1 mt-1"><div>manga</div><div>2001</div><div>publishing</div></div></div>'
+)
+
+
+def search_page(cards: int) -> bytes:
+    return (
+        '<html><body><div class="container py-3"><div class="my-3 grid justify-end gap-3 grid-cols-2">'
+        + "".join(_CARD.format(i=i) for i in range(cards))
+        + "</div></div></body></html>"
+    ).encode()
+
+
+# ── Stub upstream ─────────────────────────────────────────────────────────────
+
+def start_stub(latency: float, cards: int) -> int:
+    """Run an asyncio HTTP stub in a background thread; returns its port."""
+    page = search_page(cards)
+    ready = threading.Event()
+    port = []
+
+    async def handle(reader, writer):
+        try:
+            while True:
+                head = await reader.readuntil(b"\r\n\r\n")
+                if not head:
+                    break
+                await asyncio.sleep(latency)
+                writer.write(
+                    b"HTTP/1.1 200 OK\r\nContent-Type: text/html\r\n"
+                    + f"Content-Length: {len(page)}\r\n\r\n".encode()
+                    + page
+                )
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def serve():
+        server = await asyncio.start_server(handle, "127.0.0.1", 0, backlog=2048)
+        port.append(server.sockets[0].getsockname()[1])
+        ready.set()
+        await server.serve_forever()
+
+    threading.Thread(target=lambda: asyncio.run(serve()), daemon=True).start()
+    ready.wait()
+    return port[0]
+
+
+# ── "Before" app: sync route on the threadpool ────────────────────────────────
+
+def _make_sync_app():
+    from fastapi import FastAPI
+    from src.mangapill import Mangapill
+    from src.session import get_session
+
+    app = FastAPI()
+    session = get_session()
+
+    @app.get("/mangapill/{category}/{path:path}")
+    def mangapill(category: str, path: str):
+        return Mangapill(session).search(query=path)
+
+    return app
+
+
+if os.environ.get("LOADTEST_SYNC_APP"):
+    sys.path.insert(0, MANGA_SCRAPERS)
+    sync_app = _make_sync_app()
+
+
+# ── Driver ────────────────────────────────────────────────────────────────────
+
+def _spawn(app: str, port: int, env: dict) -> subprocess.Popen:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", app, "--port", str(port), "--log-level", "warning"],
+        cwd=MANGA_SCRAPERS, env=env,
+    )
+    deadline = time.time() + 30
+    while time.time() < deadline:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/", timeout=1)
+            return proc
+        except httpx.HTTPError:
+            time.sleep(0.2)
+    proc.kill()
+    raise RuntimeError(f"{app} did not start")
+
+
+async def _hammer(host: str, port: int, total: int, concurrency: int) -> dict:
+    """
+    Fire total GETs over concurrency keep-alive connections. Uses raw asyncio
+    streams rather than an HTTP client library so the load generator itself
+    stays far cheaper than the server under test.
+    """
+    latencies, errors = [], 0
+    queue = iter(range(total))
+    request = f"GET {ENDPOINT} HTTP/1.1\r\nHost: {host}:{port}\r\n\r\n".encode()
+
+    async def worker():
+        nonlocal errors
+        reader, writer = await asyncio.open_connection(host, port)
+        try:
+            for _ in queue:
+                start = time.perf_counter()
+                writer.write(request)
+                await writer.drain()
+                head = await reader.readuntil(b"\r\n\r\n")
+                status = int(head.split(b" ", 2)[1])
+                length = 0
+                for line in head.split(b"\r\n")[1:]:
+                    name, _, value = line.partition(b":")
+                    if name.strip().lower() == b"content-length":
+                        length = int(value)
+                await reader.readexactly(length)
+                if status != 200:
+                    errors += 1
+                latencies.append(time.perf_counter() - start)
+        finally:
+            writer.close()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p95_ms": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--requests", type=int, default=600)
+    parser.add_argument("-c", "--concurrency", type=int, default=200)
+    parser.add_argument("--latency", type=float, default=2.0, help="stub upstream delay in seconds")
+    # Parsing is CPU-bound and identical in both apps; keep pages small so the
+    # run measures how many upstream waits a worker can overlap.
+    parser.add_argument("--cards", type=int, default=4, help="search results per stub page")
+    parser.add_argument("--port", type=int, default=8765)
+    opts = parser.parse_args()
+
+    stub_port = start_stub(opts.latency, opts.cards)
+    env = {
+        **os.environ,
+        "SCRAPER_PROXY_URL": f"http://127.0.0.1:{stub_port}/api-text?url=",
+        # Measure the server, not the upstream budgets or the listing crawler.
+        "SCRAPER_MAX_INFLIGHT": "0", "SCRAPER_MAX_RATE": "0",
+        "SCRAPER_SOURCE_INFLIGHT": "0", "SCRAPER_SOURCE_RATE": "0",
+        "SCRAPER_CRAWL_PAGES": "0",
+        "PYTHONPATH": os.pathsep.join([ROOT, MANGA_SCRAPERS, os.environ.get("PYTHONPATH", "")]),
+    }
+    runs = [
+        ("before (sync)", "bench.loadtest:sync_app", {**env, "LOADTEST_SYNC_APP": "1"}),
+        ("after (async)", "api.main:app", env),
+    ]
+
+    print(f"{opts.requests} requests, {opts.concurrency} concurrent, upstream latency {opts.latency * 1000:.0f} ms\n")
+    print(f"{'app':<16} {'req/s':>8} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for label, app, app_env in runs:
+        proc = _spawn(app, opts.port, app_env)
+        try:
+            r = asyncio.run(_hammer("127.0.0.1", opts.port, opts.requests, opts.concurrency))
+        finally:
+            proc.terminate()
+            proc.wait()
+        print(f"{label:<16} {r['rps']:>8.1f} {r['p50_ms']:>9.1f} {r['p95_ms']:>9.1f} {r['errors']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""
+Parse-only benchmark for the manga-scrapers sources: feeds each recorded page
+straight to the source's parser (no fetch, no cache) and compares the current
+tree against a baseline revision, per source method:
+  - median parse time at the baseline and now, and the speedup
+  - whether both produced the same results (compared as returned, so a
+    change in the result shape shows as DIFF; tests/test_parsers.py in
+    manga-scrapers compares the two after normalizing the shape)
+
+The baseline defaults to the revision before selector plans (src/plans.py)
+landed, i.e. the BeautifulSoup parsers. Each side runs in its own interpreter
+so the two `src` packages never meet.
+
+Usage:
+    python -m bench.parsers                    # all src.* sources, 50 iterations
+    python -m bench.parsers -n 200 src.mangapill
+    python -m bench.parsers --baseline HEAD~3
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import hashlib
+import inspect
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+from bench.cases import CASES, ROOT, MANGA_SCRAPERS, SOURCES
+from bench.fixtures import FIXTURES_DIR, FixtureStore
+
+PLANS = "manga-scrapers/src/plans.py"
+
+
+def _git(*args: str) -> str:
+    return subprocess.run(["git", *args], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+
+
+def _default_baseline() -> str:
+    added = _git("log", "--diff-filter=A", "--format=%H", "--", PLANS).splitlines()
+    # Not committed yet: the working tree is the change, HEAD is the baseline.
+    return f"{added[-1]}~1" if added else "HEAD"
+
+
+def _checkout(rev: str, dest: str) -> str:
+    """Extract manga-scrapers/src at `rev` into dest; returns the dir to put on sys.path."""
+    archive = subprocess.run(["git", "archive", rev, "manga-scrapers/src"], cwd=ROOT, capture_output=True, check=True)
+    subprocess.run(["tar", "-x", "-C", dest], input=archive.stdout, check=True)
+    return os.path.join(dest, "manga-scrapers")
+
+
+# ── Worker (one per tree) ─────────────────────────────────────────────────────
+
+def _digest(results) -> str:
+    try:
+        from src.models import to_builtins   # trees from before the typed models return plain dicts
+    except ImportError:
+        to_builtins = lambda value: value
+    return hashlib.sha1(json.dumps(to_builtins(results), sort_keys=True, default=repr).encode()).hexdigest()[:12]
+
+
+def _error(result):
+    if isinstance(result, dict):
+        return repr(result["results"]) if isinstance(result["results"], Exception) else None
+    return result.error
+
+
+def _capture(cls, method: str, args: tuple):
+    """The (url, parser name) a source method would scrape, without fetching."""
+    source = cls()
+    seen = []
+    source._scrape = lambda url, parse: seen.append((url, parse.__name__)) or source.results
+    # Skip @cached so nothing is read from or written to the result cache.
+    inspect.unwrap(getattr(cls, method))(source, *args)
+    return seen[0] if seen else None
+
+
+def _response(status: int, content_type: str, body: bytes):
+    import requests
+    response = requests.Response()
+    response.status_code = status
+    response.headers["Content-Type"] = content_type
+    response._content = body
+    return response
+
+
+def _worker(path: str, names: list[str], fixtures: str, iterations: int) -> None:
+    sys.path.insert(0, path)
+    import importlib
+    import requests
+
+    store = FixtureStore(fixtures)
+    store.load()
+    report = {}
+    for name in names:
+        module_path, class_name = SOURCES[name]
+        cls = getattr(importlib.import_module(module_path), class_name)
+        for method, args in CASES[name]:
+            key = f"{name}.{method}"
+            target = _capture(cls, method, args)
+            if target is None:
+                report[key] = {"skip": "n/a"}
+                continue
+            url, parser = target
+            # Recorded under the URL as sent, i.e. after requests quoted it.
+            hit = store.get(url) or store.get(requests.Request("GET", url).prepare().url)
+            if hit is None:
+                report[key] = {"skip": "not recorded"}
+                continue
+
+            response = _response(*hit)
+            results = getattr(cls(), parser)(response)   # warm-up
+            timings = []
+            for _ in range(iterations):
+                bound = getattr(cls(), parser)
+                start = time.perf_counter()
+                bound(response)
+                timings.append((time.perf_counter() - start) * 1000)
+            report[key] = {
+                "ms": statistics.median(timings),
+                "digest": _digest(results),
+                "error": _error(results),
+            }
+    print(json.dumps(report))
+
+
+def _run_worker(path: str, names: list[str], fixtures: str, iterations: int) -> dict:
+    cmd = [sys.executable, "-m", "bench.parsers", "--worker", path, "--fixtures", fixtures, "-n", str(iterations), *names]
+    proc = subprocess.run(cmd, cwd=ROOT, capture_output=True, text=True, timeout=1800)
+    if proc.returncode != 0:
+        raise RuntimeError(f"parser worker for {path} failed:\n{proc.stderr}")
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+# ── Report ────────────────────────────────────────────────────────────────────
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*", help="src.* sources from bench/cases.py (default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=50)
+    parser.add_argument("--baseline", help="git revision to compare against (default: before src/plans.py)")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="fixture directory (default: bench/fixtures)")
+    parser.add_argument("--worker", help=argparse.SUPPRESS)
+    opts = parser.parse_args()
+
+    names = opts.sources or [name for name in CASES if name.startswith("src.")]
+    unknown = [name for name in names if not name.startswith("src.") or name not in CASES]
+    if unknown:
+        parser.error(f"unknown source(s): {', '.join(unknown)}")
+
+    if opts.worker:
+        _worker(opts.worker, names, opts.fixtures, opts.iterations)
+        return
+
+    baseline = opts.baseline or _default_baseline()
+    with tempfile.TemporaryDirectory() as tmp:
+        before = _run_worker(_checkout(baseline, tmp), names, opts.fixtures, opts.iterations)
+    after = _run_worker(MANGA_SCRAPERS, names, opts.fixtures, opts.iterations)
+
+    print(f"baseline {baseline} ({_git('rev-parse', '--short', baseline)}) vs working tree, {opts.iterations} iterations\n")
+    print(f"{'case':<32} {'before ms':>10} {'after ms':>10} {'speedup':>8}  output")
+    ratios = []
+    for key, now in after.items():
+        then = before.get(key, {"skip": "missing"})
+        skip = now.get("skip") or then.get("skip")
+        if skip:
+            print(f"{key:<32} {'-':>10} {'-':>10} {'-':>8}  {skip}")
+            continue
+        ratio = then["ms"] / now["ms"] if now["ms"] else float("inf")
+        ratios.append(ratio)
+        same = "same" if then["digest"] == now["digest"] else "DIFF"
+        error = now["error"] or then["error"]
+        print(f"{key:<32} {then['ms']:>10.3f} {now['ms']:>10.3f} {ratio:>7.1f}x  {same}" + (f"  ({error})" if error else ""))
+
+    if not ratios:
+        print("\nno recorded pages to compare; run `python -m bench.record` first")
+        return
+    print(f"\ngeometric mean speedup: {statistics.geometric_mean(ratios):.1f}x over {len(ratios)} cases")
+
+
+if __name__ == "__main__":
+    main()
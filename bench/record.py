@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""
+Record live HTML responses for the scraper benchmark.
+
+Runs every call in bench/cases.py against the real sites (through whatever
+proxy each scraper normally uses) and stores the responses under
+bench/fixtures/<source>/. Re-run whenever a site's markup changes.
+
+Usage:
+    python -m bench.record                    # all sources
+    python -m bench.record mangapill src.scanvf
+"""
+from __future__ import annotations
+import sys
+
+from bench.cases import CASES, load_source
+from bench.fixtures import FixtureStore, recording
+
+
+def main():
+    sources = sys.argv[1:] or list(CASES)
+    store = FixtureStore()
+
+    for source in sources:
+        if source not in CASES:
+            print(f"  ✗ Unknown source '{source}'")
+            continue
+        print(f"-> Recording {source}")
+        with recording(store, source):
+            for method, args in CASES[source]:
+                try:
+                    getattr(load_source(source), method)(*args)
+                    print(f"  ✓ {method}{args}")
+                except Exception as e:
+                    print(f"  ✗ {method}{args}: {e}")
+
+
+if __name__ == "__main__":
+    main()
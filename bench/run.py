@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Offline scraper benchmark: replays recorded fixtures and reports, per
+source method:
+  - median / p95 parse time per call: responses are served from memory, so
+    this is the scraper's own work with no I/O
+  - median time per call with the fixture fetched from a local stub server
+    over loopback, for comparison
+  - peak traced memory during one parse (tracemalloc)
+  - memory, and the number of allocated blocks, still held after it returns
+
+Usage:
+    python -m bench.run                        # all sources, 20 iterations
+    python -m bench.run -n 50 mangapill
+    python -m bench.run --json baseline.json   # save results
+    python -m bench.run --compare baseline.json
+"""
+from __future__ import annotations
+import sys
+import json
+import time
+import inspect
+import argparse
+import statistics
+import tracemalloc
+
+from bench.cases import CASES, load_source
+from bench.fixtures import FixtureStore, StubServer, replaying, serving
+
+
+def _timings(call, iterations: int) -> list[float]:
+    call()  # warm-up: imports, regex compilation, connection setup
+    timings = []
+    for _ in range(iterations):
+        start = time.perf_counter()
+        call()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)
+
+
+def _measure(store: FixtureStore, stub: StubServer, source: str, method: str, args: tuple, iterations: int) -> dict:
+    def call():
+        scraper = load_source(source)
+        # Past @cached: every call after the warm-up would be a cache hit.
+        return inspect.unwrap(getattr(type(scraper), method))(scraper, *args)
+
+    with serving(store) as misses:
+        parse = _timings(call, iterations)
+
+        tracemalloc.start()
+        before = tracemalloc.take_snapshot()
+        before_bytes, _ = tracemalloc.get_traced_memory()
+        tracemalloc.reset_peak()
+        call()
+        after_bytes, peak = tracemalloc.get_traced_memory()
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+    if misses:
+        raise LookupError(f"not recorded: {sorted(misses)[0]}")
+
+    with replaying(stub):
+        fetch = _timings(call, iterations)
+
+    # Blocks allocated during the call and still alive after it, from the
+    # snapshots' per-line statistics, leaving out the `before` snapshot itself.
+    ours = [tracemalloc.Filter(False, tracemalloc.__file__)]
+    held_blocks = sum(stat.count_diff for stat in after.filter_traces(ours).compare_to(before.filter_traces(ours), "lineno")
+                      if stat.count_diff > 0)
+    return {
+        "median_ms": round(statistics.median(parse), 3),
+        "p95_ms": round(parse[min(len(parse) - 1, int(len(parse) * 0.95))], 3),
+        "fetch_ms": round(statistics.median(fetch), 3),
+        "peak_kib": round((peak - before_bytes) / 1024, 1),
+        "retained_kib": round((after_bytes - before_bytes) / 1024, 1),
+        "retained_blocks": held_blocks,
+    }
+
+
+def _print_table(results: dict, baseline: dict | None) -> None:
+    print(f"\n{'case':<42} {'parse ms':>9} {'p95 ms':>9} {'fetch ms':>9} {'peak KiB':>9} {'held KiB':>9} {'blocks':>7}")
+    print("-" * 99)
+    for case, r in results.items():
+        if "error" in r:
+            print(f"{case:<42} ✗ {r['error']}")
+            continue
+        line = (f"{case:<42} {r['median_ms']:>9.2f} {r['p95_ms']:>9.2f} {r['fetch_ms']:>9.2f} "
+                f"{r['peak_kib']:>9.1f} {r['retained_kib']:>9.1f} {r['retained_blocks']:>7}")
+        old = (baseline or {}).get(case)
+        if old and "median_ms" in old and old["median_ms"]:
+            line += f"  ({(r['median_ms'] / old['median_ms'] - 1) * 100:+.0f}% time)"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("sources", nargs="*", help="sources to run (default: all)")
+    parser.add_argument("-n", "--iterations", type=int, default=20)
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--compare", help="baseline results file to diff against")
+    opts = parser.parse_args()
+
+    store = FixtureStore()
+    if not store.load():
+        print("No fixtures recorded — run `python -m bench.record` first.")
+        sys.exit(1)
+
+    baseline = None
+    if opts.compare:
+        with open(opts.compare, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results = {}
+    with StubServer(store) as stub:
+        for source in opts.sources or list(CASES):
+            for method, args in CASES.get(source, []):
+                case = f"{source}.{method}"
+                try:
+                    results[case] = _measure(store, stub, source, method, args, opts.iterations)
+                except Exception as e:
+                    results[case] = {"error": str(e)}
+
+    _print_table(results, baseline)
+
+    if opts.json:
+        with open(opts.json, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2)
+        print(f"\nSaved results to {opts.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Startup check for the manga-scrapers API: imports api.main in a fresh
+interpreter a few times and fails (exit 1) if any import
+  - touches the network (socket connect / DNS lookup, via an audit hook)
+  - eagerly loads a scraper module or its HTML parser (sources load on
+    first request)
+  - takes longer than the budget (median across runs)
+
+Usage:
+    python -m bench.startup                  # 5 runs, 1.5 s budget
+    python -m bench.startup -n 10 --budget 0.8
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+from bench.cases import MANGA_SCRAPERS
+
+# Runs inside the child interpreter. The audit hook is installed before the
+# import so nothing at module level can slip past it.
+_CHILD = r"""
+import sys, json, time
+network = []
+def hook(event, args):
+    if event in ("socket.connect", "socket.getaddrinfo", "socket.gethostbyname", "socket.sendto"):
+        network.append(f"{event} {args[1] if event == 'socket.connect' else args[0]}")
+sys.addaudithook(hook)
+started = time.perf_counter()
+import api.main
+elapsed = time.perf_counter() - started
+print(json.dumps({
+    "seconds": elapsed,
+    "network": network,
+    "eager": sorted(m for m in sys.modules if m in ("bs4", "lxml") or m in SCRAPERS),
+}))
+"""
+
+SCRAPER_MODULES = [
+    "src.manganato", "src.mangareader", "src.mangapill", "src.asurascans",
+    "src.flamescans", "src.mangaworld", "src.mangapark", "src.scanvf",
+]
+
+
+def _run_once() -> dict:
+    code = f"SCRAPERS = {SCRAPER_MODULES!r}\n" + _CHILD
+    env = {**os.environ, "PYTHONPATH": os.pathsep.join([MANGA_SCRAPERS, os.environ.get("PYTHONPATH", "")])}
+    proc = subprocess.run([sys.executable, "-c", code], cwd=MANGA_SCRAPERS, env=env, capture_output=True, text=True, timeout=120)
+    if proc.returncode != 0:
+        raise RuntimeError(f"importing api.main failed:\n{proc.stderr}")
+    # The app may print on import; the report is always the last line.
+    return json.loads(proc.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=1.5, help="max median import time in seconds")
+    opts = parser.parse_args()
+
+    runs = [_run_once() for _ in range(opts.runs)]
+    times = sorted(r["seconds"] for r in runs)
+    median = statistics.median(times)
+    network = sorted({call for r in runs for call in r["network"]})
+    eager = sorted({m for r in runs for m in r["eager"]})
+
+    print(f"import api.main: median {median * 1000:.0f} ms, max {times[-1] * 1000:.0f} ms over {len(runs)} runs (budget {opts.budget * 1000:.0f} ms)")
+    failures = []
+    if network:
+        failures.append("network I/O during import:\n    " + "\n    ".join(network))
+    if eager:
+        failures.append("loaded eagerly: " + ", ".join(eager))
+    if median > opts.budget:
+        failures.append(f"median import time {median:.2f} s is over the {opts.budget:.2f} s budget")
+
+    for failure in failures:
+        print(f"FAIL  {failure}")
+    if failures:
+        sys.exit(1)
+    print("OK    no network I/O, no scraper modules loaded")
+
+
+if __name__ == "__main__":
+    main()
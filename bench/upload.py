@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+"""
+Supabase upload benchmark against a local stand-in for PostgREST.
+
+The stand-in accepts POST /rest/v1/<table>?on_conflict=... the way Supabase
+does (a JSON array of rows, upserted on the conflict columns), after a fixed
+per-request delay plus a per-byte transfer cost. It answers 413 to bodies
+over --max-body and 503 to a --fail fraction of requests.
+
+Uploads one synthetic catalog (mostly 20-60 page chapters, a few with
+hundreds) two ways and checks what the server ended up with:
+  - before: fixed 100-row batches, one at a time, no retries (how
+    upload_to_supabase.py sent them through the supabase client)
+  - after:  extractor/shared/uploader.py
+then runs the resume check: an upload cut off partway by the server, and a
+second run with the same SyncState that must send only the rest.
+
+Usage:
+    python -m bench.upload
+    python -m bench.upload --series 200 --latency 0.2 --fail 0.05 --workers 8
+"""
+from __future__ import annotations
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import httpx
+
+from bench.cases import ROOT
+
+EXTRACTOR = os.path.join(ROOT, "extractor")
+
+
+# ── Stand-in PostgREST ────────────────────────────────────────────────────────
+
+class StandIn:
+    """Upserts rows into self.tables[table][conflict key]. Runs in a background thread."""
+
+    def __init__(self, latency: float, mb_per_s: float, max_body: int, fail: float):
+        self.latency = latency
+        self.mb_per_s = mb_per_s
+        self.max_body = max_body
+        self.fail = fail
+        self.cut_off_after = None  # requests; later ones get a 400, as if the key was revoked
+        self.tables: dict[str, dict] = {}
+        self.requests = 0
+        self.bytes = 0
+        self.statuses: dict[int, int] = {}
+        self._lock = threading.Lock()
+        self._rng = random.Random(0)
+
+        standin = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_POST(self):
+                standin.handle(self)
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.port = self.server.server_address[1]
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.port}"
+
+    def reset(self):
+        with self._lock:
+            self.tables.clear()
+            self.requests = self.bytes = 0
+            self.statuses.clear()
+            self.cut_off_after = None
+
+    def handle(self, request: BaseHTTPRequestHandler):
+        body = request.rfile.read(int(request.headers.get("Content-Length", 0)))
+        with self._lock:
+            self.requests += 1
+            self.bytes += len(body)
+            n = self.requests
+            failed = self._rng.random() < self.fail
+        time.sleep(self.latency + len(body) / (self.mb_per_s * 1024 * 1024))
+
+        url = urlparse(request.path)
+        table = url.path.rsplit("/", 1)[-1]
+        conflict = parse_qs(url.query).get("on_conflict", [""])[0].split(",")
+        if not request.headers.get("apikey"):
+            status, reply = 401, {"message": "No API key found in request"}
+        elif self.cut_off_after is not None and n > self.cut_off_after:
+            status, reply = 400, {"message": "cut off"}
+        elif len(body) > self.max_body:
+            status, reply = 413, {"message": "Payload Too Large"}
+        elif failed:
+            status, reply = 503, {"message": "upstream unavailable"}
+        else:
+            rows = json.loads(body)
+            with self._lock:
+                stored = self.tables.setdefault(table, {})
+                for row in rows:
+                    stored[tuple(row[column] for column in conflict)] = row
+            status, reply = 201, None
+
+        with self._lock:
+            self.statuses[status] = self.statuses.get(status, 0) + 1
+        payload = json.dumps(reply).encode() if reply else b""
+        request.send_response(status)
+        request.send_header("Content-Length", str(len(payload)))
+        request.end_headers()
+        request.wfile.write(payload)
+
+
+# ── Catalog ───────────────────────────────────────────────────────────────────
+
+def make_catalog(series: int, chapters: int, seed: int = 1) -> dict:
+    rng = random.Random(seed)
+    data = {}
+    for s in range(series):
+        entry = {}
+        for c in range(1, chapters + 1):
+            pages = rng.randint(20, 60) if rng.random() > 0.02 else rng.randint(300, 900)
+            entry[str(c)] = [
+                f"https://cdn.example.com/chapters/series-{s}/{c}/{p:03}-{rng.getrandbits(48):012x}.webp"
+                for p in range(1, pages + 1)
+            ]
+        data[f"series-{s}"] = {"chapters": entry}
+    return data
+
+
+def rows_of(data: dict) -> list[dict]:
+    return [
+        {"series_id": series_id, "chapter_id": chapter_id, "pages": pages}
+        for series_id, entry in data.items()
+        for chapter_id, pages in entry["chapters"].items()
+    ]
+
+
+# ── Upload strategies ─────────────────────────────────────────────────────────
+
+def upload_before(url: str, key: str, rows: list[dict]) -> int:
+    """Sequential 100-row batches, no retries; returns failed batches."""
+    failed = 0
+    headers = {"apikey": key, "Authorization": f"Bearer {key}",
+               "Prefer": "resolution=merge-duplicates,return=minimal"}
+    with httpx.Client(base_url=url + "/rest/v1", headers=headers, timeout=60) as client:
+        for i in range(0, len(rows), 100):
+            response = client.post("/chapters", params={"on_conflict": "series_id,chapter_id"}, json=rows[i:i + 100])
+            if response.status_code >= 300:
+                failed += 1
+    return failed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--series", type=int, default=60)
+    parser.add_argument("--chapters", type=int, default=100, help="chapters per series")
+    parser.add_argument("--latency", type=float, default=0.15, help="stand-in delay per request, seconds")
+    parser.add_argument("--mbps", type=float, default=20.0, help="stand-in transfer rate, MB/s")
+    parser.add_argument("--max-body", type=int, default=1024 * 1024, help="bytes; bigger requests get a 413")
+    parser.add_argument("--fail", type=float, default=0.03, help="fraction of requests answered 503")
+    parser.add_argument("--workers", type=int, default=4)
+    opts = parser.parse_args()
+
+    if EXTRACTOR not in sys.path:
+        sys.path.insert(0, EXTRACTOR)
+    from shared.sync_state import SyncState
+    from shared.uploader import UploadError, Uploader
+
+    standin = StandIn(opts.latency, opts.mbps, opts.max_body, opts.fail)
+    data = make_catalog(opts.series, opts.chapters)
+    rows = rows_of(data)
+    expected = {(row["series_id"], row["chapter_id"]) for row in rows}
+    size = sum(len(json.dumps(row)) for row in rows)
+    print(f"{len(rows)} chapters, {size / 1024 / 1024:.1f} MB of rows; stand-in latency "
+          f"{opts.latency * 1000:.0f} ms, {opts.mbps:g} MB/s, 413 over {opts.max_body // 1024} KB, "
+          f"{opts.fail:.0%} 503s\n")
+    print(f"{'upload':<10} {'seconds':>8} {'requests':>9} {'stored':>7} {'missing':>8}  statuses")
+
+    def report(label, elapsed):
+        stored = set(standin.tables.get("chapters", {}))
+        statuses = " ".join(f"{status}×{n}" for status, n in sorted(standin.statuses.items()))
+        print(f"{label:<10} {elapsed:>8.2f} {standin.requests:>9} {len(stored):>7} {len(expected - stored):>8}  {statuses}")
+
+    started = time.perf_counter()
+    upload_before(standin.url, "key", rows)
+    report("before", time.perf_counter() - started)
+
+    standin.reset()
+    uploader = Uploader(standin.url, "key", workers=opts.workers)
+    started = time.perf_counter()
+    try:
+        uploader.upload(rows)
+    except UploadError as e:
+        print(f"  ✗ {e}")
+    report("after", time.perf_counter() - started)
+    uploader.close()
+
+    # Resume: the server stops accepting partway; a second run with the same
+    # sync state sends only what the first didn't get up.
+    standin.reset()
+    standin.fail = 0
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "supabase_sync.json")
+        uploader = Uploader(standin.url, "key", workers=opts.workers)
+        standin.cut_off_after = standin.requests + 10
+        state = SyncState(path, standin.url)
+        first = [row for series_id, entry in data.items() for row in state.changed_rows(series_id, entry["chapters"])]
+        try:
+            uploader.upload(first, on_batch=state.mark_synced)
+        except UploadError:
+            pass
+        state.save()
+        landed = len(standin.tables.get("chapters", {}))
+
+        standin.cut_off_after = None
+        state = SyncState(path, standin.url)
+        second = [row for series_id, entry in data.items() for row in state.changed_rows(series_id, entry["chapters"])]
+        uploader.upload(second, on_batch=state.mark_synced)
+        state.save()
+        uploader.close()
+
+    stored = set(standin.tables.get("chapters", {}))
+    ok = len(second) == len(rows) - landed and stored == expected
+    print(f"\nresume: cut off after {landed} chapters; second run sent {len(second)} "
+          f"({'✓' if ok else '✗'} {len(rows) - landed} expected), {len(expected - stored)} missing")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 #!/usr/bin/env python3
-import json
 import os
 import time
 import re
@@ -12,12 +11,12 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 
+from shared.storage import OUTPUT_FILE, load_data, save_chapter, save_data
+
 # Fix SSL certificate verification issues
 os.environ["SSL_CERT_FILE"] = certifi.where()
 os.environ["REQUESTS_CA_BUNDLE"] = certifi.where()
 
-OUTPUT_FILE = "chapter_data.json"
-
 # =============================================
 # ADD ALL YOUR MANHWA LINKS HERE
 # =============================================
@@ -267,56 +266,6 @@ def get_chapter_pages(driver, chapter, site):
     return get_chapter_pages_asura(driver, chapter)
 
 
-def _try_repair_json(raw):
-    pos = len(raw)
-    while pos > 100:
-        pos -= 1
-        snippet = raw[:pos].rstrip()
-        for suffix in ["}}}", "}}", "}", ""]:
-            try:
-                return json.loads(snippet + suffix)
-            except:
-                continue
-    return None
-
-
-def load_existing_data():
-    if not os.path.exists(OUTPUT_FILE):
-        return {}
-
-    with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-        raw = f.read()
-
-    try:
-        return json.loads(raw)
-    except json.JSONDecodeError as e:
-        print(f"  ⚠ chapter_data.json is corrupt (char {e.pos}): {e.msg}")
-        print("  Attempting automatic repair...")
-
-        backup = OUTPUT_FILE + ".bak"
-        with open(backup, "w", encoding="utf-8") as f:
-            f.write(raw)
-        print(f"  Backup saved to {backup}")
-
-        data = _try_repair_json(raw)
-        if data:
-            total = sum(len(v.get("chapters", {})) for v in data.values())
-            print(f"  ✓ Repaired! Recovered {len(data)} series, {total} chapters")
-            with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
-            return data
-        else:
-            print("  ✗ Could not repair automatically. Starting fresh.")
-            return {}
-
-
-def save_data(data):
-    tmp = OUTPUT_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    os.replace(tmp, OUTPUT_FILE)
-
-
 def process_manhwa(series_url, data):
     site = detect_site(series_url)
     series_id = get_series_id(series_url)
@@ -370,14 +319,12 @@ def process_manhwa(series_url, data):
                         time.sleep(5)
 
             if pages:
-                data[series_id]["chapters"][ch["id"]] = pages
+                save_chapter(data, series_id, ch["id"], pages)
                 print(f"✓ {len(pages)} pages")
             else:
                 failed.append(ch["id"])
                 print(f"✗ failed after {MAX_RETRIES} attempts")
 
-            save_data(data)
-
             if i < len(new_chapters) - 1:
                 delay = random.uniform(*DELAY_BETWEEN_CHAPTERS)
                 time.sleep(delay)
@@ -397,7 +344,7 @@ def main():
     print("=== Manhwa Bulk Extractor (Asura + Vortex) ===")
     print(f"Processing {len(MANHWA_URLS)} manhwa\n")
 
-    data = load_existing_data()
+    data = load_data()
     print(f"Loaded existing data: {len(data)} series cached\n")
 
     for url in MANHWA_URLS:
@@ -405,9 +352,9 @@ def main():
             process_manhwa(url, data)
         except Exception as e:
             print(f"  ✗ Failed entirely: {e}")
-            save_data(data)
             continue
 
+    save_data(data)
     print(f"\n{'='*50}")
     print(f"All done! Data saved to {OUTPUT_FILE}")
     total_chapters = sum(len(v["chapters"]) for v in data.values())
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Audit chapter data against the rules in audit_rules.json (dead domains,
+URL pattern mismatches, duplicate pages, empty chapters), write a report,
+and optionally apply it.
+
+Usage:
+    python audit.py                          # audit everything -> audit_report.json
+    python audit.py eleceed solo-leveling    # only series matching these
+    python audit.py --rules other.json --jobs 4
+    python audit.py --apply                  # carry out audit_report.json
+    python audit.py --apply my_report.json
+"""
+
+import argparse
+import json
+import os
+import sys
+
+from shared.audit import RULES_FILE, apply_report, load_rules, run_audit
+from shared.storage import OUTPUT_FILE, exists, load_data, open_readonly, save_data
+
+REPORT_FILE = "audit_report.json"
+
+
+def audit(opts):
+    rules = load_rules(opts.rules)
+
+    series_ids = None
+    if opts.series:
+        store = open_readonly()
+        series_ids = [k for k in store.series_ids() if any(t.lower() in k.lower() for t in opts.series)]
+        store.close()
+
+    report = run_audit(rules, series_ids, opts.jobs)
+    tmp = opts.report + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    os.replace(tmp, opts.report)
+
+    print(f"\n{'rule':<28} {'series':>8} {'chapters':>10}  action")
+    for rule in rules:
+        name = rule.get("name") or rule["type"]
+        counts = report["summary"][name]
+        print(f"{name:<28} {counts['series']:>8} {counts['chapters']:>10}  {rule.get('action', 'report')}")
+    print(f"\n✓ {len(report['findings'])} findings written to {opts.report}")
+    if any(f["action"] != "report" for f in report["findings"]):
+        print(f"  Review it, then run: python audit.py --apply {opts.report}")
+
+
+def apply(opts):
+    with open(opts.report, "r", encoding="utf-8") as f:
+        report = json.load(f)
+
+    data = load_data()
+    backup = OUTPUT_FILE + ".bak"
+    with open(backup, "w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    print(f"Backup saved to {backup}")
+
+    done = apply_report(data, report)
+    save_data(data)
+    print(f"✓ Removed {done['series']} series, {done['chapters']} chapters; deduplicated {done['deduped']} chapters")
+    total = sum(len(v.get("chapters", {})) for v in data.values())
+    print(f"  {len(data)} series remaining | {total} total chapters")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("series", nargs="*", help="only audit series whose id contains one of these")
+    parser.add_argument("--rules", default=RULES_FILE)
+    parser.add_argument("--report", default=REPORT_FILE)
+    parser.add_argument("--jobs", type=int, help="worker processes (default: one per CPU)")
+    parser.add_argument("--apply", nargs="?", const=REPORT_FILE, metavar="REPORT", help="apply a report instead of auditing")
+    opts = parser.parse_args()
+
+    if not exists():
+        print(f"✗ {OUTPUT_FILE} not found")
+        sys.exit(1)
+
+    if opts.apply:
+        opts.report = opts.apply
+        apply(opts)
+    else:
+        audit(opts)
+
+
+if __name__ == "__main__":
+    main()
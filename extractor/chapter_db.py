@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""
+Move chapter data between chapter_data.json and the SQLite store
+(chapter_data.db), or with --sharded the per-series store (data/). Run the
+extractor with EXTRACTOR_STORAGE=sqlite / sharded to use them.
+
+Usage:
+    python chapter_db.py import                 # chapter_data.json (+ journal) -> chapter_data.db
+    python chapter_db.py export                 # chapter_data.db -> chapter_data.json
+    python chapter_db.py export backup.json     # ... or any other file
+    python chapter_db.py stats
+    python chapter_db.py import --sharded       # chapter_data.json -> data/series/<series>.json
+"""
+
+import os
+import sys
+
+from shared.pages import dump, encode_series
+from shared.sharded_store import DATA_DIR, MANIFEST_FILE, ShardedStore
+from shared.sqlite_store import DB_FILE, SQLiteStore
+from shared.storage import OUTPUT_FILE, JOURNAL_FILE, load_json, save_json
+
+
+def open_store(sharded):
+    """(store, location), or exit if there's nothing there."""
+    if sharded:
+        if not os.path.exists(os.path.join(DATA_DIR, MANIFEST_FILE)):
+            print(f"✗ {DATA_DIR}/{MANIFEST_FILE} not found")
+            sys.exit(1)
+        return ShardedStore(DATA_DIR), DATA_DIR + "/"
+    if not os.path.exists(DB_FILE):
+        print(f"✗ {DB_FILE} not found")
+        sys.exit(1)
+    return SQLiteStore(DB_FILE), DB_FILE
+
+
+def import_json(sharded):
+    if not os.path.exists(OUTPUT_FILE) and not os.path.exists(JOURNAL_FILE):
+        print(f"✗ {OUTPUT_FILE} not found")
+        sys.exit(1)
+    data = load_json()
+    store = ShardedStore(DATA_DIR) if sharded else SQLiteStore(DB_FILE)
+    store.save_data(data)
+    series, chapters = store.counts()
+    print(f"✓ Imported into {DATA_DIR + '/' if sharded else DB_FILE}: {series} series | {chapters} chapters")
+
+
+def export_json(sharded, path):
+    store, _ = open_store(sharded)
+    data = store.load_data()
+    if path == OUTPUT_FILE:
+        save_json(data)  # also drops a stale journal that would replay over it
+    else:
+        tmp = path + ".tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            dump({series_id: encode_series(entry) for series_id, entry in data.items()}, f)
+        os.replace(tmp, path)
+    total = sum(len(v.get("chapters", {})) for v in data.values())
+    print(f"✓ Exported to {path}: {len(data)} series | {total} chapters")
+
+
+def stats(sharded):
+    store, location = open_store(sharded)
+    series, chapters = store.counts()
+    print(f"{location}: {series} series | {chapters} chapters")
+
+
+def main():
+    sharded = "--sharded" in sys.argv
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if not args:
+        print(__doc__)
+        sys.exit(0)
+
+    if args[0] == "import":
+        import_json(sharded)
+    elif args[0] == "export":
+        export_json(sharded, args[1] if len(args) > 1 else OUTPUT_FILE)
+    elif args[0] == "stats":
+        stats(sharded)
+    else:
+        print(__doc__)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,32 +9,17 @@ Usage:
 """
 
 import json
-import os
 import sys
 
-OUTPUT_FILE = "chapter_data.json"
+from shared.storage import OUTPUT_FILE, exists, load_data, open_readonly, save_data
 
 
-def load():
-    if not os.path.exists(OUTPUT_FILE):
-        print(f"✗ {OUTPUT_FILE} not found")
-        sys.exit(1)
-    with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save(data):
-    tmp = OUTPUT_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    os.replace(tmp, OUTPUT_FILE)
-
-
-def list_series(data):
-    print(f"\n{len(data)} series in {OUTPUT_FILE}:\n")
-    for key, val in sorted(data.items()):
-        ch_count = len(val.get("chapters", {}))
-        print(f"  {key}  ({ch_count} chapters)")
+def list_series(store):
+    # Counts only: nothing is decoded beyond the index.
+    series_ids = store.series_ids()
+    print(f"\n{len(series_ids)} series in {OUTPUT_FILE}:\n")
+    for key in sorted(series_ids):
+        print(f"  {key}  ({store.chapter_count(key)} chapters)")
     print()
 
 
@@ -100,12 +85,16 @@ def main():
         print(__doc__)
         sys.exit(0)
 
-    data = load()
+    if not exists():
+        print(f"✗ {OUTPUT_FILE} not found")
+        sys.exit(1)
 
     if args[0] == "--list":
-        list_series(data)
+        list_series(open_readonly())
         sys.exit(0)
 
+    data = load_data()
+
     if args[0] == "--rename":
         if len(args) < 3:
             print("Usage: python cleanup.py --rename <old_name> <new_name>")
@@ -115,7 +104,7 @@ def main():
             json.dump(data, f, indent=2)
         print(f"Backup saved to {backup}\n")
         rename(data, args[1], args[2])
-        save(data)
+        save_data(data)
         sys.exit(0)
 
     print(f"\nLoaded {len(data)} series from {OUTPUT_FILE}\n")
@@ -129,7 +118,7 @@ def main():
     removed = remove(data, args)
 
     if removed:
-        save(data)
+        save_data(data)
         total = sum(len(v.get("chapters", {})) for v in data.values())
         print(f"\nDone. {len(data)} series remaining | {total} total chapters")
     else:
@@ -1,8 +1,18 @@
 #!/usr/bin/env python3
+"""
+Scrape MANHWA_URLS into the chapter store and publish new chapters to Supabase.
+
+Usage:
+    python main.py                # one series at a time
+    python main.py --workers 4    # 4 browsers working through all series at once
+"""
+import importlib
 import os
+import sys
 import certifi
 from urllib.parse import urlparse
-from shared.storage import load_data, save_data
+from shared.storage import add_chapter_listener, load_data, open_readonly, remove_chapter_listener, save_data
+from shared.sync_state import SYNC_FILE, SyncState
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -46,117 +56,151 @@ def get_site(url):
 
 # ── Supabase upload helper ────────────────────────────────────────────────────
 def get_supabase_client():
-    """Returns Supabase client or None if credentials missing."""
+    """Returns an Uploader (shared/uploader.py) or None if credentials missing."""
     try:
-        from supabase import create_client
-        url = os.environ.get("SUPABASE_URL", "")
-        key = os.environ.get("SUPABASE_SERVICE_KEY", "")
-        if not url or not key:
-            print("  ⚠ Supabase credentials not found — skipping upload")
-            return None
-        return create_client(url, key)
+        from shared.uploader import Uploader
     except ImportError:
-        print("  ⚠ supabase package not installed — skipping upload")
+        print("  ⚠ httpx package not installed — skipping upload")
         return None
+    uploader = Uploader.from_env()
+    if uploader is None:
+        print("  ⚠ Supabase credentials not found — skipping upload")
+    return uploader
 
 
-def upload_series_to_supabase(client, series_id, chapters):
-    """Upload only new/changed chapters for a series to Supabase."""
+def upload_series_to_supabase(client, series_id, chapters, state):
+    """Upload only new/changed chapters for a series to Supabase; state is the SyncState."""
     if not client or not chapters:
         return 0
 
-    rows = [
-        {
-            "series_id": series_id,
-            "chapter_id": chapter_id,
-            "pages": pages,
-        }
-        for chapter_id, pages in chapters.items()
-        if isinstance(pages, list) and len(pages) > 0
-    ]
+    rows = state.changed_rows(series_id, chapters)
 
     if not rows:
         return 0
 
-    # Upsert in batches of 100
-    total = 0
-    for i in range(0, len(rows), 100):
-        batch = rows[i:i + 100]
-        client.table("chapters").upsert(
-            batch,
-            on_conflict="series_id,chapter_id"
-        ).execute()
-        total += len(batch)
+    # Size-packed batches, a few in flight at once, checkpointed as they land
+    return client.upload(rows, on_batch=state.mark_synced)
 
-    return total
 
+def catch_up_series(supabase, publisher, sync_state, series_id, chapters):
+    """After a series is scraped: upload anything the live upload missed or failed on."""
+    publisher.flush()
+    try:
+        uploaded = upload_series_to_supabase(supabase, series_id, chapters, sync_state)
+    finally:
+        sync_state.save()
+    if uploaded > 0:
+        print(f"  ☁ Automatically uploaded {uploaded} chapters to Supabase")
 
-# ── Main ──────────────────────────────────────────────────────────────────────
-def main():
-    print("=== Manhwa Extractor ===")
-    print(f"Processing {len(MANHWA_URLS)} titles\n")
-
-    data = load_data()
-    print(f"Loaded existing data: {len(data)} series cached\n")
 
-    # Init Supabase client once — reuse for all series
-    supabase = get_supabase_client()
-    if supabase:
-        print("✓ Supabase connected\n")
+# ── Parallel run ──────────────────────────────────────────────────────────────
+def run_parallel(data, workers):
+    """Scrape MANHWA_URLS with a pool of `workers` browsers; returns the ids of the series scraped."""
+    from shared.browser_pool import BrowserPool
 
+    jobs = []
     for url in MANHWA_URLS:
         site = get_site(url)
         if not site:
             print(f"  ✗ Unknown site for URL: {url}")
             continue
+        jobs.append((importlib.import_module(f"extractor.sites.{site}"), url))
 
-        print(f"-> Processing: {url}")
+    print(f"-> Scraping {len(jobs)} series with {workers} browsers\n")
+    results = BrowserPool(jobs, workers=workers).run(data)
 
-        try:
-            if site == "asura":
-                from extractor.sites.asura import scrape
-                scrape(url, data)
+    print()
+    for series_id, result in results.items():
+        line = f"  {series_id}: {result['fetched']} new chapters"
+        if result["failed"]:
+            line += f" | failed: {result['failed']}"
+        print(line)
+    return list(results)
 
-            elif site == "mgeko":
-                from extractor.sites.mgeko import scrape
-                scrape(url, data)
 
-            # Match what the scraper wrote directly to the data keys
-            series_id = _get_series_id_from_url(url, data)
+# ── Main ──────────────────────────────────────────────────────────────────────
+def main(workers=1):
+    print("=== Manhwa Extractor ===")
+    print(f"Processing {len(MANHWA_URLS)} titles\n")
 
-            if series_id and series_id in data:
-                # Support both nested structure and flat structure safely
-                series_entry = data[series_id]
-                if isinstance(series_entry, dict) and "chapters" in series_entry:
-                    chapters = series_entry["chapters"]
-                else:
-                    chapters = series_entry
+    data = load_data()
+    print(f"Loaded existing data: {len(data)} series cached\n")
 
+    # Init Supabase client once — reuse for all series
+    supabase = get_supabase_client()
+    if supabase:
+        print("✓ Supabase connected\n")
+        # What Supabase already has, so each series only sends what changed
+        sync_state = SyncState(SYNC_FILE, os.environ.get("SUPABASE_URL", ""))
+        # Chapters go up as they're scraped; see shared/publisher.py
+        from shared.publisher import Publisher
+        publisher = Publisher(supabase, sync_state)
+        add_chapter_listener(publisher.publish)
+
+    try:
+        if workers > 1:
+            for series_id in run_parallel(data, workers):
                 if supabase:
-                    uploaded = upload_series_to_supabase(supabase, series_id, chapters)
-                    if uploaded > 0:
-                        print(f"  ☁ Automatically uploaded {uploaded} chapters to Supabase")
-            else:
-                print(f"  ⚠ Could not resolve unique database ID for: {url}")
-
-        except Exception as e:
-            print(f"  ✗ Failed entirely during extraction/upload: {e}")
-            continue
+                    try:
+                        catch_up_series(supabase, publisher, sync_state, series_id, data[series_id]["chapters"])
+                    except Exception as e:
+                        print(f"  ✗ Failed to upload {series_id}: {e}")
+                        continue
+        else:
+            for url in MANHWA_URLS:
+                site = get_site(url)
+                if not site:
+                    print(f"  ✗ Unknown site for URL: {url}")
+                    continue
+
+                print(f"-> Processing: {url}")
+
+                try:
+                    if site == "asura":
+                        from extractor.sites.asura import scrape
+                        scrape(url, data)
+
+                    elif site == "mgeko":
+                        from extractor.sites.mgeko import scrape
+                        scrape(url, data)
+
+                    # Match what the scraper wrote directly to the data keys
+                    series_id = _get_series_id_from_url(url, data)
+
+                    if series_id and series_id in data:
+                        # Support both nested structure and flat structure safely
+                        series_entry = data[series_id]
+                        if isinstance(series_entry, dict) and "chapters" in series_entry:
+                            chapters = series_entry["chapters"]
+                        else:
+                            chapters = series_entry
+
+                        if supabase:
+                            catch_up_series(supabase, publisher, sync_state, series_id, chapters)
+                    else:
+                        print(f"  ⚠ Could not resolve unique database ID for: {url}")
+
+                except Exception as e:
+                    print(f"  ✗ Failed entirely during extraction/upload: {e}")
+                    continue
+    finally:
+        if supabase:
+            # Shutdown: publish whatever is still queued before exiting
+            publisher.close()
+            remove_chapter_listener(publisher.publish)
+            supabase.close()
 
     # Critical: Save all updates down to disk at the end
     save_data(data)
     print(f"\n{'='*50}")
     print(f"All done! Data saved to chapter_data.json")
 
-    # Print clean diagnostic totals
-    total_chaps = 0
-    for v in data.values():
-        if isinstance(v, dict) and "chapters" in v:
-            total_chaps += len(v["chapters"])
-        else:
-            total_chaps += len(v)
+    # Print clean diagnostic totals — of what's on disk, from the store's index
+    store = open_readonly()
+    total_series, total_chaps = store.counts()
+    store.close()
 
-    print(f"Total series: {len(data)} | Total chapters: {total_chaps}")
+    print(f"Total series: {total_series} | Total chapters: {total_chaps}")
 
 
 def _get_series_id_from_url(url, data):
@@ -180,4 +224,11 @@ def _get_series_id_from_url(url, data):
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    workers = 1
+    if "--workers" in sys.argv:
+        try:
+            workers = int(sys.argv[sys.argv.index("--workers") + 1])
+        except (IndexError, ValueError):
+            print(__doc__)
+            sys.exit(1)
+    main(workers)
\ No newline at end of file
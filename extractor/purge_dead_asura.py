@@ -1,6 +1,7 @@
 #!/usr/bin/env python3
 """
 Detects and removes series that contain old Asura dead domain URLs (asuracomic.net).
+Runs the "dead-asura-domain" rule from audit_rules.json; edit the domains there.
 
 Good URL patterns to preserve:
   - cdn.asurascans.com/asura-images/chapters/
@@ -11,102 +12,50 @@ Usage:
 """
 
 import json
-import os
 import sys
 
-OUTPUT_FILE = "chapter_data.json"
+from shared.audit import find_rule, run_audit
+from shared.storage import OUTPUT_FILE, exists, load_data, open_readonly, save_data
 
-
-def load():
-    if not os.path.exists(OUTPUT_FILE):
-        print(f"✗ {OUTPUT_FILE} not found")
-        sys.exit(1)
-    with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
-
-
-def save(data):
-    tmp = OUTPUT_FILE + ".tmp"
-    with open(tmp, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2)
-    os.replace(tmp, OUTPUT_FILE)
-
-
-def is_dead_url(url: str) -> bool:
-    """
-    Returns True if the URL contains the old 'asuracomic.net' domain.
-    """
-    if not isinstance(url, str):
-        return False
-
-    # Target all old links containing asuracomic.net
-    if "asuracomic.net" in url:
-        return True
-
-    return False
-
-
-def check_series(series_id: str, series_data: dict) -> dict:
-    """
-    Check a series for dead URLs.
-    Returns info dict with dead chapter count and sample URLs.
-    """
-    chapters = series_data.get("chapters", {})
-    dead_chapters = []
-    sample_dead_url = None
-
-    for ch_id, pages in chapters.items():
-        if not isinstance(pages, list):
-            continue
-
-        # Check pages — if any page has an old link, flag the chapter
-        for url in pages:
-            if is_dead_url(url):
-                dead_chapters.append(ch_id)
-                if not sample_dead_url:
-                    sample_dead_url = url
-                break  # Move to the next chapter once a dead link is found
-
-    return {
-        "total_chapters": len(chapters),
-        "dead_chapters": len(dead_chapters),
-        "sample_dead_url": sample_dead_url,
-    }
+RULE = "dead-asura-domain"
 
 
 def main():
     dry_run = "--dry-run" in sys.argv
     target_series = [a for a in sys.argv[1:] if not a.startswith("--")]
 
-    data = load()
-    print(f"Loaded {len(data)} total series\n")
-
-    # Filter out other platforms explicitly, focus purely on tracking potential asura series
-    asura_series = {
-        k: v for k, v in data.items()
-        if not k.startswith("mgeko__")
-           and not k.startswith("vortex__")
-           and not k.startswith("manhwazone__")
-    }
+    if not exists():
+        print(f"✗ {OUTPUT_FILE} not found")
+        sys.exit(1)
+    # Scanned through the read-only store by the audit engine; the full
+    # catalog is only loaded if there's something to remove.
+    store = open_readonly()
+    series_ids = store.series_ids()
+    print(f"Loaded {len(series_ids)} total series\n")
 
     # If specific series IDs/names are given as command-line arguments, filter to those
     if target_series:
-        asura_series = {
-            k: v for k, v in asura_series.items()
-            if any(t.lower() in k.lower() for t in target_series)
-        }
-
-    dead_series = []
-    for series_id, series_data in sorted(asura_series.items()):
-        info = check_series(series_id, series_data)
-        if info["dead_chapters"] > 0:
-            dead_series.append((series_id, info))
+        series_ids = [k for k in series_ids if any(t.lower() in k.lower() for t in target_series)]
+
+    rule = find_rule(RULE)
+    domains = ", ".join(rule["domains"])
+    report = run_audit([rule], sorted(series_ids))
+    dead_series = {}
+    for finding in report["findings"]:
+        info = dead_series.setdefault(finding["series"], {
+            "total_chapters": store.chapter_count(finding["series"]),
+            "dead_chapters": 0,
+            "sample_dead_url": finding["sample"],
+        })
+        info["dead_chapters"] += 1
+    dead_series = list(dead_series.items())
+    store.close()
 
     if not dead_series:
-        print("✓ No series with old asuracomic.net links found.")
+        print(f"✓ No series with old {domains} links found.")
         return
 
-    print(f"Found {len(dead_series)} series containing 'asuracomic.net' links:\n")
+    print(f"Found {len(dead_series)} series containing {domains} links:\n")
     total_chapters = 0
     for series_id, info in dead_series:
         print(f"  {series_id}")
@@ -125,6 +74,8 @@ def main():
         print("Aborted.")
         return
 
+    data = load_data()
+
     # Backup original before modifying
     backup = OUTPUT_FILE + ".bak"
     with open(backup, "w", encoding="utf-8") as f:
@@ -135,7 +86,7 @@ def main():
         del data[series_id]
         print(f"  ✓ Removed {series_id} ({info['total_chapters']} chapters)")
 
-    save(data)
+    save_data(data)
     remaining = sum(len(v.get("chapters", {})) for v in data.values())
     print(f"\nDone. {len(data)} series remaining | {remaining} total chapters")
     print("\nNow re-extract the removed series using your main scraper!")
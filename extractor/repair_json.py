@@ -1,16 +1,19 @@
 #!/usr/bin/env python3
 """
-Repairs a broken chapter_data.json by truncating at the last valid entry.
+Repairs a broken chapter_data.json, keeping every complete chapter it can find.
 Run this once to fix the file, then run asura_extractor.py normally.
 """
 import json
 import sys
 import os
 
+from shared.pages import dump, encode_series, expand_series
+from shared.repair import repair_json
+
 INPUT_FILE = "chapter_data.json"
 BACKUP_FILE = "chapter_data.json.bak"
 
-def repair_json(filepath):
+def repair_file(filepath):
     print(f"Reading {filepath}...")
     with open(filepath, "r", encoding="utf-8") as f:
         raw = f.read()
@@ -24,25 +27,17 @@ def repair_json(filepath):
         print(f"JSON error at char {e.pos}: {e.msg}")
         print("Attempting repair...")
 
-    # Strategy: try progressively shorter strings until we get valid JSON
-    # Find the error position and work backwards to last clean closing brace
-    pos = len(raw)
-    while pos > 0:
-        pos -= 1
-        # Look for a closing structure
-        snippet = raw[:pos].rstrip()
-        # Try adding closing braces to make it valid
-        for suffix in ["}}}", "}}", "}", ""]:
-            candidate = snippet + suffix
-            try:
-                data = json.loads(candidate)
-                print(f"Repaired by truncating to position {pos} and adding '{suffix}'")
-                return data
-            except:
-                continue
+    # Keeps every complete chapter up to the damage, then picks up again at
+    # the next intact series (see shared/repair.py).
+    data, damaged = repair_json(raw)
+    if not data:
+        print("Could not repair automatically.")
+        return None
 
-    print("Could not repair automatically.")
-    return None
+    for series_id in damaged:
+        kept = len(data.get(series_id, {}).get("chapters", {}))
+        print(f"  ⚠ {series_id}: damaged, kept {kept} chapters")
+    return data
 
 if __name__ == "__main__":
     if not os.path.exists(INPUT_FILE):
@@ -54,10 +49,10 @@ if __name__ == "__main__":
     shutil.copy(INPUT_FILE, BACKUP_FILE)
     print(f"Backed up to {BACKUP_FILE}")
 
-    data = repair_json(INPUT_FILE)
+    data = repair_file(INPUT_FILE)
     if data:
         with open(INPUT_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+            dump({series_id: encode_series(expand_series(entry)) for series_id, entry in data.items()}, f)
         print(f"\nSaved repaired JSON to {INPUT_FILE}")
         total = sum(len(v.get("chapters", {})) for v in data.values())
         print(f"Series: {len(data)} | Total chapters: {total}")
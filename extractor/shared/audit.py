@@ -0,0 +1,258 @@
+import json
+import os
+import re
+from concurrent.futures import ProcessPoolExecutor
+
+from shared.pages import expand_pages
+from shared.storage import open_readonly
+
+# An audit is a list of rules, each a dict (see audit_rules.json):
+#
+#   {"name": "dead-asura", "type": "dead_domain", "domains": ["asuracomic.net"],
+#    "series": "^(?!mgeko__)", "action": "drop_series"}
+#
+#   type     dead_domain     a page is on one of `domains` (or a subdomain)
+#            pattern         a page doesn't start with the `url` regex
+#            duplicate_pages a chapter has the same page twice
+#            empty_chapter   a chapter has no pages
+#   series   optional regex; the rule only looks at series ids it matches
+#   action   what --apply does with a finding: report (nothing),
+#            drop_chapter, drop_series, dedupe (drop repeated pages)
+#
+# Each rule compiles to one check per chapter. The URL rules run a single
+# regex over the chapter's pages joined by newlines, so a chapter costs one
+# C-level search per rule instead of a Python loop over its URLs. Chapters
+# stored as URL templates (shared/pages.py) are only expanded when a rule
+# can't decide from the template itself.
+# Series are audited in worker processes, each reading its own read-only
+# store, one chapter at a time.
+
+ACTIONS = ("report", "drop_chapter", "drop_series", "dedupe")
+RULES_FILE = "audit_rules.json"
+
+
+def load_rules(path=RULES_FILE):
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def find_rule(name, path=RULES_FILE):
+    """One rule config from the rules file, by name."""
+    for config in load_rules(path):
+        if config.get("name") == name:
+            return config
+    raise KeyError(f"no rule named {name!r} in {path}")
+
+
+class Chapter:
+    """
+    One stored chapter as the rules see it. `stored` is the page list, or
+    its URL template when the store hands those out (MappedStore); the
+    expanded list and the newline-joined text are only built if a rule
+    asks for them.
+    """
+
+    __slots__ = ("stored", "_pages", "_joined")
+
+    def __init__(self, stored):
+        self.stored = stored
+        self._pages = None
+        self._joined = None
+
+    @property
+    def template(self):
+        return self.stored if isinstance(self.stored, dict) else None
+
+    @property
+    def pages(self):
+        if self._pages is None:
+            pages = expand_pages(self.stored)
+            self._pages = pages if isinstance(pages, list) else []
+        return self._pages
+
+    @property
+    def joined(self):
+        """ "\n" + the pages joined by "\n"."""
+        if self._joined is None:
+            try:
+                self._joined = "\n" + "\n".join(self.pages)
+            except TypeError:
+                self._joined = "\n" + "\n".join(url for url in self.pages if isinstance(url, str))
+        return self._joined
+
+
+class Rule:
+    __slots__ = ("name", "type", "action", "series", "check")
+
+    def __init__(self, config):
+        self.name = config.get("name") or config["type"]
+        self.type = config["type"]
+        self.action = config.get("action", "report")
+        if self.action not in ACTIONS:
+            raise ValueError(f"rule {self.name}: unknown action {self.action!r}")
+        self.series = re.compile(config["series"]) if config.get("series") else None
+
+        # Anchoring on a literal "\n" in Chapter.joined, rather than ^ with
+        # re.M, lets the regex engine skip from line to line instead of
+        # trying every character.
+        if self.type == "dead_domain":
+            # Schemes and hosts are case-insensitive, so neither the regex
+            # nor the substring test that rules out most chapters first may
+            # care how a URL was capitalized.
+            domains = [domain.lower() for domain in config["domains"]]
+            alternatives = "|".join(re.escape(domain) for domain in domains)
+            regex = re.compile(rf"\n([a-z][a-z0-9+.-]*://(?:[^/\n]*\.)?(?:{alternatives})(?=[:/\n]|$)[^\n]*)", re.IGNORECASE)
+            self.check = lambda chapter: _dead_domain(regex, domains, chapter)
+        elif self.type == "pattern":
+            regex = re.compile(rf"\n(?!(?:{config['url']}))([^\n]+)")
+            self.check = lambda chapter: _first(regex, chapter.joined)
+        elif self.type == "duplicate_pages":
+            self.check = _duplicate
+        elif self.type == "empty_chapter":
+            # Only lists of two or more pages are ever stored as templates.
+            self.check = lambda chapter: "" if chapter.template is None and not chapter.pages else None
+        else:
+            raise ValueError(f"rule {self.name}: unknown type {self.type!r}")
+
+    def applies_to(self, series_id):
+        return self.series is None or self.series.search(series_id) is not None
+
+
+def _first(regex, joined):
+    match = regex.search(joined)
+    return match.group(1) if match else None
+
+
+def _dead_domain(regex, domains, chapter):
+    template = chapter.template
+    if template is not None:
+        if "/" in template["t"][0].partition("://")[2]:
+            # The host is all in the fixed part, so every page has the same
+            # one: checking the first page settles the whole chapter.
+            number = template["r"][0] if "r" in template else template["i"][0]
+            first = expand_pages({"t": template["t"], "w": template.get("w", 0), "r": [number, 1]})[0]
+            return _first(regex, "\n" + first)
+    joined = chapter.joined
+    lowered = joined.lower()
+    if not any(domain in lowered for domain in domains):
+        return None
+    return _first(regex, joined)
+
+
+def _duplicate(chapter):
+    template = chapter.template
+    if template is not None:
+        if "r" in template:
+            return None  # a run of distinct numbers
+        indices = template["i"]
+        if len(set(indices)) == len(indices):
+            return None
+    pages = chapter.pages
+    if len(set(pages)) == len(pages):
+        return None
+    seen = set()
+    for url in pages:
+        if url in seen:
+            return url
+        seen.add(url)
+
+
+def compile_rules(configs):
+    return [Rule(config) for config in configs]
+
+
+def audit_series(store, series_id, rules):
+    """Findings for one series: [{"rule", "action", "series", "chapter", "sample"}, ...]."""
+    rules = [rule for rule in rules if rule.applies_to(series_id)]
+    if not rules:
+        return []
+    # MappedStore can hand out chapters still in their stored (template) form.
+    chapters = getattr(store, "iter_stored_chapters", store.iter_chapters)
+    findings = []
+    for chapter_id, stored in chapters(series_id):
+        chapter = Chapter(stored)
+        for rule in rules:
+            sample = rule.check(chapter)
+            if sample is not None:
+                findings.append({
+                    "rule": rule.name,
+                    "action": rule.action,
+                    "series": series_id,
+                    "chapter": chapter_id,
+                    "sample": sample,
+                })
+    return findings
+
+
+# ── Worker processes ──────────────────────────────────────────────────────────
+
+_worker_store = None
+_worker_rules = None
+
+
+def _init_worker(configs):
+    global _worker_store, _worker_rules
+    _worker_store = open_readonly()
+    _worker_rules = compile_rules(configs)
+
+
+def _audit_batch(series_ids):
+    return [finding for series_id in series_ids for finding in audit_series(_worker_store, series_id, _worker_rules)]
+
+
+def run_audit(configs, series_ids=None, jobs=None):
+    """
+    Audit the store against rule configs. series_ids limits it to those
+    series; jobs is the number of worker processes (default: one per CPU,
+    1 audits in this process). Returns the report:
+
+        {"rules": [...configs], "findings": [...], "summary": {rule: {"series": n, "chapters": n}}}
+    """
+    rules = compile_rules(configs)  # fail on a bad rule before starting any workers
+    store = open_readonly()
+    if series_ids is None:
+        series_ids = store.series_ids()
+    series_ids = [s for s in series_ids if any(rule.applies_to(s) for rule in rules)]
+    jobs = min(jobs or os.cpu_count() or 1, len(series_ids)) or 1
+
+    if jobs == 1:
+        findings = [finding for series_id in series_ids for finding in audit_series(store, series_id, rules)]
+        store.close()
+    else:
+        store.close()
+        # A few batches per worker, so one huge series doesn't leave the rest idle.
+        batches = [series_ids[i::jobs * 4] for i in range(jobs * 4)]
+        with ProcessPoolExecutor(jobs, initializer=_init_worker, initargs=(configs,)) as pool:
+            findings = [finding for batch in pool.map(_audit_batch, batches) for finding in batch]
+        order = {series_id: n for n, series_id in enumerate(series_ids)}
+        findings.sort(key=lambda finding: order[finding["series"]])
+
+    summary = {}
+    for rule in rules:
+        hits = [finding for finding in findings if finding["rule"] == rule.name]
+        summary[rule.name] = {"series": len({finding["series"] for finding in hits}), "chapters": len(hits)}
+    return {"rules": configs, "findings": findings, "summary": summary}
+
+
+def apply_report(data, report):
+    """
+    Carry out the findings' actions on `data` in place. Returns
+    {"series": removed, "chapters": removed, "deduped": chapters}.
+    """
+    done = {"series": 0, "chapters": 0, "deduped": 0}
+    for finding in report["findings"]:
+        series_id, chapter_id, action = finding["series"], finding["chapter"], finding["action"]
+        entry = data.get(series_id)
+        if entry is None or action == "report":
+            continue
+        chapters = entry.get("chapters", {})
+        if action == "drop_series":
+            del data[series_id]
+            done["series"] += 1
+        elif action == "drop_chapter" and chapter_id in chapters:
+            del chapters[chapter_id]
+            done["chapters"] += 1
+        elif action == "dedupe" and isinstance(chapters.get(chapter_id), list):
+            chapters[chapter_id] = list(dict.fromkeys(chapters[chapter_id]))
+            done["deduped"] += 1
+    return done
@@ -0,0 +1,222 @@
+import itertools
+import queue
+import random
+import threading
+import time
+
+from shared.driver import make_driver
+from shared.storage import save_chapter
+
+# Scrapes many series at once with a fixed pool of browsers, instead of each
+# site's scrape() launching Chrome for one series at a time.
+#
+# Work is a queue of tasks that any worker can take:
+#   list   open a series page, find its new chapters, and queue them as
+#          fetch tasks of up to CHAPTERS_PER_TASK chapters each
+#   fetch  scrape those chapters and save_chapter() each one
+# so a series with hundreds of new chapters is spread over every worker
+# rather than pinning one. Fetch tasks go ahead of list tasks, which
+# finishes (and publishes) series sooner.
+#
+# Each worker keeps its browser between tasks (one per HEADLESS setting it
+# has needed) and restarts it on a block or a crash, the way the sites'
+# own loops do. At most PER_SITE workers are on the same site at a time,
+# so running in parallel doesn't get us rate limited.
+WORKERS = 3
+PER_SITE = 2
+CHAPTERS_PER_TASK = 20
+# Chapters a browser fetches before a cooldown, as in the sites' loops.
+COOLDOWN_EVERY = 50
+COOLDOWN_SECONDS = 30
+DEAD_SESSION = (
+    "no such window",
+    "target window already closed",
+    "web view not found",
+    "invalid session id",
+    "chrome not reachable",
+)
+
+LIST, FETCH = 1, 0  # task priorities: lower runs first
+
+# undetected_chromedriver patches its chromedriver binary whenever a driver
+# starts; two starting at once can clobber each other's copy.
+_driver_lock = threading.Lock()
+
+
+def _new_driver(headless):
+    with _driver_lock:
+        return make_driver(headless=headless)
+
+
+def _quit(driver):
+    try:
+        driver.quit()
+    except Exception:
+        pass
+
+
+class _Browsers:
+    """One worker's browsers, started on first use."""
+
+    def __init__(self):
+        self.drivers = {}
+        self.fetched = 0
+
+    def get(self, headless):
+        if headless not in self.drivers:
+            self.drivers[headless] = _new_driver(headless)
+        return self.drivers[headless]
+
+    def restart(self, headless, wait=0):
+        driver = self.drivers.pop(headless, None)
+        if driver is not None:
+            _quit(driver)
+        time.sleep(wait)
+        return self.get(headless)
+
+    def quit(self):
+        for driver in self.drivers.values():
+            _quit(driver)
+        self.drivers.clear()
+
+
+class BrowserPool:
+    """
+    jobs = [(site_module, series_url), ...]; run(data) scrapes them all into
+    `data` (through save_chapter, so they're persisted and published as they
+    come) and returns {series_id: {"fetched": n, "failed": [chapter_id, ...]}}.
+    """
+
+    def __init__(self, jobs, workers=WORKERS, per_site=PER_SITE, chapters_per_task=CHAPTERS_PER_TASK):
+        self.jobs = jobs
+        self.workers = workers
+        self.chapters_per_task = chapters_per_task
+        self._per_site = per_site
+        self._sites = {}  # site module -> Semaphore
+        self._tasks = queue.PriorityQueue()
+        self._order = itertools.count()
+        self._lock = threading.Lock()
+        self.results = {}
+
+    def _put(self, priority, task):
+        self._tasks.put((priority, next(self._order), task))
+
+    def run(self, data):
+        for site, series_url in self.jobs:
+            self._sites.setdefault(site, threading.Semaphore(self._per_site))
+            self._put(LIST, ("list", site, series_url))
+
+        threads = [
+            threading.Thread(target=self._work, args=(n + 1, data), name=f"browser-{n + 1}", daemon=True)
+            for n in range(self.workers)
+        ]
+        for thread in threads:
+            thread.start()
+        self._tasks.join()
+        for _ in threads:
+            self._put(LIST + 1, None)
+        for thread in threads:
+            thread.join()
+        return self.results
+
+    # ── Workers ───────────────────────────────────────────────────────────────
+
+    def _work(self, number, data):
+        browsers = _Browsers()
+        try:
+            while True:
+                _, _, task = self._tasks.get()
+                if task is None:
+                    self._tasks.task_done()
+                    return
+                site = task[1]
+                if not self._sites[site].acquire(blocking=False):
+                    # Site is at its limit; leave this for later and take something
+                    # else. (Requeued before task_done, so join() can't see zero.)
+                    self._put(LIST if task[0] == "list" else FETCH, task)
+                    self._tasks.task_done()
+                    time.sleep(0.5)
+                    continue
+                try:
+                    if task[0] == "list":
+                        self._list(number, browsers, data, *task[1:])
+                    else:
+                        self._fetch(number, browsers, data, *task[1:])
+                except Exception as e:
+                    print(f"  [w{number}] ✗ {task[0]} failed: {e}")
+                finally:
+                    self._sites[site].release()
+                    self._tasks.task_done()
+        finally:
+            browsers.quit()
+
+    def _list(self, number, browsers, data, site, series_url):
+        series_id = site.get_series_id(series_url)
+        if not series_id:
+            print(f"  [w{number}] ✗ Could not parse series ID from {series_url}")
+            return
+        with self._lock:
+            entry = data.setdefault(series_id, {"chapters": {}})
+            existing = set(entry.setdefault("chapters", {}))
+            self.results.setdefault(series_id, {"fetched": 0, "failed": []})
+
+        all_chapters = site.get_all_chapters(browsers.get(site.HEADLESS), series_url)
+        # Sites whose series page can come back empty on a soft block (mgeko's
+        # Cloudflare check) set RETRY_EMPTY_LIST: wait that long and list once more.
+        retry_wait = getattr(site, "RETRY_EMPTY_LIST", 0)
+        if not all_chapters and retry_wait:
+            print(f"  [w{number}] ⚠ {series_id}: no chapters found — waiting {retry_wait}s and retrying...")
+            time.sleep(retry_wait)
+            all_chapters = site.get_all_chapters(browsers.get(site.HEADLESS), series_url)
+        new_chapters = [ch for ch in all_chapters if ch["id"] not in existing]
+        print(f"  [w{number}] {series_id}: {len(all_chapters)} on site | {len(new_chapters)} new")
+        for i in range(0, len(new_chapters), self.chapters_per_task):
+            self._put(FETCH, ("fetch", site, series_id, new_chapters[i:i + self.chapters_per_task]))
+
+    def _fetch(self, number, browsers, data, site, series_id, chapters):
+        for ch in chapters:
+            pages = self._chapter_pages(number, browsers, site, ch)
+            with self._lock:
+                result = self.results[series_id]
+                if pages:
+                    result["fetched"] += 1
+                else:
+                    result["failed"].append(ch["id"])
+            if pages:
+                save_chapter(data, series_id, ch["id"], pages)
+                print(f"  [w{number}] {series_id} Ch.{ch['id']} ✓ {len(pages)} pages")
+            else:
+                print(f"  [w{number}] {series_id} Ch.{ch['id']} ✗ failed after {site.MAX_RETRIES} attempts")
+
+            browsers.fetched += 1
+            if browsers.fetched % COOLDOWN_EVERY == 0:
+                print(f"  [w{number}] 💤 Cooldown after {browsers.fetched} chapters ({COOLDOWN_SECONDS}s)...")
+                time.sleep(COOLDOWN_SECONDS)
+            else:
+                time.sleep(random.uniform(*site.DELAY_BETWEEN_CHAPTERS))
+
+    def _chapter_pages(self, number, browsers, site, ch):
+        """
+        The sites' retry loop: restart on a block with backoff, restart on a
+        crash, and count no pages (a soft block or images that didn't load)
+        as a failed attempt.
+        """
+        for attempt in range(1, site.MAX_RETRIES + 1):
+            try:
+                pages = site.get_chapter_pages(browsers.get(site.HEADLESS), ch)
+                if not pages:
+                    raise ValueError("0 pages returned")
+                return pages
+            except ConnectionError as e:
+                print(f"  [w{number}] ⚠ Ch.{ch['id']} attempt {attempt}/{site.MAX_RETRIES} blocked: {e}")
+                if attempt < site.MAX_RETRIES:
+                    browsers.restart(site.HEADLESS, site.RETRY_BACKOFF * attempt + random.uniform(5, 15))
+            except Exception as e:
+                if any(msg in str(e) for msg in DEAD_SESSION):
+                    print(f"  [w{number}] ⚠ Chrome window crashed — restarting driver...")
+                    browsers.restart(site.HEADLESS, random.uniform(8, 15))
+                    continue
+                print(f"  [w{number}] ✗ Ch.{ch['id']} attempt {attempt}/{site.MAX_RETRIES} error: {e}")
+                if attempt < site.MAX_RETRIES:
+                    time.sleep(5)
+        return None
@@ -0,0 +1,276 @@
+import json
+import mmap
+import os
+
+from shared.pages import dumps, expand_pages, expand_series
+from shared.repair import _comma, _decoder, _key, _skip
+
+# chapter_data.json.idx, written next to every snapshot save_json() writes.
+# The first line is the header:
+#
+#   {"size": ..., "mtime_ns": ...,      the snapshot it describes
+#    "series": [[series_id, start, end, chapters, at, to], ...]}
+#
+# start:end is the series entry's byte range in the snapshot, `chapters` its
+# chapter count, and at:to (counted from the end of the header line) where
+# in the .idx its chapter ranges are: one JSON line [[chapter_id, start,
+# end], ...] per series. So listing or counting reads only the header, and
+# a series' chapter ranges are read the first time it's touched. Tools that
+# only count or scan mmap the snapshot and decode just the slices they need
+# instead of json.load()ing the whole catalog.
+INDEX_SUFFIX = ".idx"
+
+
+def write_snapshot(f, data):
+    """
+    Write `data` (already encode_series()'d) to binary file f as minified
+    JSON, the same as shared.pages.dump; returns its offset index.
+    """
+    index = []
+    pos = 0
+
+    def put(chunk):
+        nonlocal pos
+        f.write(chunk)
+        pos += len(chunk)
+
+    put(b"{")
+    for n, (series_id, entry) in enumerate(data.items()):
+        put((b"," if n else b"") + dumps(series_id).encode() + b":")
+        start = pos
+        chapters = entry.get("chapters") if isinstance(entry, dict) else None
+        chapter_index = []
+        if not isinstance(chapters, dict):
+            put(dumps(entry).encode())
+        else:
+            put(b'{"chapters":{')
+            for m, (chapter_id, pages) in enumerate(chapters.items()):
+                put((b"," if m else b"") + dumps(chapter_id).encode() + b":")
+                chapter_start = pos
+                put(dumps(pages).encode())
+                chapter_index.append([chapter_id, chapter_start, pos])
+            put(b"}")
+            for key, value in entry.items():
+                if key != "chapters":
+                    put(b"," + dumps(key).encode() + b":" + dumps(value).encode())
+            put(b"}")
+        index.append([series_id, start, pos, chapter_index])
+    put(b"}")
+    return index
+
+
+def write_index(path, index):
+    """index as returned by write_snapshot() / scan_index()."""
+    stat = os.stat(path)
+    header = []
+    lines = []
+    at = 0
+    for series_id, start, end, chapters in index:
+        line = json.dumps(chapters, separators=(",", ":")).encode() + b"\n"
+        header.append([series_id, start, end, len(chapters), at, at + len(line)])
+        lines.append(line)
+        at += len(line)
+    tmp = path + INDEX_SUFFIX + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(json.dumps({"size": stat.st_size, "mtime_ns": stat.st_mtime_ns, "series": header}).encode() + b"\n")
+        f.writelines(lines)
+    os.replace(tmp, path + INDEX_SUFFIX)
+
+
+def scan_index(raw):
+    """The offset index of snapshot text `raw` (any JSON layout), in bytes. Stops at the first damage."""
+    if raw.isascii():
+        to_byte = int
+    else:
+        # Character -> byte offsets; the scan only ever moves forward.
+        last = [0, 0]
+
+        def to_byte(char):
+            last[1] += len(raw[last[0]:char].encode("utf-8"))
+            last[0] = char
+            return last[1]
+
+    index = []
+    pos = _skip(raw, 0)
+    if raw[pos:pos + 1] != "{":
+        return index
+    pos += 1
+    try:
+        while True:
+            pos = _skip(raw, pos)
+            if pos >= len(raw) or raw[pos] == "}":
+                return index
+            series_id, pos = _key(raw, pos)
+            start = to_byte(pos)
+            chapter_index = []
+            if raw[pos:pos + 1] != "{":
+                _, pos = _decoder.raw_decode(raw, pos)
+            else:
+                pos += 1
+                while True:
+                    pos = _skip(raw, pos)
+                    if raw[pos:pos + 1] == "}":
+                        pos += 1
+                        break
+                    key, pos = _key(raw, pos)
+                    if key == "chapters" and raw[pos:pos + 1] == "{":
+                        pos += 1
+                        while True:
+                            pos = _skip(raw, pos)
+                            if raw[pos:pos + 1] == "}":
+                                pos += 1
+                                break
+                            chapter_id, pos = _key(raw, pos)
+                            chapter_start = to_byte(pos)
+                            _, pos = _decoder.raw_decode(raw, pos)
+                            chapter_index.append([chapter_id, chapter_start, to_byte(pos)])
+                            pos = _comma(raw, pos)
+                    else:
+                        _, pos = _decoder.raw_decode(raw, pos)
+                    pos = _comma(raw, pos)
+            index.append([series_id, start, to_byte(pos), chapter_index])
+            pos = _comma(raw, pos)
+    except ValueError:
+        print("  ⚠ chapter_data.json is damaged past this point; run repair_json.py")
+        return index
+
+
+class MappedStore:
+    """
+    Read-only, lazily decoded view of chapter_data.json (plus its journal):
+    the snapshot is mmap'd and only the series / chapters asked for are
+    decoded. The offset index comes from the .idx file when it matches the
+    snapshot, else from one scan, which is then saved for next time.
+
+    Has the read side of the other stores (series_ids, get_series, counts)
+    plus chapter_count / chapter_ids / get_pages / iter_chapters.
+    """
+
+    def __init__(self, path, journal=None):
+        self.path = path
+        self._file = None
+        self._index_file = None
+        self._buf = b""
+        self._series = {}    # series_id -> [start, end, chapters, at, to]
+        self._chapters = {}  # series_id -> {chapter_id: (start, end)}, as they're touched
+        if os.path.exists(path) and os.path.getsize(path):
+            self._file = open(path, "rb")
+            self._buf = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._open_index()
+        self._journal = self._read_journal(journal) if journal else {}
+
+    def _open_index(self):
+        stat = os.fstat(self._file.fileno())
+        try:
+            f = open(self.path + INDEX_SUFFIX, "rb")
+            try:
+                header = json.loads(f.readline())
+                if header["size"] == stat.st_size and header["mtime_ns"] == stat.st_mtime_ns:
+                    self._series = {entry[0]: entry[1:] for entry in header["series"]}
+                    self._index_file, self._base = f, f.tell()
+                    return
+            except (ValueError, KeyError, TypeError, IndexError):
+                pass
+            f.close()
+        except OSError:
+            pass
+
+        index = scan_index(self._buf[:].decode("utf-8"))
+        self._series = {series_id: [start, end, len(chapters), 0, 0] for series_id, start, end, chapters in index}
+        self._chapters = {
+            series_id: {chapter_id: (s, e) for chapter_id, s, e in chapters}
+            for series_id, _, _, chapters in index
+        }
+        try:
+            write_index(self.path, index)
+        except OSError:
+            pass
+
+    def _chapter_ranges(self, series_id):
+        ranges = self._chapters.get(series_id)
+        if ranges is None:
+            if series_id not in self._series:
+                return {}
+            _, _, _, at, to = self._series[series_id]
+            self._index_file.seek(self._base + at)
+            chapters = json.loads(self._index_file.read(to - at))
+            ranges = self._chapters[series_id] = {chapter_id: (s, e) for chapter_id, s, e in chapters}
+        return ranges
+
+    @staticmethod
+    def _read_journal(path):
+        chapters = {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                        chapters.setdefault(entry["series"], {})[entry["chapter"]] = entry["pages"]
+                    except (json.JSONDecodeError, KeyError, TypeError):
+                        continue
+        except FileNotFoundError:
+            pass
+        return chapters
+
+    def close(self):
+        if self._file is not None:
+            self._buf.close()
+            self._file.close()
+            self._file = None
+        if self._index_file is not None:
+            self._index_file.close()
+            self._index_file = None
+
+    # ── Read API ──────────────────────────────────────────────────────────────
+
+    def series_ids(self):
+        return list(self._series) + [s for s in self._journal if s not in self._series]
+
+    def chapter_ids(self, series_id):
+        indexed = self._chapter_ranges(series_id)
+        journaled = self._journal.get(series_id, {})
+        return list(indexed) + [c for c in journaled if c not in indexed]
+
+    def chapter_count(self, series_id):
+        if series_id not in self._journal:
+            return self._series[series_id][2] if series_id in self._series else 0
+        return len(self.chapter_ids(series_id))
+
+    def counts(self):
+        series_ids = self.series_ids()
+        return len(series_ids), sum(self.chapter_count(s) for s in series_ids)
+
+    def get_pages(self, series_id, chapter_id):
+        journaled = self._journal.get(series_id, {})
+        if chapter_id in journaled:
+            return expand_pages(journaled[chapter_id])
+        start, end = self._chapter_ranges(series_id)[chapter_id]
+        return expand_pages(json.loads(self._buf[start:end]))
+
+    def iter_chapters(self, series_id):
+        # Scanning a whole series: one decode of its slice beats one per chapter.
+        yield from (self.get_series(series_id) or {}).get("chapters", {}).items()
+
+    def iter_stored_chapters(self, series_id):
+        """Like iter_chapters, but pages come as stored: URL templates are left unexpanded."""
+        journaled = self._journal.get(series_id, {})
+        if series_id in self._series:
+            start, end = self._series[series_id][:2]
+            entry = json.loads(self._buf[start:end])
+            chapters = entry.get("chapters") if isinstance(entry, dict) else None
+            for chapter_id, pages in (chapters if isinstance(chapters, dict) else {}).items():
+                if chapter_id not in journaled:
+                    yield chapter_id, pages
+        yield from journaled.items()
+
+    def get_series(self, series_id):
+        if series_id in self._series:
+            start, end = self._series[series_id][:2]
+            entry = expand_series(json.loads(self._buf[start:end]))
+        elif series_id in self._journal:
+            entry = {"chapters": {}}
+        else:
+            return None
+        for chapter_id, pages in self._journal.get(series_id, {}).items():
+            entry.setdefault("chapters", {})[chapter_id] = expand_pages(pages)
+        return entry
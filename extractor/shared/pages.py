@@ -0,0 +1,102 @@
+import json
+import os
+
+# How a chapter's page list is stored. Most chapters are the same URL with a
+# counter in it:
+#
+#   https://cdn.asurascans.com/asura-images/chapters/<series>/<ch>/001.webp
+#   https://cdn.asurascans.com/asura-images/chapters/<series>/<ch>/002.webp
+#   ...
+#
+# so on disk that becomes
+#
+#   {"t": ["https://cdn.asurascans.com/.../<ch>/", ".webp"], "w": 3, "r": [1, 42]}
+#
+# t = the text before and after the number, w = zero-padded width (omitted
+# when unpadded), r = [first, count] for a consecutive run, or i = [n, ...]
+# otherwise. Anything that doesn't round-trip exactly stays a plain list.
+# Everything in memory is always the plain list; only files see the encoding.
+
+DIGITS = "0123456789"
+
+# Send the encoded form in Supabase `pages` too. Needs a jsonb column; the
+# api/*-chapters.js handlers expand it (see api/_lib/pages.js).
+COMPACT_UPLOADS = os.environ.get("SUPABASE_COMPACT_PAGES") == "1"
+
+
+def encode_pages(pages):
+    if not isinstance(pages, list) or len(pages) < 2 or not all(isinstance(url, str) for url in pages):
+        return pages
+
+    # Digits every URL shares at the edge of the number belong to the number.
+    prefix = os.path.commonprefix(pages).rstrip(DIGITS)
+    tails = [url[len(prefix):] for url in pages]
+    suffix = os.path.commonprefix([tail[::-1] for tail in tails])[::-1].lstrip(DIGITS)
+    numbers = [tail[:len(tail) - len(suffix)] for tail in tails]
+    if not all(number.isascii() and number.isdigit() for number in numbers):
+        return pages
+
+    width = len(numbers[0]) if any(len(number) > 1 and number[0] == "0" for number in numbers) else 0
+    indices = [int(number) for number in numbers]
+    if [f"{prefix}{str(i).zfill(width)}{suffix}" for i in indices] != pages:
+        return pages
+
+    encoded = {"t": [prefix, suffix]}
+    if width:
+        encoded["w"] = width
+    if indices == list(range(indices[0], indices[0] + len(indices))):
+        encoded["r"] = [indices[0], len(indices)]
+    else:
+        encoded["i"] = indices
+    return encoded
+
+
+def expand_pages(value):
+    if not isinstance(value, dict):
+        return value
+    prefix, suffix = value["t"]
+    width = value.get("w", 0)
+    if "r" in value:
+        start, count = value["r"]
+        indices = range(start, start + count)
+    else:
+        indices = value["i"]
+    return [f"{prefix}{str(i).zfill(width)}{suffix}" for i in indices]
+
+
+def encode_series(entry):
+    chapters = entry.get("chapters")
+    if not isinstance(chapters, dict):
+        return entry
+    return {**entry, "chapters": {chapter_id: encode_pages(pages) for chapter_id, pages in chapters.items()}}
+
+
+def expand_series(entry):
+    """In place; returns entry."""
+    chapters = entry.get("chapters") if isinstance(entry, dict) else None
+    if isinstance(chapters, dict):
+        for chapter_id, pages in chapters.items():
+            if isinstance(pages, dict):
+                chapters[chapter_id] = expand_pages(pages)
+    return entry
+
+
+def expand_data(data):
+    """In place; returns data."""
+    for entry in data.values():
+        expand_series(entry)
+    return data
+
+
+def dump(obj, f):
+    """Minified JSON; pass it encode_series()'d data."""
+    json.dump(obj, f, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(obj):
+    return json.dumps(obj, ensure_ascii=False, separators=(",", ":"))
+
+
+def payload_pages(pages):
+    """`pages` as sent to Supabase."""
+    return encode_pages(pages) if COMPACT_UPLOADS else pages
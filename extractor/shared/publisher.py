@@ -0,0 +1,100 @@
+import queue
+import threading
+import time
+
+# Publishes chapters to Supabase while the scrapers are still running:
+# save_chapter() hands each chapter to publish() (see
+# storage.add_chapter_listener), and a background thread uploads whatever
+# has queued up every FLUSH_SECONDS, so a new chapter is readable seconds
+# after it's scraped rather than when its whole series is done.
+#
+# The queue is bounded: if uploads fall behind, publish() blocks and the
+# scraper waits for them. An upload that fails is logged and left to the
+# catch-up upload after each series (its chapters are still unsynced in the
+# SyncState), so one bad batch never stalls scraping.
+QUEUE_SIZE = 500
+FLUSH_SECONDS = 2.0
+BATCH_ROWS = 200
+
+_STOP = object()
+
+
+class Publisher:
+    def __init__(self, uploader, state, queue_size=QUEUE_SIZE, flush_seconds=FLUSH_SECONDS, batch_rows=BATCH_ROWS):
+        self.uploader = uploader
+        self.state = state
+        self.flush_seconds = flush_seconds
+        self.batch_rows = batch_rows
+        self.published = 0
+        self._queue = queue.Queue(queue_size)
+        self._thread = threading.Thread(target=self._run, name="publisher", daemon=True)
+        self._thread.start()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def publish(self, series_id, chapter_id, pages):
+        """Queue one chapter; blocks while the queue is full."""
+        while self._thread.is_alive():
+            try:
+                self._queue.put((series_id, chapter_id, pages), timeout=1)
+                return
+            except queue.Full:
+                continue
+        # The thread is gone; the chapter stays unsynced for the catch-up.
+
+    def flush(self):
+        """Wait until everything queued so far has been uploaded (or failed)."""
+        # Not a plain Queue.join(): if the thread were ever gone, that would
+        # wait forever on items nobody is left to mark done.
+        with self._queue.all_tasks_done:
+            while self._queue.unfinished_tasks and self._thread.is_alive():
+                self._queue.all_tasks_done.wait(timeout=1)
+
+    def close(self):
+        """Upload what's left, stop the thread and save the sync state."""
+        if self._thread.is_alive():
+            self._queue.put(_STOP)
+            self._thread.join()
+        self.state.save()
+
+    def _run(self):
+        stop = False
+        while not stop:
+            item = self._queue.get()
+            items = [item]
+            # Gather what else arrives in the next FLUSH_SECONDS into one upload.
+            deadline = time.monotonic() + self.flush_seconds
+            while item is not _STOP and len(items) < self.batch_rows:
+                try:
+                    item = self._queue.get(timeout=max(0, deadline - time.monotonic()))
+                except queue.Empty:
+                    break
+                items.append(item)
+            stop = items[-1] is _STOP
+            chapters = [item for item in items if item is not _STOP]
+            try:
+                self._upload(chapters)
+            finally:
+                for _ in items:
+                    self._queue.task_done()
+
+    def _upload(self, chapters):
+        # Any failure is logged and left to the catch-up; the thread must
+        # outlive it, or publish() and flush() would have no one to drain the queue.
+        try:
+            by_series = {}
+            for series_id, chapter_id, pages in chapters:
+                by_series.setdefault(series_id, {})[chapter_id] = pages
+            rows = [row for series_id, chapters in by_series.items() for row in self.state.changed_rows(series_id, chapters)]
+            if not rows:
+                return
+            uploaded = self.uploader.upload(rows, on_batch=self.state.mark_synced)
+        except Exception as e:  # UploadError, or anything from the state
+            print(f"  ✗ Live upload of {len(chapters)} chapters failed: {type(e).__name__}: {e}")
+            return
+        self.published += uploaded
+        print(f"  ☁ Published {uploaded} chapters")
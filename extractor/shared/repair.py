@@ -0,0 +1,115 @@
+import json
+import re
+
+# Salvages what it can from a truncated or partly corrupted chapter_data.json:
+#
+#   { "<series>": { "chapters": { "<chapter>": [url, ...], ... }, ... }, ... }
+#
+# One pass, front to back. Each series value is handed to the C decoder as a
+# whole; only when that fails is the series walked chapter by chapter, keeping
+# every complete chapter before the damage. Then it skips ahead to the next
+# `"<id>": {"chapters"` and carries on, so one bad series doesn't take the ones
+# after it along. Every byte is decoded at most a couple of times, against the
+# old approach of re-parsing the whole file once per character trimmed off.
+
+_decoder = json.JSONDecoder()
+_WS = re.compile(r"\s*")
+# Where a series entry starts. Scrapers always write "chapters" first.
+_SERIES_START = re.compile(r'"(?:[^"\\]|\\.)*"\s*:\s*(?=\{\s*"chapters"\s*:)')
+
+
+def _skip(raw, pos):
+    return _WS.match(raw, pos).end()
+
+
+def _key(raw, pos):
+    """The object key at pos and the position of its value; ValueError if there isn't one."""
+    if raw[pos:pos + 1] != '"':
+        raise ValueError(f"expected a key at char {pos}")
+    key, pos = _decoder.raw_decode(raw, pos)
+    pos = _skip(raw, pos)
+    if raw[pos:pos + 1] != ":":
+        raise ValueError(f"expected ':' at char {pos}")
+    return key, _skip(raw, pos + 1)
+
+
+def _comma(raw, pos):
+    pos = _skip(raw, pos)
+    return pos + 1 if raw[pos:pos + 1] == "," else pos
+
+
+def salvage_series(raw, pos=0):
+    """
+    The series entry at raw[pos:], keeping every complete chapter (and other
+    key) before the first damage. Returns (entry, pos where parsing stopped).
+    """
+    entry = {}
+    pos = _skip(raw, pos)
+    if raw[pos:pos + 1] != "{":
+        return entry, pos
+    pos += 1
+    try:
+        while True:
+            pos = _skip(raw, pos)
+            if raw[pos:pos + 1] == "}":
+                return entry, pos + 1
+            key, pos = _key(raw, pos)
+            if key == "chapters" and raw[pos:pos + 1] == "{":
+                chapters = entry["chapters"] = {}
+                pos += 1
+                while True:
+                    pos = _skip(raw, pos)
+                    if raw[pos:pos + 1] == "}":
+                        pos += 1
+                        break
+                    chapter_id, pos = _key(raw, pos)
+                    chapters[chapter_id], pos = _decoder.raw_decode(raw, pos)
+                    pos = _comma(raw, pos)
+            else:
+                entry[key], pos = _decoder.raw_decode(raw, pos)
+            pos = _comma(raw, pos)
+    except ValueError:  # json.JSONDecodeError included
+        return entry, pos
+
+
+def repair_json(raw):
+    """
+    Recover chapter data from a damaged chapter_data.json. Returns
+    (data, damaged): everything salvaged, and the ids of series that were
+    cut short (or dropped, if nothing of them survived). data is None if the
+    text isn't a JSON object at all.
+    """
+    pos = _skip(raw, 0)
+    if raw[pos:pos + 1] != "{":
+        return None, []
+    pos += 1
+
+    data = {}
+    damaged = []
+    while True:
+        pos = _skip(raw, pos)
+        if pos >= len(raw) or raw[pos] == "}":
+            break
+        start = pos
+        try:
+            series_id, pos = _key(raw, pos)
+        except ValueError:
+            series_id = None
+        if series_id is not None:
+            try:
+                data[series_id], pos = _decoder.raw_decode(raw, pos)
+                pos = _comma(raw, pos)
+                continue
+            except ValueError:
+                entry, pos = salvage_series(raw, pos)
+                if entry.get("chapters"):
+                    data[series_id] = entry
+                damaged.append(series_id)
+
+        # Resynchronise on the next series after the damage.
+        match = _SERIES_START.search(raw, max(pos, start + 1))
+        if match is None:
+            break
+        pos = match.start()
+
+    return data, damaged
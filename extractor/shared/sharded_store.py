@@ -0,0 +1,224 @@
+import contextlib
+import hashlib
+import json
+import os
+import time
+from urllib.parse import quote, unquote
+
+from shared.pages import dump, encode_series, expand_series
+from shared.repair import salvage_series
+
+DATA_DIR = "data"
+MANIFEST_FILE = "manifest.json"
+# Series files live apart from the manifest, so no series id can name it.
+SERIES_DIR = "series"
+# A lock file older than this is left over from a crashed process.
+STALE_LOCK = 120
+
+
+def _digest(entry):
+    return hashlib.sha1(json.dumps(entry, separators=(",", ":")).encode()).hexdigest()
+
+
+@contextlib.contextmanager
+def _file_lock(path, timeout=60):
+    """Exclusive across threads and processes, via O_EXCL on path + ".lock"."""
+    lock = path + ".lock"
+    deadline = time.time() + timeout
+    while True:
+        try:
+            fd = os.open(lock, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            break
+        except FileExistsError:
+            try:
+                if time.time() - os.path.getmtime(lock) > STALE_LOCK:
+                    os.remove(lock)
+                    continue
+            except FileNotFoundError:
+                continue
+            if time.time() > deadline:
+                raise TimeoutError(f"{lock} is held by another process")
+            time.sleep(0.05)
+    try:
+        yield
+    finally:
+        os.close(fd)
+        os.remove(lock)
+
+
+def _write_json(path, obj):
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        dump(obj, f)
+    for attempt in range(20):
+        try:
+            os.replace(tmp, path)
+            return
+        except PermissionError:
+            time.sleep(0.5 * (attempt + 1))  # Windows: a reader still has it open
+    os.replace(tmp, path)
+
+
+class ShardedStore:
+    """
+    One file per series, data/series/<series_id>.json, holding that series'
+    entry ({"chapters": {...}}), plus data/manifest.json mapping each series
+    to its file and chapter count.
+
+    Writing a chapter rewrites only its series' file, under a lock on that
+    file alone, so extractor processes working on different series never
+    wait on each other; a corrupt file costs one series, not the catalog.
+    The manifest is only rewritten when a series appears, disappears or
+    changes its chapter count.
+
+    save_data(data) only writes series this process changed since it loaded
+    or wrote them, and only deletes series it loaded, so a final save can't
+    clobber series another process scraped in the meantime.
+    """
+
+    def __init__(self, directory=DATA_DIR):
+        self.directory = directory
+        self.manifest_path = os.path.join(directory, MANIFEST_FILE)
+        self.series_dir = os.path.join(directory, SERIES_DIR)
+        self._seen = {}  # series_id -> digest of the entry as last read or written here
+        os.makedirs(self.series_dir, exist_ok=True)
+
+    def _path(self, series_id):
+        return os.path.join(self.series_dir, quote(series_id, safe="-_.") + ".json")
+
+    # ── Manifest ──────────────────────────────────────────────────────────────
+
+    def manifest(self):
+        """{series_id: {"file": ..., "chapters": n}}, rebuilt from the files if missing or unreadable."""
+        try:
+            with open(self.manifest_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except FileNotFoundError:
+            if not any(name.endswith(".json") for name in os.listdir(self.series_dir)):
+                return {}
+        except json.JSONDecodeError:
+            print(f"  ⚠ {self.manifest_path} is corrupt, rebuilding it")
+        return self.rebuild_manifest()
+
+    def rebuild_manifest(self):
+        manifest = {}
+        for name in sorted(os.listdir(self.series_dir)):
+            if not name.endswith(".json"):
+                continue
+            series_id = unquote(name[:-len(".json")])
+            entry = self._read(series_id)
+            if entry is not None:
+                manifest[series_id] = {"file": name, "chapters": len(entry.get("chapters", {}))}
+        with _file_lock(self.manifest_path):
+            _write_json(self.manifest_path, manifest)
+        return manifest
+
+    def _update_manifest(self, series_id, entry):
+        with _file_lock(self.manifest_path):
+            try:
+                with open(self.manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (FileNotFoundError, json.JSONDecodeError):
+                manifest = {}
+            if entry is None:
+                info = None
+            else:
+                info = {
+                    "file": os.path.basename(self._path(series_id)),
+                    "chapters": len(entry.get("chapters", {})),
+                }
+            if manifest.get(series_id) == info:
+                return
+            if info is None:
+                manifest.pop(series_id)
+            else:
+                manifest[series_id] = info
+            _write_json(self.manifest_path, manifest)
+
+    # ── Series files ──────────────────────────────────────────────────────────
+
+    def _read(self, series_id):
+        path = self._path(series_id)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return expand_series(json.load(f))
+        except FileNotFoundError:
+            return None
+        except json.JSONDecodeError as e:
+            with open(path, "r", encoding="utf-8") as f:
+                entry, _ = salvage_series(f.read())
+            expand_series(entry)
+            kept = len(entry.get("chapters", {}))
+            print(f"  ⚠ {path} is corrupt (char {e.pos}): {e.msg} — kept {kept} chapters")
+            return entry if kept else None
+
+    def _write(self, series_id, entry, stored=None):
+        """stored: the chapter count on disk before this write, None if unknown or new."""
+        _write_json(self._path(series_id), encode_series(entry))
+        if stored is None or stored != len(entry.get("chapters", {})):
+            self._update_manifest(series_id, entry)
+        self._seen[series_id] = _digest(entry)
+
+    # ── API ───────────────────────────────────────────────────────────────────
+
+    def series_ids(self):
+        return list(self.manifest())
+
+    def counts(self):
+        """(series, chapters) from the manifest, without opening any series file."""
+        manifest = self.manifest()
+        return len(manifest), sum(info["chapters"] for info in manifest.values())
+
+    def chapter_count(self, series_id):
+        return self.manifest().get(series_id, {}).get("chapters", 0)
+
+    def iter_chapters(self, series_id):
+        yield from (self.get_series(series_id) or {}).get("chapters", {}).items()
+
+    def close(self):
+        pass  # nothing held open; here so all stores can be closed alike
+
+    def get_series(self, series_id):
+        entry = self._read(series_id)
+        if entry is not None:
+            self._seen[series_id] = _digest(entry)
+        return entry
+
+    def put_chapter(self, series_id, chapter_id, pages):
+        """Set one chapter, merging with whatever is on disk for the series now."""
+        path = self._path(series_id)
+        with _file_lock(path):
+            entry = self._read(series_id)
+            stored = None if entry is None else len(entry.get("chapters", {}))
+            entry = entry or {"chapters": {}}
+            entry.setdefault("chapters", {})[chapter_id] = pages
+            self._write(series_id, entry, stored)
+        return entry
+
+    def delete_series(self, series_id):
+        path = self._path(series_id)
+        with _file_lock(path):
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+            self._update_manifest(series_id, None)
+        self._seen.pop(series_id, None)
+
+    def mark_saved(self, series_id, entry):
+        """Record `entry` as what's stored for series_id, e.g. after put_chapter()."""
+        self._seen[series_id] = _digest(entry)
+
+    def load_data(self):
+        data = {}
+        for series_id in self.manifest():
+            entry = self.get_series(series_id)
+            if entry is not None:
+                data[series_id] = entry
+        return data
+
+    def save_data(self, data):
+        for series_id in [s for s in self._seen if s not in data]:
+            self.delete_series(series_id)
+        for series_id, entry in data.items():
+            if self._seen.get(series_id) != _digest(entry):
+                with _file_lock(self._path(series_id)):
+                    self._write(series_id, entry)
@@ -0,0 +1,158 @@
+import json
+import sqlite3
+import threading
+
+DB_FILE = "chapter_data.db"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS series (
+    id      TEXT PRIMARY KEY,
+    extra   TEXT                -- any keys of the series entry besides "chapters", as JSON
+);
+CREATE TABLE IF NOT EXISTS chapters (
+    id          INTEGER PRIMARY KEY,
+    series_id   TEXT NOT NULL REFERENCES series(id) ON DELETE CASCADE ON UPDATE CASCADE,
+    chapter_id  TEXT NOT NULL,
+    UNIQUE (series_id, chapter_id)
+);
+CREATE TABLE IF NOT EXISTS pages (
+    chapter     INTEGER NOT NULL REFERENCES chapters(id) ON DELETE CASCADE,
+    position    INTEGER NOT NULL,
+    url         TEXT NOT NULL,
+    PRIMARY KEY (chapter, position)
+) WITHOUT ROWID;
+"""
+
+
+class SQLiteStore:
+    """
+    chapter_data.json's contents as series / chapters / pages rows.
+
+    load_data() and save_data() take and return the same dict as the JSON
+    store, so existing tools work unchanged; put_chapter() and get_series()
+    write or read one chapter / one series without touching the rest.
+    Chapters come back in the order they were first stored.
+
+    WAL mode, one connection per thread: readers never block the writer,
+    and several extractor processes can share one database.
+    """
+
+    def __init__(self, path=DB_FILE):
+        self.path = path
+        self._local = threading.local()
+        with self._conn() as conn:
+            conn.executescript(SCHEMA)
+
+    def _conn(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        return conn
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    # ── Fine-grained ──────────────────────────────────────────────────────────
+
+    def put_chapter(self, series_id, chapter_id, pages):
+        """Insert or replace one chapter's pages in its own transaction."""
+        with self._conn() as conn:
+            self._put_chapter(conn, series_id, chapter_id, pages)
+
+    def get_series(self, series_id):
+        """The series entry ({"chapters": {...}, ...}), or None if it isn't stored."""
+        conn = self._conn()
+        row = conn.execute("SELECT extra FROM series WHERE id = ?", (series_id,)).fetchone()
+        if row is None:
+            return None
+        extra = json.loads(row[0]) if row[0] else {}
+        return {"chapters": self._chapters(conn, series_id), **extra}
+
+    def series_ids(self):
+        return [row[0] for row in self._conn().execute("SELECT id FROM series ORDER BY rowid")]
+
+    def chapter_count(self, series_id):
+        return self._conn().execute("SELECT COUNT(*) FROM chapters WHERE series_id = ?", (series_id,)).fetchone()[0]
+
+    def iter_chapters(self, series_id):
+        yield from self._chapters(self._conn(), series_id).items()
+
+    def delete_series(self, series_id):
+        with self._conn() as conn:
+            conn.execute("DELETE FROM series WHERE id = ?", (series_id,))
+
+    def counts(self):
+        """(series, chapters) without loading any pages."""
+        conn = self._conn()
+        series = conn.execute("SELECT COUNT(*) FROM series").fetchone()[0]
+        chapters = conn.execute("SELECT COUNT(*) FROM chapters").fetchone()[0]
+        return series, chapters
+
+    # ── Whole-catalog (same shape as the JSON store) ──────────────────────────
+
+    def load_data(self):
+        return {series_id: self.get_series(series_id) for series_id in self.series_ids()}
+
+    def save_data(self, data):
+        """
+        Make the database match `data`, in one transaction. Only chapters
+        whose pages differ are rewritten, and series missing from `data`
+        are deleted, so save_data(load_data()) writes nothing.
+        """
+        with self._conn() as conn:
+            stored = {row[0] for row in conn.execute("SELECT id FROM series")}
+            for series_id in stored - data.keys():
+                conn.execute("DELETE FROM series WHERE id = ?", (series_id,))
+
+            for series_id, entry in data.items():
+                extra = {k: v for k, v in entry.items() if k != "chapters"}
+                self._put_series(conn, series_id, extra)
+                current = self._chapters(conn, series_id) if series_id in stored else {}
+                chapters = entry.get("chapters", {})
+                for chapter_id, pages in chapters.items():
+                    if current.get(chapter_id) != pages:
+                        self._put_chapter(conn, series_id, chapter_id, pages)
+                for chapter_id in current.keys() - chapters.keys():
+                    conn.execute("DELETE FROM chapters WHERE series_id = ? AND chapter_id = ?", (series_id, chapter_id))
+
+    # ── Rows ──────────────────────────────────────────────────────────────────
+
+    def _put_series(self, conn, series_id, extra=None):
+        conn.execute(
+            "INSERT INTO series (id, extra) VALUES (?, ?) ON CONFLICT (id) DO UPDATE SET extra = excluded.extra",
+            (series_id, json.dumps(extra) if extra else None),
+        )
+
+    def _put_chapter(self, conn, series_id, chapter_id, pages):
+        conn.execute("INSERT INTO series (id) VALUES (?) ON CONFLICT (id) DO NOTHING", (series_id,))
+        # Upsert rather than replace, so the chapter keeps its row id and place in the order.
+        key = conn.execute(
+            "INSERT INTO chapters (series_id, chapter_id) VALUES (?, ?) "
+            "ON CONFLICT (series_id, chapter_id) DO UPDATE SET chapter_id = excluded.chapter_id RETURNING id",
+            (series_id, chapter_id),
+        ).fetchone()[0]
+        conn.execute("DELETE FROM pages WHERE chapter = ?", (key,))
+        conn.executemany(
+            "INSERT INTO pages (chapter, position, url) VALUES (?, ?, ?)",
+            ((key, position, url) for position, url in enumerate(pages)),
+        )
+
+    def _chapters(self, conn, series_id):
+        chapters = {}
+        rows = conn.execute(
+            "SELECT c.chapter_id, p.url FROM chapters c LEFT JOIN pages p ON p.chapter = c.id "
+            "WHERE c.series_id = ? ORDER BY c.id, p.position",
+            (series_id,),
+        )
+        for chapter_id, url in rows:
+            pages = chapters.setdefault(chapter_id, [])
+            if url is not None:
+                pages.append(url)
+        return chapters
@@ -3,32 +3,107 @@ import os
 import time
 import threading
 
+from shared.mapped_store import MappedStore, write_index, write_snapshot
+from shared.pages import dumps, encode_pages, encode_series, expand_data, expand_pages
+from shared.repair import repair_json
+from shared.sharded_store import DATA_DIR, MANIFEST_FILE, ShardedStore
+from shared.sqlite_store import DB_FILE, SQLiteStore
+
+# "json" (chapter_data.json + journal), "sqlite" (chapter_data.db) or
+# "sharded" (data/series/<series>.json). Move between them with chapter_db.py.
+BACKEND = os.environ.get("EXTRACTOR_STORAGE", "json")
+
 OUTPUT_FILE = "chapter_data.json"
+# One JSON line per chapter scraped since the last snapshot. load_json()
+# replays it over chapter_data.json; save_json() folds it back in.
+JOURNAL_FILE = OUTPUT_FILE + ".journal"
+# Chapters journaled before save_chapter() writes a fresh snapshot.
+COMPACT_EVERY = 200
+
 _lock = threading.Lock()
+# Held by save_chapter() while it changes `data` and persists the chapter,
+# so scraper threads sharing one catalog (shared/browser_pool.py) can't
+# compact it while another thread is adding to it.
+_save_lock = threading.RLock()
+_journal_lines = 0
+_backend_store = None
+# Called as fn(series_id, chapter_id, pages) after save_chapter() stores a
+# chapter, e.g. Publisher.publish to upload it right away.
+_chapter_listeners = []
 
 
-def _try_repair_json(raw):
-    pos = len(raw)
-    while pos > 100:
-        pos -= 1
-        snippet = raw[:pos].rstrip()
-        for suffix in ["}}}", "}}", "}", ""]:
-            try:
-                return json.loads(snippet + suffix)
-            except:
-                continue
-    return None
+def _store():
+    """The SQLiteStore / ShardedStore for BACKEND, or None for plain JSON."""
+    global _backend_store
+    if _backend_store is None:
+        if BACKEND == "sqlite":
+            _backend_store = SQLiteStore(DB_FILE)
+        elif BACKEND == "sharded":
+            _backend_store = ShardedStore(DATA_DIR)
+    return _backend_store
+
+
+def exists():
+    """True if there's any stored data for the configured backend."""
+    if BACKEND == "sqlite":
+        return os.path.exists(DB_FILE)
+    if BACKEND == "sharded":
+        return os.path.exists(os.path.join(DATA_DIR, MANIFEST_FILE))
+    return os.path.exists(OUTPUT_FILE) or os.path.exists(JOURNAL_FILE)
 
 
 def load_data():
+    store = _store()
+    return store.load_data() if store else load_json()
+
+
+def save_data(data):
+    store = _store()
+    if store:
+        store.save_data(data)
+    else:
+        save_json(data)
+
+
+def get_series(series_id):
+    """One series entry, or None. The JSON backend has to load everything for it."""
+    store = _store()
+    return store.get_series(series_id) if store else load_json().get(series_id)
+
+
+def open_readonly():
+    """
+    A read-only store for tools that only count or scan: series_ids(),
+    chapter_count(), iter_chapters(), get_series(), counts(), close(). For
+    JSON that's a MappedStore, which decodes only what's asked for.
+    """
+    store = _store()
+    return store if store else MappedStore(OUTPUT_FILE, JOURNAL_FILE)
+
+
+def put_chapter(series_id, chapter_id, pages):
+    """Store one chapter without an in-memory catalog at hand."""
+    store = _store()
+    if store:
+        store.put_chapter(series_id, chapter_id, pages)
+    elif _append(series_id, chapter_id, pages):
+        save_json(load_json())
+
+
+def _put(data, series_id, chapter_id, pages):
+    data.setdefault(series_id, {}).setdefault("chapters", {})[chapter_id] = pages
+
+
+def _load_snapshot():
+    """Returns (data, repaired)."""
     if not os.path.exists(OUTPUT_FILE):
-        return {}
+        return {}, False
 
     with open(OUTPUT_FILE, "r", encoding="utf-8") as f:
         raw = f.read()
 
     try:
-        return json.loads(raw)
+        return expand_data(json.loads(raw)), False
     except json.JSONDecodeError as e:
         print(f"  ⚠ chapter_data.json is corrupt (char {e.pos}): {e.msg}")
         print("  Attempting automatic repair...")
@@ -38,37 +113,156 @@ def load_data():
             f.write(raw)
         print(f"  Backup saved to {backup}")
 
-        data = _try_repair_json(raw)
+        data, damaged = repair_json(raw)
         if data:
+            expand_data(data)
             total = sum(len(v.get("chapters", {})) for v in data.values())
             print(f"  ✓ Repaired! Recovered {len(data)} series, {total} chapters")
-            save_data(data)
-            return data
+            if damaged:
+                print(f"  ⚠ Cut short or lost: {', '.join(damaged)}")
+            return data, True
         else:
             print("  ✗ Could not repair automatically. Starting fresh.")
-            return {}
+            return {}, False
 
 
-def save_data(data):
+def _replay_journal(data):
+    """Returns (chapters replayed, lines skipped)."""
+    global _journal_lines
+    if not os.path.exists(JOURNAL_FILE):
+        return 0, 0
+
+    replayed = skipped = 0
+    with open(JOURNAL_FILE, "r", encoding="utf-8") as f:
+        for number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                entry = json.loads(line)
+                _put(data, entry["series"], entry["chapter"], expand_pages(entry["pages"]))
+            except (json.JSONDecodeError, KeyError, TypeError):
+                # Only the last line can be torn (crash mid-append); anything
+                # else unreadable is skipped rather than losing the rest.
+                print(f"  ⚠ Skipping unreadable line {number} in {JOURNAL_FILE}")
+                skipped += 1
+                continue
+            replayed += 1
+
+    _journal_lines = replayed
+    return replayed, skipped
+
+
+def load_json():
+    data, repaired = _load_snapshot()
+
+    replayed, skipped = _replay_journal(data)
+    if replayed:
+        print(f"  ✓ Replayed {replayed} chapters from {JOURNAL_FILE}")
+
+    # Compact away a torn line now, or the next append would be glued onto it.
+    if repaired or skipped:
+        save_json(data)
+    return data
+
+
+def save_chapter(data, series_id, chapter_id, pages):
+    """
+    Record one scraped chapter: sets it in `data` and persists just that
+    chapter, so saving doesn't grow with the catalog. Safe to call from
+    several threads on the same `data`. With the JSON backend
+    that's one journal line (a crash loses at most the line being written;
+    every COMPACT_EVERY chapters the journal is folded into
+    chapter_data.json); sqlite writes its rows, sharded its series' file.
+    """
+    with _save_lock:
+        _put(data, series_id, chapter_id, pages)
+        store = _store()
+        if store:
+            store.put_chapter(series_id, chapter_id, pages)
+            if BACKEND == "sharded":
+                # Already on disk; the final save_data() needn't write it again.
+                store.mark_saved(series_id, data[series_id])
+        elif _append(series_id, chapter_id, pages):
+            save_json(data)
+    for listener in _chapter_listeners:
+        listener(series_id, chapter_id, pages)
+
+
+def add_chapter_listener(listener):
+    _chapter_listeners.append(listener)
+
+
+def remove_chapter_listener(listener):
+    if listener in _chapter_listeners:
+        _chapter_listeners.remove(listener)
+
+
+def _append(series_id, chapter_id, pages):
+    """Journal one chapter; True once it's time to compact."""
+    global _journal_lines
+    line = dumps({"series": series_id, "chapter": chapter_id, "pages": encode_pages(pages)})
+
+    with _lock:
+        with open(JOURNAL_FILE, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        _journal_lines += 1
+        return _journal_lines >= COMPACT_EVERY
+
+
+def _clear_journal():
+    global _journal_lines
+    _journal_lines = 0
+    try:
+        os.remove(JOURNAL_FILE)
+    except FileNotFoundError:
+        pass
+    except PermissionError:
+        # Windows: something still has it open. An empty journal is as good.
+        open(JOURNAL_FILE, "w").close()
+
+
+def save_json(data):
+    """
+    Write the full snapshot and drop the journal it now contains. If we die
+    in between, replaying the journal over the new snapshot is harmless.
+    """
+    # Page lists as URL templates where they fit, and no indentation: several
+    # times smaller and faster to load (see shared/pages.py). Encoded under
+    # the lock save_chapter() holds while it adds to `data`, so another
+    # thread can't change it mid-iteration.
+    with _save_lock:
+        encoded = {series_id: encode_series(entry) for series_id, entry in data.items()}
     with _lock:
         tmp = OUTPUT_FILE + ".tmp"
-        with open(tmp, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        with open(tmp, "wb") as f:
+            index = write_snapshot(f, encoded)
 
         for attempt in range(20):
             try:
                 if os.path.exists(OUTPUT_FILE):
                     os.remove(OUTPUT_FILE)
                 os.rename(tmp, OUTPUT_FILE)
+                _saved(index)
                 return
             except PermissionError:
                 time.sleep(0.5 * (attempt + 1))  # grows: 0.5, 1.0, 1.5 ... up to 10s
 
         # Nuclear fallback — write directly without rename
-        with open(OUTPUT_FILE, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2)
+        with open(OUTPUT_FILE, "wb") as f:
+            index = write_snapshot(f, encoded)
         if os.path.exists(tmp):
             try:
                 os.remove(tmp)
             except:
-                pass
\ No newline at end of file
+                pass
+        _saved(index)
+
+
+def _saved(index):
+    try:
+        write_index(OUTPUT_FILE, index)
+    except OSError:
+        pass  # MappedStore rebuilds a missing or stale index
+    _clear_journal()
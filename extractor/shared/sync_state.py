@@ -0,0 +1,91 @@
+import hashlib
+import json
+import os
+import threading
+import time
+
+from shared.pages import dumps, payload_pages
+
+# What Supabase already has, so an upload only sends chapters that are new
+# or changed since they were last sent:
+#
+#   {"remote": "https://xxxx.supabase.co",
+#    "series": {series_id: {chapter_id: hash, ...}, ...}}
+#
+# hash is of the `pages` payload exactly as uploaded, so turning
+# SUPABASE_COMPACT_PAGES on or off re-sends everything once. A state file
+# written for a different SUPABASE_URL is ignored.
+SYNC_FILE = "supabase_sync.json"
+# mark_synced() saves the file at most this often, so an interrupted upload
+# resumes from roughly where it stopped.
+CHECKPOINT_SECONDS = 5
+
+
+def payload_hash(payload):
+    return hashlib.blake2b(dumps(payload).encode(), digest_size=8).hexdigest()
+
+
+class SyncState:
+    def __init__(self, path=SYNC_FILE, remote=""):
+        self.path = path
+        self.remote = remote
+        self._series = {}
+        self._pending = {}  # (series_id, chapter_id) -> hash of a row handed out, not yet uploaded
+        self._saved_at = time.monotonic()
+        self._lock = threading.Lock()
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                state = json.load(f)
+            if state.get("remote") == remote:
+                self._series = state.get("series", {})
+        except FileNotFoundError:
+            pass
+        except (json.JSONDecodeError, AttributeError):
+            print(f"  ⚠ {path} is unreadable — everything will be re-uploaded")
+
+    def changed_rows(self, series_id, chapters):
+        """
+        Upsert rows for the chapters Supabase doesn't have as they are now.
+        Pass them to mark_synced() once they're uploaded.
+        """
+        synced = self._series.get(series_id, {})
+        rows = []
+        for chapter_id, pages in chapters.items():
+            if not isinstance(pages, list) or not pages:
+                continue
+            payload = payload_pages(pages)
+            digest = payload_hash(payload)
+            if synced.get(chapter_id) != digest:
+                rows.append({"series_id": series_id, "chapter_id": chapter_id, "pages": payload})
+                with self._lock:
+                    self._pending[series_id, chapter_id] = digest
+        return rows
+
+    def mark_synced(self, rows):
+        """Record rows from changed_rows() as uploaded; checkpoints the file now and then."""
+        with self._lock:
+            for row in rows:
+                key = row["series_id"], row["chapter_id"]
+                digest = self._pending.pop(key, None)
+                if digest is not None:
+                    self._series.setdefault(key[0], {})[key[1]] = digest
+            due = time.monotonic() - self._saved_at >= CHECKPOINT_SECONDS
+        if due:
+            self.save()
+
+    def forget(self, series_id=None):
+        """Treat one series (or everything) as never uploaded."""
+        with self._lock:
+            if series_id is None:
+                self._series.clear()
+            else:
+                self._series.pop(series_id, None)
+
+    def save(self):
+        with self._lock:
+            state = {"remote": self.remote, "series": self._series}
+            tmp = self.path + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(state, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+            self._saved_at = time.monotonic()
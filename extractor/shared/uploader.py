@@ -0,0 +1,146 @@
+import os
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import httpx
+
+from shared.pages import dumps
+
+# Upserts rows straight into Supabase's PostgREST endpoint
+# (POST /rest/v1/<table>?on_conflict=...), several batches at a time.
+#
+# Batches are packed by size rather than row count: one long chapter can
+# be a few hundred KB of URLs while a short one is a few hundred bytes, so
+# a fixed 100 rows was either an oversized request or a wasted round trip.
+# A 413 from the server splits the batch and lowers the limit for the rest
+# of the run. Timeouts, connection errors, 408 / 429 / 5xx are retried with
+# exponential backoff (or the server's Retry-After); anything else fails
+# the batch straight away.
+TABLE = "chapters"
+ON_CONFLICT = "series_id,chapter_id"
+MAX_BATCH_BYTES = 512 * 1024
+MAX_BATCH_ROWS = 500
+WORKERS = 4
+RETRIES = 5
+BACKOFF = 0.5  # seconds before the first retry; doubles each time
+RETRY_STATUS = {408, 429, 500, 502, 503, 504}
+
+
+class UploadError(Exception):
+    pass
+
+
+class Uploader:
+    def __init__(self, url, key, table=TABLE, workers=WORKERS,
+                 max_bytes=MAX_BATCH_BYTES, max_rows=MAX_BATCH_ROWS, retries=RETRIES):
+        self.table = table
+        self.workers = workers
+        self.max_bytes = max_bytes
+        self.max_rows = max_rows
+        self.retries = retries
+        self._lock = threading.Lock()
+        self._http = httpx.Client(
+            base_url=url.rstrip("/") + "/rest/v1",
+            headers={
+                "apikey": key,
+                "Authorization": f"Bearer {key}",
+                "Content-Type": "application/json",
+                "Prefer": "resolution=merge-duplicates,return=minimal",
+            },
+            timeout=60,
+            limits=httpx.Limits(max_connections=workers),
+        )
+
+    @classmethod
+    def from_env(cls, **kwargs):
+        """An Uploader for SUPABASE_URL / SUPABASE_SERVICE_KEY, or None if they aren't set."""
+        url = os.environ.get("SUPABASE_URL", "")
+        key = os.environ.get("SUPABASE_SERVICE_KEY", "")
+        if not url or not key:
+            return None
+        return cls(url, key, **kwargs)
+
+    def close(self):
+        self._http.close()
+
+    # ── Batching ──────────────────────────────────────────────────────────────
+
+    def _batches(self, rows, max_bytes=None):
+        """(rows, body) pairs; body is their JSON array, within the size limit unless one row alone is over it."""
+        batch, parts, size = [], [], 2
+        for row in rows:
+            part = dumps(row).encode()
+            limit = max_bytes or self.max_bytes
+            if batch and (size + len(part) + 1 > limit or len(batch) >= self.max_rows):
+                yield batch, b"[" + b",".join(parts) + b"]"
+                batch, parts, size = [], [], 2
+            batch.append(row)
+            parts.append(part)
+            size += len(part) + 1
+        if batch:
+            yield batch, b"[" + b",".join(parts) + b"]"
+
+    # ── Upload ────────────────────────────────────────────────────────────────
+
+    def upload(self, rows, on_batch=None):
+        """
+        Upsert `rows` (any iterable; it's packed as it's consumed) and return
+        how many went up. on_batch(batch_rows) is called from a worker thread
+        after each batch is stored, e.g. SyncState.mark_synced to checkpoint.
+        Batches that still fail after retrying don't stop the others; they're
+        raised together as an UploadError at the end.
+        """
+        total = 0
+        errors = []
+
+        def collect(done):
+            nonlocal total
+            for future in done:
+                try:
+                    total += future.result()
+                except UploadError as e:
+                    errors.append(e)
+
+        with ThreadPoolExecutor(self.workers) as pool:
+            pending = set()
+            for batch, body in self._batches(rows):
+                # At most two batches queued per worker, so a big catalog isn't
+                # packed into memory all at once.
+                if len(pending) >= self.workers * 2:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    collect(done)
+                pending.add(pool.submit(self._send, batch, body, on_batch))
+            collect(wait(pending).done)
+
+        if errors:
+            raise UploadError(f"{len(errors)} batch(es) failed after {total} rows went up: {errors[0]}")
+        return total
+
+    def _send(self, batch, body, on_batch):
+        error = None
+        for attempt in range(self.retries + 1):
+            if attempt:
+                time.sleep(error[1] if error[1] is not None else BACKOFF * 2 ** (attempt - 1) * (1 + random.random()))
+            try:
+                response = self._http.post(f"/{self.table}", params={"on_conflict": ON_CONFLICT}, content=body)
+            except httpx.TransportError as e:
+                error = (f"{type(e).__name__}: {e}", None)
+                continue
+
+            if response.status_code < 300:
+                if on_batch:
+                    on_batch(batch)
+                return len(batch)
+            if response.status_code == 413 and len(batch) > 1:
+                with self._lock:
+                    self.max_bytes = limit = min(self.max_bytes, len(body) // 2)
+                return sum(self._send(part, part_body, on_batch)
+                           for part, part_body in self._batches(batch, limit))
+            message = f"HTTP {response.status_code}: {response.text[:200]}"
+            if response.status_code not in RETRY_STATUS:
+                raise UploadError(message)
+            retry_after = response.headers.get("Retry-After", "")
+            error = (message, float(retry_after) if retry_after.isdigit() else None)
+        raise UploadError(f"{error[0]} (gave up after {self.retries} retries)")
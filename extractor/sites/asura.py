@@ -11,6 +11,7 @@ from shared.scroll import full_scroll
 DELAY_BETWEEN_CHAPTERS = (3, 6)
 MAX_RETRIES = 3
 RETRY_BACKOFF = 30
+HEADLESS = True
 
 
 def get_series_id(url):
@@ -129,7 +130,7 @@ def scrape(series_url, data):
     existing = set(data[series_id]["chapters"].keys())
     print(f"  Cached chapters: {len(existing)}")
 
-    driver = make_driver(headless=True)
+    driver = make_driver(headless=HEADLESS)
     try:
         all_chapters = get_all_chapters(driver, series_url)
         new_chapters = [ch for ch in all_chapters if ch["id"] not in existing]
@@ -151,7 +152,7 @@ def scrape(series_url, data):
                         print(f"\n    ⚠ Driver window closed — restarting...")
                         safe_quit(driver)
                         time.sleep(5)
-                        driver = make_driver(headless=True)
+                        driver = make_driver(headless=HEADLESS)
 
                     pages = get_chapter_pages(driver, ch)
                     break
@@ -163,7 +164,7 @@ def scrape(series_url, data):
                         wait = RETRY_BACKOFF * attempt + random.uniform(5, 15)
                         print(f"    Restarting driver and waiting {wait:.0f}s...")
                         time.sleep(wait)
-                        driver = make_driver(headless=True)
+                        driver = make_driver(headless=HEADLESS)
 
                 except Exception as e:
                     err_str = str(e)
@@ -178,7 +179,7 @@ def scrape(series_url, data):
                         print(f"\n    ⚠ Chrome window crashed — restarting driver...")
                         safe_quit(driver)
                         time.sleep(random.uniform(8, 15))
-                        driver = make_driver(headless=True)
+                        driver = make_driver(headless=HEADLESS)
                         # Don't count this as an attempt — retry immediately
                         continue
                     else:
@@ -187,15 +188,13 @@ def scrape(series_url, data):
                             time.sleep(5)
 
             if pages:
-                data[series_id]["chapters"][ch["id"]] = pages
+                from shared.storage import save_chapter
+                save_chapter(data, series_id, ch["id"], pages)
                 print(f"✓ {len(pages)} pages")
             else:
                 failed.append(ch["id"])
                 print(f"✗ failed after {MAX_RETRIES} attempts")
 
-            from shared.storage import save_data
-            save_data(data)
-
             if i < len(new_chapters) - 1:
                 delay = random.uniform(*DELAY_BETWEEN_CHAPTERS)
                 # Extra cooldown every 50 chapters to prevent Chrome overload
@@ -10,6 +10,9 @@ from shared.scroll import full_scroll
 DELAY_BETWEEN_CHAPTERS = (3, 6)
 MAX_RETRIES = 3
 RETRY_BACKOFF = 30
+HEADLESS = False  # kept visible to respect the original mgeko setup
+# Seconds to wait before listing a series again when it comes back empty
+RETRY_EMPTY_LIST = 15
 
 
 SLUG_OVERRIDES = {
@@ -226,15 +229,14 @@ def scrape(series_url, data):
     existing = set(data[series_id]["chapters"].keys())
     print(f"  Cached chapters: {len(existing)}")
 
-    # Kept headless=False here to respect your original mgeko initialization setup
-    driver = make_driver(headless=False)
+    driver = make_driver(headless=HEADLESS)
     try:
         all_chapters = get_all_chapters(driver, series_url)
 
         # If Cloudflare blocked the series page, wait and retry once
         if not all_chapters:
-            print("  ⚠ No chapters found — waiting 15s and retrying...")
-            time.sleep(15)
+            print(f"  ⚠ No chapters found — waiting {RETRY_EMPTY_LIST}s and retrying...")
+            time.sleep(RETRY_EMPTY_LIST)
             all_chapters = get_all_chapters(driver, series_url)
         new_chapters = [ch for ch in all_chapters if ch["id"] not in existing]
         print(f"  Total on site: {len(all_chapters)} | New to fetch: {len(new_chapters)}")
@@ -255,7 +257,7 @@ def scrape(series_url, data):
                         print(f"\n    ⚠ Driver window closed — restarting...")
                         safe_quit(driver)
                         time.sleep(5)
-                        driver = make_driver(headless=False)
+                        driver = make_driver(headless=HEADLESS)
 
                     pages = get_chapter_pages(driver, ch)
                     if not pages:
@@ -269,7 +271,7 @@ def scrape(series_url, data):
                         wait = RETRY_BACKOFF * attempt + random.uniform(5, 15)
                         print(f"    Restarting driver and waiting {wait:.0f}s...")
                         time.sleep(wait)
-                        driver = make_driver(headless=False)
+                        driver = make_driver(headless=HEADLESS)
 
                 except Exception as e:
                     err_str = str(e)
@@ -284,7 +286,7 @@ def scrape(series_url, data):
                         print(f"\n    ⚠ Chrome window crashed — restarting driver...")
                         safe_quit(driver)
                         time.sleep(random.uniform(8, 15))
-                        driver = make_driver(headless=False)
+                        driver = make_driver(headless=HEADLESS)
                         # Don't count this as an attempt — retry immediately
                         continue
                     else:
@@ -293,15 +295,13 @@ def scrape(series_url, data):
                             time.sleep(5)
 
             if pages:
-                data[series_id]["chapters"][ch["id"]] = pages
+                from shared.storage import save_chapter
+                save_chapter(data, series_id, ch["id"], pages)
                 print(f"✓ {len(pages)} pages")
             else:
                 failed.append(ch["id"])
                 print(f"✗ failed after {MAX_RETRIES} attempts")
 
-            from shared.storage import save_data
-            save_data(data)
-
             if i < len(new_chapters) - 1:
                 delay = random.uniform(*DELAY_BETWEEN_CHAPTERS)
                 # Extra cooldown every 50 chapters to prevent Chrome overload
@@ -2,104 +2,119 @@
 # Run this after main.py finishes fetching chapters.
 # Or call upload_series() directly from main.py (see bottom of file).
 #
-# Install dependency: pip install supabase
+# Only chapters that are new or changed since the last upload are sent;
+# supabase_sync.json remembers what Supabase has (see shared/sync_state.py).
+#   python upload_to_supabase.py --full    # re-send everything
+#
+# Install dependency: pip install httpx
 #
 # Set these env vars (or put them in a .env file):
 #   SUPABASE_URL=https://xxxx.supabase.co
 #   SUPABASE_SERVICE_KEY=eyJh...  ← service_role key, NOT anon key
 
 import os
-import json
 import sys
-from pathlib import Path
 from dotenv import load_dotenv
+from shared.storage import exists, get_series, load_data
+from shared.sync_state import SYNC_FILE, SyncState
 load_dotenv()
 
 try:
-    from supabase import create_client, Client
+    from shared.uploader import Uploader
 except ImportError:
-    print("Run: pip install supabase")
+    print("Run: pip install httpx")
     sys.exit(1)
 
 # ── Config ────────────────────────────────────────────────────────────────────
 
 SUPABASE_URL = os.environ.get("SUPABASE_URL", "")
 SUPABASE_KEY = os.environ.get("SUPABASE_SERVICE_KEY", "")
-CHAPTER_DATA_PATH = Path(__file__).parent / "chapter_data.json"
 
 # ── Upload ────────────────────────────────────────────────────────────────────
 
-def get_client() -> Client:
+def get_client() -> Uploader:
     if not SUPABASE_URL or not SUPABASE_KEY:
         raise ValueError(
             "Missing SUPABASE_URL or SUPABASE_SERVICE_KEY env vars.\n"
             "Get them from: Supabase dashboard → Settings → API"
         )
-    return create_client(SUPABASE_URL, SUPABASE_KEY)
+    return Uploader(SUPABASE_URL, SUPABASE_KEY)
+
+
+def get_sync_state() -> SyncState:
+    return SyncState(SYNC_FILE, SUPABASE_URL)
 
 
-def upload_series(series_id: str, chapters: dict, client: Client = None):
+def upload_series(series_id: str, chapters: dict, client: Uploader = None, state: SyncState = None):
     """
-    Upload all chapters for one series.
+    Upload the new or changed chapters of one series.
     chapters = { "68": [url, url, ...], "69": [...], ... }
     Only upserts — won't duplicate existing chapters.
+    Pass a shared SyncState when uploading many series; it's saved here otherwise.
     """
     if client is None:
         client = get_client()
+    own_state = state is None
+    if own_state:
+        state = get_sync_state()
 
-    rows = [
-        {
-            "series_id": series_id,
-            "chapter_id": chapter_id,
-            "pages": pages,
-        }
-        for chapter_id, pages in chapters.items()
-        if isinstance(pages, list) and len(pages) > 0
-    ]
+    rows = state.changed_rows(series_id, chapters)
 
     if not rows:
-        print(f"  {series_id}: no chapters to upload")
+        print(f"  {series_id}: up to date")
         return 0
 
-    # Upsert in batches of 100 (Supabase row limit per request)
-    batch_size = 100
-    total = 0
-    for i in range(0, len(rows), batch_size):
-        batch = rows[i:i + batch_size]
-        client.table("chapters").upsert(
-            batch,
-            on_conflict="series_id,chapter_id"  # skip if already exists
-        ).execute()
-        total += len(batch)
+    # Upsert in size-packed batches, several at once (see shared/uploader.py)
+    try:
+        total = client.upload(rows, on_batch=state.mark_synced)
+    finally:
+        if own_state:
+            state.save()
 
     print(f"  {series_id}: upserted {total} chapters")
     return total
 
 
-def upload_all():
-    """Upload everything in chapter_data.json to Supabase."""
-    if not CHAPTER_DATA_PATH.exists():
-        print(f"chapter_data.json not found at {CHAPTER_DATA_PATH}")
+def upload_all(full=False):
+    """
+    Upload the chapter store (chapter_data.json or .db) to Supabase: what's
+    new or changed since the last upload, or everything if full.
+    """
+    if not exists():
+        print(f"chapter_data.json not found in {os.getcwd()}")
         sys.exit(1)
 
-    print(f"Reading {CHAPTER_DATA_PATH}...")
-    with open(CHAPTER_DATA_PATH, "r", encoding="utf-8") as f:
-        all_data = json.load(f)
+    print("Reading chapter store...")
+    all_data = load_data()
 
     client = get_client()
+    state = get_sync_state()
+    if full:
+        state.forget()
     print(f"Uploading {len(all_data)} series to Supabase...\n")
 
-    grand_total = 0
-    for series_id, series_data in all_data.items():
-        # Support both formats:
-        #   { "series-id": { "chapters": { "1": [...] } } }   ← your current format
-        #   { "series-id": { "1": [...] } }                   ← flat format
-        if "chapters" in series_data and isinstance(series_data["chapters"], dict):
-            chapters = series_data["chapters"]
-        else:
-            chapters = series_data
-
-        grand_total += upload_series(series_id, chapters, client)
+    def changed_rows():
+        for series_id, series_data in all_data.items():
+            # Support both formats:
+            #   { "series-id": { "chapters": { "1": [...] } } }   ← your current format
+            #   { "series-id": { "1": [...] } }                   ← flat format
+            if "chapters" in series_data and isinstance(series_data["chapters"], dict):
+                chapters = series_data["chapters"]
+            else:
+                chapters = series_data
+
+            rows = state.changed_rows(series_id, chapters)
+            if rows:
+                print(f"  {series_id}: {len(rows)} new/changed chapters")
+            yield from rows
+
+    # One stream for the whole catalog, so batches pack across series
+    try:
+        grand_total = client.upload(changed_rows(), on_batch=state.mark_synced)
+    finally:
+        # Whatever made it up before a failure doesn't get sent again.
+        state.save()
+        client.close()
 
     print(f"\n✓ Done. Total chapters upserted: {grand_total}")
 
@@ -122,16 +137,22 @@ def upload_all():
 # ─────────────────────────────────────────────────────────────────────────────
 
 if __name__ == "__main__":
-    if len(sys.argv) > 1:
+    # The store's paths are relative; the data lives next to this script.
+    os.chdir(os.path.dirname(os.path.abspath(__file__)))
+    full = "--full" in sys.argv
+    args = [a for a in sys.argv[1:] if not a.startswith("--")]
+    if args:
         # Upload single series: python upload_to_supabase.py star-embracing-swordmaster
-        series_id = sys.argv[1]
-        with open(CHAPTER_DATA_PATH) as f:
-            all_data = json.load(f)
-        if series_id not in all_data:
+        series_id = args[0]
+        data = get_series(series_id)
+        if data is None:
             print(f"Series '{series_id}' not found in chapter_data.json")
             sys.exit(1)
-        data = all_data[series_id]
         chapters = data.get("chapters", data)
-        upload_series(series_id, chapters)
+        state = get_sync_state()
+        if full:
+            state.forget(series_id)
+        upload_series(series_id, chapters, state=state)
+        state.save()
     else:
-        upload_all()
\ No newline at end of file
+        upload_all(full)
@@ -2,20 +2,36 @@ import os
 import sys
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from fastapi import FastAPI, Response
+import json
+import functools
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse, StreamingResponse
 from fastapi.middleware.cors import CORSMiddleware
-import requests
+from starlette.datastructures import Headers
+
+from src import models
+
+from src.registry import get_source
+from src.session import close_async_client
+from src.relay import relay_image
+from src.federated import federated_search, SEARCH_SOURCES, DEFAULT_DEADLINE, MAX_DEADLINE
+from src.crawler import Crawler
+from src.scheduler import Saturated
 
-from src.manganato import Manganato
-from src.mangareader import Mangareader
-from src.mangapill import Mangapill
-from src.asurascans import Asurascans
-from src.flamescans import Flamescans
-from src.mangaworld import Mangaworld
-from src.mangapark import Mangapark
-from src.scanvf import Scanvf
+# Prefetches the first pages of the latest/newest/hottest listings so deep
+# scrolling is served from cache (SCRAPER_CRAWL_PAGES=0 turns it off).
+crawler = Crawler()
 
-app = FastAPI()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    crawler.start()
+    yield
+    await crawler.stop()
+    await close_async_client()
+
+app = FastAPI(lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -30,6 +46,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Upstream fetches are budgeted per source and overall (src/scheduler.py).
+# When a request can't get a slot in time the client is told to back off.
+@app.exception_handler(Saturated)
+async def saturated(request: Request, exc: Saturated):
+    return JSONResponse(
+        {"detail": "Too many upstream requests, try again shortly"},
+        status_code=503,
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+class ModelResponse(Response):
+    """
+    Encodes a source Result (or any plain data) with src/models.py rather than
+    FastAPI's jsonable_encoder. Clients that send Accept: application/msgpack
+    get MessagePack when msgpack is installed, JSON otherwise.
+    """
+    media_type = models.JSON_TYPE
+
+    def __init__(self, content, status_code: int = 200, headers: dict = None):
+        self.model = content
+        super().__init__(None, status_code, headers)
+
+    async def __call__(self, scope, receive, send):
+        if models.msgpack is not None and models.BINARY_TYPE in Headers(scope=scope).get("accept", ""):
+            self.body, mediaType = models.encode_binary(self.model), models.BINARY_TYPE
+        else:
+            self.body, mediaType = models.encode_json(self.model), models.JSON_TYPE
+        self.raw_headers = [(k, v) for k, v in self.raw_headers if k not in (b"content-length", b"content-type")]
+        self.raw_headers += [
+            (b"content-length", str(len(self.body)).encode()),
+            (b"content-type", mediaType.encode()),
+            (b"vary", b"accept"),
+        ]
+        await super().__call__(scope, receive, send)
+
+def encoded(endpoint):
+    """Send whatever the route returns as a ModelResponse (Responses pass through)."""
+    @functools.wraps(endpoint)
+    async def wrapper(*args, **kwargs):
+        result = await endpoint(*args, **kwargs)
+        return result if isinstance(result, Response) else ModelResponse(result)
+    return wrapper
+
 mangareader_genres = ["Action, Adventure, Comedy, Cooking, Doujinshi, Drama, Erotica, Fantasy, Gender Bender, Harem, Historical, Horror, Isekai, Josei, Manhua, Manhwa, Martial arts, Mature, Mecha, Medical, Mystery, One shot, Pornographic, Pschological, Romance, School life, Sci fi, Seinen, Shoujo, Shounen ai, Slice of life, Smut, Sports, Supernatural, Tragedy, Webtoons, Yaoi, Yuri"]
 
 @app.get("/")
@@ -44,41 +103,64 @@ def homepage():
 async def read_root_head():
     return Response(headers={"Custom-Header": "Value"})
 
+# Search every source at once. Results stream as NDJSON (or SSE with
+# format=sse) as each site answers, so fast sources show up immediately.
+@app.get("/search")
+async def search(q: str, sources: str = None, deadline: float = DEFAULT_DEADLINE, format: str = "ndjson"):
+    selected = sources.split(",") if sources else None
+    if selected and not any(name in SEARCH_SOURCES for name in selected):
+        return {
+            "detail": "Invalid parameter"
+        }
+    deadline = min(max(deadline, 0.5), MAX_DEADLINE)
+    sse = format == "sse"
+
+    async def stream():
+        async for event in federated_search(q, sources=selected, deadline=deadline):
+            line = json.dumps(event, default=str)
+            if sse:
+                yield f"event: {event['type']}\ndata: {line}\n\n"
+            else:
+                yield line + "\n"
+
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream" if sse else "application/x-ndjson",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
 # Manganato
 @app.get("/manganato/{category}/{path:path}")
-def manganato(category: str, path: str = None):
+@encoded
+async def manganato(request: Request, category: str, path: str = None):
     if category == "search":
         if path:
             newQuery = path.replace(" ", "_")
-            return Manganato().search(query=newQuery)
+            return await get_source("manganato")().search(query=newQuery)
     elif category == "info":
         if path:
-            return Manganato().info(id=path)
+            return await get_source("manganato")().info(id=path)
     elif category == "pages":
         if path:
-            return Manganato().pages(id=path)
+            return await get_source("manganato")().pages(id=path)
     elif category == "latest":
         if path:
-            return Manganato().latest(page=path)
+            return await get_source("manganato")().latest(page=path)
         else:
-            return Manganato().latest()
+            return await get_source("manganato")().latest()
     elif category == "newest":
         if path:
-            return Manganato().newest(page=path)
+            return await get_source("manganato")().newest(page=path)
         else:
-            return Manganato().newest()
+            return await get_source("manganato")().newest()
     elif category == "hottest":
         if path:
-            return Manganato().hotest(page=path)
+            return await get_source("manganato")().hotest(page=path)
         else:
-            return Manganato().hotest()
+            return await get_source("manganato")().hotest()
     elif category == "images":
         if path:
-            headers = {
-                "Referer": "https://chapmanganato.to/"
-            }
-            content = requests.get(url=path, headers=headers).content
-            return Response(content=content, media_type="image/jpg")
+            return await relay_image(path, "https://chapmanganato.to/", request.headers)
     else:
         return {
             "detail": "Invalid parameter"
@@ -86,20 +168,21 @@ def manganato(category: str, path: str = None):
 
 # Mangareader
 @app.get("/mangareader/{category}/{path:path}")
-def mangareader(category: str, path: str):
+@encoded
+async def mangareader(category: str, path: str):
     if category == "search":
-        return Mangareader().search(query=path)
+        return await get_source("mangareader")().search(query=path)
     elif category == "info":
-        return Mangareader().info(id=path)
+        return await get_source("mangareader")().info(id=path)
     elif category == "pages":
-        return Mangareader().pages(id=path)
+        return await get_source("mangareader")().pages(id=path)
     elif category == "genre-list":
         return {
             "endpoint": "mangareader",
             "genres": mangareader_genres
         }
     elif category == "latest":
-        return Mangareader().latest(genre=path)
+        return await get_source("mangareader")().latest(genre=path)
     else:
         return {
             "detail": "Invalid parameter"
@@ -107,24 +190,21 @@ def mangareader(category: str, path: str):
 
 # Mangapill
 @app.get("/mangapill/{category}/{path:path}")
-def mangapill(category:str, path:str):
+@encoded
+async def mangapill(request: Request, category:str, path:str):
     if category == "search":
-        return Mangapill().search(query=path)
+        return await get_source("mangapill")().search(query=path)
     elif category == "info":
-        return Mangapill().info(id=path)
+        return await get_source("mangapill")().info(id=path)
     elif category == "pages":
-        return Mangapill().pages(id=path)
+        return await get_source("mangapill")().pages(id=path)
     elif category == "newest":
-        return Mangapill().new()
+        return await get_source("mangapill")().new()
     elif category == "recent":
-        return Mangapill().recent()
+        return await get_source("mangapill")().recent()
     elif category == "images":
         if path:
-            headers = {
-                "Referer": "https://mangapill.com/"
-            }
-            content = requests.get(url=path, headers=headers).content
-            return Response(content=content, media_type="image/jpg")
+            return await relay_image(path, "https://mangapill.com/", request.headers)
         else:
             return {
                 "detail": "image url is required"
@@ -136,21 +216,22 @@ def mangapill(category:str, path:str):
     
 # Asurascans
 @app.get("/asurascans/{category}/{path:path}")
-def asurascans(category:str, path:str):
+@encoded
+async def asurascans(category:str, path:str):
     if category == "search":
         if path:
             newQuery = path.replace(" ", "+")
-            return Asurascans().search(query=newQuery)
+            return await get_source("asurascans")().search(query=newQuery)
     elif category == "info":
-        return Asurascans().info(id=path)
+        return await get_source("asurascans")().info(id=path)
     elif category == "pages":
-        return Asurascans().pages(id=path)
+        return await get_source("asurascans")().pages(id=path)
     elif category == "popular":
-        return Asurascans().popular()
+        return await get_source("asurascans")().popular()
     elif category == "latest":
-        return Asurascans().latest(page=path)
+        return await get_source("asurascans")().latest(page=path)
     elif category == "genres":
-        return Asurascans().genres(type=path)
+        return await get_source("asurascans")().genres(type=path)
     elif category == "genre-list":
         return {
             "endpoint": "asurascans",
@@ -163,15 +244,16 @@ def asurascans(category:str, path:str):
 
 # Flamescans
 @app.get("/flamescans/{category}/{path:path}")
-def flamescans(category:str, path:str):
+@encoded
+async def flamescans(category:str, path:str):
     if category == "search":
-        return Flamescans().search(query=path)
+        return await get_source("flamescans")().search(query=path)
     elif category == "info":
-        return Flamescans().info(id=path)
+        return await get_source("flamescans")().info(id=path)
     elif category == "pages":
-        return Flamescans().pages(id=path)
+        return await get_source("flamescans")().pages(id=path)
     elif category == "sort":
-        return Flamescans().sort(type=path)
+        return await get_source("flamescans")().sort(type=path)
         # accepts: title, titlereverse, update, popular, added
     else:
         return {
@@ -179,45 +261,48 @@ def flamescans(category:str, path:str):
         }   
         
 @app.get("/mangaworld/{category}/{path:path}")
-def mangaworld(category:str, path:str):
+@encoded
+async def mangaworld(category:str, path:str):
     if category == "search":
-        return Mangaworld().search(query=path)
+        return await get_source("mangaworld")().search(query=path)
     elif category == "info":
-        return Mangaworld().info(id=path)
+        return await get_source("mangaworld")().info(id=path)
     elif category == "pages":
-        return Mangaworld().pages(id=path)
+        return await get_source("mangaworld")().pages(id=path)
     elif category == "trending":
-        return Mangaworld().trending()
+        return await get_source("mangaworld")().trending()
     elif category == "popular":
-        return Mangaworld().popular(page=path)
+        return await get_source("mangaworld")().popular(page=path)
     else:
         return {
             "detail": "Invalid parameter"
         }
     
 @app.get("/mangapark/{category}/{path:path}")
-def mangapark(category:str, path:str):
+@encoded
+async def mangapark(category:str, path:str):
     if category == "search":
-        return Mangapark().search(query=path)
+        return await get_source("mangapark")().search(query=path)
     elif category == "info":
-        return Mangapark().info(id=path)
+        return await get_source("mangapark")().info(id=path)
     elif category == "pages":
-        return Mangapark().pages(id=path)
+        return await get_source("mangapark")().pages(id=path)
     elif category == "latest":
-        return Mangapark().latest(page=path)
+        return await get_source("mangapark")().latest(page=path)
     else:
         return {
             "detail": "Invalid parameter"
         }
     
 @app.get("/scanvf/{category}/{path:path}")
-def scanvf(category:str, path:str):
+@encoded
+async def scanvf(category:str, path:str):
     if category == "search":
-        return Scanvf().search(query=path)
+        return await get_source("scanvf")().search(query=path)
     elif category == "info":
-        return Scanvf().info(id=path)
+        return await get_source("scanvf")().info(id=path)
     elif category == "pages":
-        return Scanvf().pages(id=path)
+        return await get_source("scanvf")().pages(id=path)
     else:
         return {
             "detail": "Invalid parameter"
@@ -1,160 +1,110 @@
-from bs4 import BeautifulSoup
-import requests
-
-class Asurascans:
-	def __init__(self) -> None:
-		self.proxy_url = "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url="
+from .base import Source, AsyncSource
+from .cache import cached, TTL_PAGES, TTL_INFO, TTL_LISTING
+from .scheduler import background
+from .models import Result, SeriesInfo, PageList, hits
+from .plans import Plan, Record, text, attr, texts, attrs
+from .session import PROXY_URL
+
+def _card(image):
+	# Every listing renders the same .bsx card; only search serves the cover
+	# in src instead of the lazy-load data-src.
+	return dict(
+		title=attr("a", "title"),
+		id=attr("a", "href", then=lambda href: href.rsplit("/", 2)[-2]),
+		image=attr("img.ts-post-image.wp-post-image.attachment-medium.size-medium", image),
+		chapters=text("div.epxs"),
+	)
+
+SEARCH = Plan("#content > div > div.postbody > div > div.listupd > div > div.bsx", **_card("src"))
+POPULAR = Plan("#content > div > div.hotslid > div > div.listupd.popularslider > div > div > div.bsx", **_card("data-src"))
+LATEST = Plan("#content > div > div.postbody > div.bixbox.seriesearch > div.mrgn > div.listupd > div > div.bsx", **_card("data-src"))
+GENRES = Plan("#content > div > div > div > div.listupd > div > div.bsx", **_card("data-src"))
+
+SERIES = "div.seriestucon > div.seriestucontent"
+INFO = Record(
+	image=attr(f"{SERIES} > div.seriestucontl > div.thumb > img", "data-src"),
+	description=text(f"{SERIES} > div.seriestucontentr > div.seriestuhead > div.entry-content.entry-content-single > p"),
+	status=text(f"{SERIES} > div.seriestucontentr > div.seriestucont > div > table > tbody tr:nth-child(1) > td:nth-child(2)"),
+	# The rest of the table is looked up page-wide, as it always has been.
+	type=text("tr:nth-child(2) > td:nth-child(2)"),
+	year=text("tr:nth-child(3) > td:nth-child(2)"),
+	author=text("tr:nth-child(4) > td:nth-child(2)", then=lambda t: t.split(",")),
+	artists=text("tr:nth-child(5) > td:nth-child(2)", then=lambda t: t.split(",")),
+	serialization=text("tr:nth-child(6) > td:nth-child(2)", then=lambda t: t.split(",")),
+	genres=texts(f"{SERIES} > div.seriestucontentr > div.seriestucont > div > div > a", then=", ".join),
+	chapters=Plan("#chapterlist > ul > li > div > div",
+		title=text("span.chapternum"),
+		date=text("span.chapterdate"),
+		id=attr("a", "href", then=lambda href: href.rsplit("/", 2)[-2]),
+	),
+)
+
+PAGES = attrs("#readerarea > p > img", "data-src")
+
+class Asurascans(Source):
+	def __init__(self, session=None) -> None:
+		super().__init__(session)
+		self.proxy_url = PROXY_URL
 		self.parent_url = "https://asurascans.io"
-		self.results  = {
-			"status": "",
-			"results": []
-		}
+		self.results = Result()
 
 	def search(self, query:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/?s={query}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cards = soup.select("#content > div > div.postbody > div > div.listupd > div > div.bsx")
-			content = []
-
-			for items in cards:
-				tempContent = {}
-				tempContent["title"] = items.find("a").get("title")
-				tempContent["id"] = items.find("a").get("href").rsplit("/", 2)[-2]
-				tempContent["image"] = items.find("img", class_="ts-post-image wp-post-image attachment-medium size-medium").get("src")
-				tempContent["chapters"] = items.find("div", class_="epxs").get_text()
-				content.append(tempContent)		
-			
-			self.results["results"].append(content)
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/?s={query}"
+		return self._scrape(url, self._parse_search)
+
+	def _parse_search(self, response):
+		self.results.results.extend(hits(SEARCH(self._tree(response))))
+		return self.results
 
+	@cached(TTL_INFO)
 	def info(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/manga/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			content = {}
-			content["images"] = soup.select_one("div.seriestucon > div.seriestucontent > div.seriestucontl > div.thumb > img").get("data-src") 
-			content["description"] = soup.select_one("div.seriestucon > div.seriestucontent > div.seriestucontentr > div.seriestuhead > div.entry-content.entry-content-single > p").get_text()
-
-			infoSelector = soup.select_one("div.seriestucon > div.seriestucontent > div.seriestucontentr > div.seriestucont > div > table > tbody")
-			content["status"] = infoSelector.select_one("tr:nth-child(1) > td:nth-child(2)").get_text()
-			content["type"] = soup.select_one("tr:nth-child(2) > td:nth-child(2)").get_text()
-			content["year"] = soup.select_one("tr:nth-child(3) > td:nth-child(2)").get_text()
-			content["author"] = soup.select_one("tr:nth-child(4) > td:nth-child(2)").get_text().split(",")
-			content["artists"] = soup.select_one("tr:nth-child(5) > td:nth-child(2)").get_text().split(",")
-			content["serialization"] = soup.select_one("tr:nth-child(6) > td:nth-child(2)").get_text().split(",")
-
-			genresSelector = soup.select("div.seriestucon > div.seriestucontent > div.seriestucontentr > div.seriestucont > div > div > a")
-			content["genres"] = ", ".join(i.get_text() for i in genresSelector)
-
-			chapterSelector = soup.select("#chapterlist > ul > li > div > div")
-			chapters =  []
-			for items in chapterSelector:
-				tempChapter = {}
-				tempChapter["title"] = items.find("span", class_="chapternum").get_text()
-				tempChapter["date"] = items.find("span", class_="chapterdate").get_text()
-				tempChapter["id"] = items.find("a").get("href").rsplit("/", 2)[-2]
-				chapters.append(tempChapter)
-			content["chapters"] = chapters
-	
-			self.results["results"].append(content)
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/manga/{id}"
+		return self._scrape(url, self._parse_info)
+
+	def _parse_info(self, response):
+		self.results.results = SeriesInfo.from_row(INFO(self._tree(response)))
+		return self.results
 	
+	@cached(TTL_PAGES)
 	def pages(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
+		url = f"{self.proxy_url}{self.parent_url}/{id}"
+		return self._scrape(url, self._parse_pages)
 
-			imgSelector = soup.select("#readerarea > p > img")
-			self.results["results"] = [i.get("data-src") for i in imgSelector]
-			return self.results
+	def _parse_pages(self, response):
+		self.results.results = PageList(PAGES(self._tree(response)))
+		return self.results
 
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
 
+	@cached(TTL_LISTING)
+	@background
 	def popular(self):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cards = soup.select("#content > div > div.hotslid > div > div.listupd.popularslider > div > div > div.bsx")
-			content = []
-			
-			for items in cards:
-				tempContent = {}
-				tempContent["title"] = items.find("a").get("title")
-				tempContent["id"] = items.find("a").get("href").rsplit("/", 2)[-2]
-				tempContent["image"] = items.find("img", class_="ts-post-image wp-post-image attachment-medium size-medium").get("data-src")
-				tempContent["chapters"] = items.find("div", class_="epxs").get_text()
-				content.append(tempContent)		
-			
-			self.results["results"].append(content)
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}"
+		return self._scrape(url, self._parse_popular)
+
+	def _parse_popular(self, response):
+		self.results.results.extend(hits(POPULAR(self._tree(response))))
+		return self.results
 
+	@cached(TTL_LISTING)
+	@background
 	def latest(self, page:str = "1"):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/manga/?page={page}&order=update"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cards = soup.select("#content > div > div.postbody > div.bixbox.seriesearch > div.mrgn > div.listupd > div > div.bsx")
-			content = []
-			
-			for items in cards:
-				tempContent = {}
-				tempContent["title"] = items.find("a").get("title")
-				tempContent["id"] = items.find("a").get("href").rsplit("/", 2)[-2]
-				tempContent["image"] = items.find("img", class_="ts-post-image wp-post-image attachment-medium size-medium").get("data-src")
-				tempContent["chapters"] = items.find("div", class_="epxs").get_text()
-				content.append(tempContent)		
-			
-			self.results["results"].append(content)
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/manga/?page={page}&order=update"
+		return self._scrape(url, self._parse_latest)
 
+	def _parse_latest(self, response):
+		self.results.results.extend(hits(LATEST(self._tree(response))))
+		return self.results
+
+	@cached(TTL_LISTING)
+	@background
 	def genres(self, type:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/genres/{type}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cards = soup.select("#content > div > div > div > div.listupd > div > div.bsx")
-			content = []
-			
-			for items in cards:
-				tempContent = {}
-				tempContent["title"] = items.find("a").get("title")
-				tempContent["id"] = items.find("a").get("href").rsplit("/", 2)[-2]
-				tempContent["image"] = items.find("img", class_="ts-post-image wp-post-image attachment-medium size-medium").get("data-src")
-				tempContent["chapters"] = items.find("div", class_="epxs").get_text()
-				content.append(tempContent)		
-			
-			self.results["results"].append(content)
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
\ No newline at end of file
+		url = f"{self.proxy_url}{self.parent_url}/genres/{type}"
+		return self._scrape(url, self._parse_genres)
+
+	def _parse_genres(self, response):
+		self.results.results.extend(hits(GENRES(self._tree(response))))
+		return self.results
+
+
+class AsyncAsurascans(AsyncSource, Asurascans):
+	pass
@@ -0,0 +1,61 @@
+from . import plans
+from .scheduler import Saturated, get_scheduler
+from .session import get_session, get_async_client, fetch_async
+
+
+class Source:
+	"""
+	Shared plumbing for the scraper classes. A source method builds the
+	upstream URL and hands it to _scrape together with a parser; _scrape does
+	the fetch, records the status on self.results (a models.Result) and
+	records any failure as its error. Parsers take the raw response,
+	so the same method body works for the async variants below, and run the
+	source's selector plans (see plans.py) over self._tree(response).
+	"""
+
+	def __init__(self, session=None) -> None:
+		self.session = session or get_session()
+
+	def _scrape(self, url, parse):
+		try:
+			response = self.session.get(url)
+			self.results.status = response.status_code
+			return parse(response)
+		except Exception as e:
+			self.results.fail(e)
+			return self.results
+
+	@staticmethod
+	def _tree(response):
+		return plans.parse(response.content)
+
+
+class AsyncSource(Source):
+	"""
+	Mix in ahead of a Source subclass to get an awaitable version of it:
+	class AsyncManganato(AsyncSource, Manganato). Every method that goes
+	through _scrape then returns a coroutine fetched on the shared
+	httpx.AsyncClient instead of blocking a worker thread. Fetches wait for
+	a slot in the source's upstream budget (see scheduler.py); Saturated is
+	raised rather than stuffed into results so the API can answer 503.
+	"""
+
+	def __init__(self, client=None, session=None) -> None:
+		super().__init__(session=session)
+		self.client = client or get_async_client()
+		self.budget = type(self).__name__.removeprefix("Async").lower()
+
+	async def _fetch(self, url):
+		async with get_scheduler().slot(self.budget):
+			return await fetch_async(self.client, url)
+
+	async def _scrape(self, url, parse):
+		try:
+			response = await self._fetch(url)
+			self.results.status = response.status_code
+			return parse(response)
+		except Saturated:
+			raise
+		except Exception as e:
+			self.results.fail(e)
+			return self.results
@@ -0,0 +1,247 @@
+import os
+import time
+import json
+import pickle
+import asyncio
+import hashlib
+import inspect
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from .models import Result
+
+# Per-method freshness, in seconds: (ttl, stale). Within ttl a cached result is
+# returned as is; for `stale` seconds after that it's still returned, but a
+# background refresh is kicked off so the next caller gets a fresh copy.
+TTL_PAGES = (30 * 24 * 3600, 0)      # a chapter's page list never changes
+TTL_INFO = (600, 3600)               # new chapters show up here
+TTL_LISTING = (180, 900)             # latest / popular / newest ...
+
+MAX_ENTRIES = int(os.environ.get("SCRAPER_CACHE_ENTRIES", 2048))
+# Set to a directory to keep cached results across restarts.
+CACHE_DIR = os.environ.get("SCRAPER_CACHE_DIR")
+
+
+class DiskBackend:
+	"""
+	One pickle per key under `directory`. Only ever consulted on a memory
+	miss, so it's what makes a restarted worker warm, not a second tier on
+	the hot path. Any object with get/set/delete can stand in for it.
+	"""
+
+	def __init__(self, directory) -> None:
+		self.directory = directory
+		os.makedirs(directory, exist_ok=True)
+
+	def _path(self, key):
+		return os.path.join(self.directory, hashlib.sha1(key.encode()).hexdigest() + ".pickle")
+
+	def get(self, key):
+		try:
+			with open(self._path(key), "rb") as f:
+				return pickle.load(f)
+		except (OSError, pickle.PickleError, EOFError):
+			return None
+
+	def set(self, key, entry):
+		path = self._path(key)
+		tmpPath = path + ".tmp"
+		with open(tmpPath, "wb") as f:
+			pickle.dump(entry, f, protocol=pickle.HIGHEST_PROTOCOL)
+		os.replace(tmpPath, path)
+
+	def delete(self, key):
+		try:
+			os.remove(self._path(key))
+		except OSError:
+			pass
+
+
+class ResultCache:
+	"""
+	Size-bounded LRU of (stored_at, value) entries, with an optional
+	persistence backend behind it. Thread-safe, since the sync sources run
+	on FastAPI's threadpool.
+	"""
+
+	def __init__(self, max_entries=MAX_ENTRIES, backend=None) -> None:
+		self.max_entries = max_entries
+		self.backend = backend
+		self._entries = OrderedDict()
+		self._lock = threading.Lock()
+		self._refreshing = set()
+
+	def get(self, key):
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is not None:
+				self._entries.move_to_end(key)
+				return entry
+		if self.backend is not None:
+			entry = self.backend.get(key)
+			if entry is not None:
+				self._remember(key, entry)
+			return entry
+		return None
+
+	def set(self, key, value):
+		entry = (time.time(), value)
+		self._remember(key, entry)
+		if self.backend is not None:
+			try:
+				self.backend.set(key, entry)
+			except Exception:
+				pass  # a full disk shouldn't take the endpoint down with it
+
+	def _remember(self, key, entry):
+		with self._lock:
+			self._entries[key] = entry
+			self._entries.move_to_end(key)
+			while len(self._entries) > self.max_entries:
+				self._entries.popitem(last=False)
+
+	def start_refresh(self, key):
+		"""True if the caller should refresh key; False if someone already is."""
+		with self._lock:
+			if key in self._refreshing:
+				return False
+			self._refreshing.add(key)
+			return True
+
+	def end_refresh(self, key):
+		with self._lock:
+			self._refreshing.discard(key)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+
+
+_cache = ResultCache(backend=DiskBackend(CACHE_DIR) if CACHE_DIR else None)
+_refreshPool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="cache-refresh")
+_refreshTasks = set()
+
+
+def configure(max_entries=None, backend=None):
+	"""Swap the process-wide cache, e.g. configure(backend=DiskBackend("/tmp/x"))."""
+	global _cache
+	_cache = ResultCache(max_entries or MAX_ENTRIES, backend)
+	return _cache
+
+
+def get_cache():
+	return _cache
+
+
+def _key(self, method, signature, args, kwargs):
+	# Sync and async variants share entries: AsyncManganato -> Manganato.
+	source = type(self).__name__
+	if source.startswith("Async"):
+		source = source[len("Async"):]
+	# Keyed on the values, not how they were passed: latest(), latest(1) and
+	# latest(page="1") are the same page, whether a route or the crawler asks.
+	bound = signature.bind(self, *args, **kwargs)
+	bound.apply_defaults()
+	values = [str(value) for value in list(bound.arguments.values())[1:]]
+	return f"{source}.{method}:" + json.dumps(values)
+
+
+def _cacheable(result):
+	return isinstance(result, Result) and result.ok
+
+
+def cached(freshness):
+	"""
+	Cache a source method's result for `freshness` = (ttl, stale) seconds.
+
+		@cached(TTL_PAGES)
+		def pages(self, id): ...
+
+	Works for the sync classes and their Async* variants alike: the async
+	variant gets an awaitable back, and stale entries are refreshed on the
+	event loop instead of the refresh thread pool. Only successful results
+	are stored, so a failed scrape is retried on the next call.
+	Source.pages.refresh(source, id) fetches and stores unconditionally.
+	"""
+	ttl, stale = freshness
+
+	def decorator(method):
+		name = method.__name__
+		signature = inspect.signature(method)
+
+		def lookup(key):
+			entry = _cache.get(key)
+			if entry is None:
+				return None, False
+			age = time.time() - entry[0]
+			if age < ttl:
+				return entry[1], False
+			if age < ttl + stale:
+				return entry[1], True
+			return None, False
+
+		def store(key, result):
+			if _cacheable(result):
+				_cache.set(key, result)
+			return result
+
+		def refresh_sync(self, args, kwargs, key):
+			try:
+				store(key, method(type(self)(), *args, **kwargs))
+			finally:
+				_cache.end_refresh(key)
+
+		async def refresh_async(self, args, kwargs, key):
+			try:
+				result = method(type(self)(), *args, **kwargs)
+				if inspect.isawaitable(result):
+					result = await result
+				store(key, result)
+			except Exception:
+				pass  # e.g. the scheduler shed it; the stale copy stays until the next try
+			finally:
+				_cache.end_refresh(key)
+
+		async def call_async(self, args, kwargs, key):
+			value, isStale = lookup(key)
+			if value is not None:
+				if isStale and _cache.start_refresh(key):
+					task = asyncio.get_running_loop().create_task(refresh_async(self, args, kwargs, key))
+					_refreshTasks.add(task)
+					task.add_done_callback(_refreshTasks.discard)
+				return value
+			result = method(self, *args, **kwargs)
+			if inspect.isawaitable(result):
+				result = await result
+			return store(key, result)
+
+		async def refresh_now_async(result, key):
+			return store(key, await result)
+
+		def refresh(self, *args, **kwargs):
+			"""Fetch and store without looking at the cache first (see crawler.py)."""
+			key = _key(self, name, signature, args, kwargs)
+			result = method(self, *args, **kwargs)
+			if inspect.isawaitable(result):
+				return refresh_now_async(result, key)
+			return store(key, result)
+
+		@functools.wraps(method)
+		def wrapper(self, *args, **kwargs):
+			key = _key(self, name, signature, args, kwargs)
+			if inspect.iscoroutinefunction(self._scrape):
+				return call_async(self, args, kwargs, key)
+			value, isStale = lookup(key)
+			if value is not None:
+				if isStale and _cache.start_refresh(key):
+					_refreshPool.submit(refresh_sync, self, args, kwargs, key)
+				return value
+			return store(key, method(self, *args, **kwargs))
+
+		wrapper.freshness = freshness
+		wrapper.refresh = refresh
+		return wrapper
+
+	return decorator
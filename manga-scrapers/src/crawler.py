@@ -0,0 +1,87 @@
+import os
+import asyncio
+
+from .cache import TTL_LISTING
+from .models import Result
+from .registry import get_source
+from .scheduler import priority, CRAWL
+
+# Source name -> listing methods worth keeping warm. Each takes page=.
+LISTINGS = {
+	"manganato": ("latest", "newest", "hotest"),
+	"asurascans": ("latest",),
+	"mangapark": ("latest",),
+}
+
+# How deep to prefetch each listing (0 turns the crawler off), and how often.
+# The default interval re-crawls before a listing's cache entry goes stale.
+CRAWL_PAGES = int(os.environ.get("SCRAPER_CRAWL_PAGES", 5))
+CRAWL_INTERVAL = float(os.environ.get("SCRAPER_CRAWL_INTERVAL", TTL_LISTING[0] - 30))
+
+
+def _has_results(result):
+	# Past the last page the sites answer 200 with an empty listing.
+	return isinstance(result, Result) and result.ok and bool(result.results)
+
+
+class Crawler:
+	"""
+	Keeps the first `pages` pages of every listing in LISTINGS in the result
+	cache, re-crawling every `interval` seconds. Sources are crawled
+	concurrently; within a source pages go one at a time, so each site sees
+	a steady trickle rather than a burst. Routes need nothing special: their
+	latest(page=...) calls land on the entries the crawler keeps fresh.
+	"""
+
+	def __init__(self, listings=LISTINGS, pages=CRAWL_PAGES, interval=CRAWL_INTERVAL) -> None:
+		self.listings = listings
+		self.pages = pages
+		self.interval = interval
+		self._task = None
+
+	def start(self):
+		"""Begin crawling on the running loop. No-op if disabled or already running."""
+		if self.pages > 0 and self._task is None:
+			self._task = asyncio.get_running_loop().create_task(self._run())
+
+	async def stop(self):
+		if self._task is None:
+			return
+		self._task.cancel()
+		try:
+			await self._task
+		except asyncio.CancelledError:
+			pass
+		self._task = None
+
+	async def _run(self):
+		loop = asyncio.get_running_loop()
+		while True:
+			started = loop.time()
+			# Queue behind everything a user is waiting on (see scheduler.py).
+			with priority(CRAWL):
+				await self.crawl()
+			await asyncio.sleep(max(self.interval - (loop.time() - started), 1.0))
+
+	async def crawl(self):
+		"""One pass over every listing. Returns {"manganato.latest": pages cached, ...}."""
+		crawled = await asyncio.gather(*(self._crawl_source(name, methods) for name, methods in self.listings.items()))
+		return {listing: count for counts in crawled for listing, count in counts}
+
+	async def _crawl_source(self, name, methods):
+		counts = []
+		for method in methods:
+			fetched = 0
+			for page in range(1, self.pages + 1):
+				source = get_source(name)()
+				try:
+					result = await getattr(type(source), method).refresh(source, page=str(page))
+				except Exception:
+					break
+				# An empty or failed page ends this listing until the next pass;
+				# anything already cached keeps being served meanwhile.
+				if not _has_results(result):
+					break
+				fetched += 1
+			counts.append((f"{name}.{method}", fetched))
+		return counts
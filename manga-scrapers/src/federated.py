@@ -0,0 +1,119 @@
+import re
+import asyncio
+import unicodedata
+from difflib import SequenceMatcher
+
+from .models import SearchHit
+from .registry import get_source
+from .scheduler import Saturated
+
+# Source name -> query formatter. The formatters mirror what the per-source
+# routes in api/main.py do to the query before searching.
+SEARCH_SOURCES = {
+	"manganato": lambda q: q.replace(" ", "_"),
+	"mangareader": lambda q: q,
+	"mangapill": lambda q: q,
+	"asurascans": lambda q: q.replace(" ", "+"),
+	"flamescans": lambda q: q,
+	"mangaworld": lambda q: q,
+	"mangapark": lambda q: q,
+	"scanvf": lambda q: q,
+}
+
+# Seconds a single source gets before it's dropped from the response.
+DEFAULT_DEADLINE = 6.0
+MAX_DEADLINE = 20.0
+
+_PUNCTUATION = re.compile(r"[^\w\s]")
+_SPACES = re.compile(r"\s+")
+
+
+def normalize_title(title):
+	"""
+	Key used to spot the same series on different sites: accents folded,
+	punctuation dropped, case and whitespace collapsed, leading "the" removed.
+	"Solo Leveling", "solo-leveling" and "Solo Leveling!" all map to
+	"solo leveling".
+	"""
+	title = unicodedata.normalize("NFKD", title or "")
+	title = "".join(c for c in title if not unicodedata.combining(c))
+	title = _PUNCTUATION.sub(" ", title.lower().replace("_", " "))
+	title = _SPACES.sub(" ", title).strip()
+	if title.startswith("the "):
+		title = title[4:]
+	return title
+
+
+def score(query, key):
+	"""How well a normalized title matches a normalized query, 0..1."""
+	if not query or not key:
+		return 0.0
+	if key == query:
+		return 1.0
+	ratio = SequenceMatcher(None, query, key).ratio()
+	if key.startswith(query):
+		ratio = max(ratio, 0.9)
+	elif query in key:
+		ratio = max(ratio, 0.75)
+	queryWords = set(query.split())
+	overlap = len(queryWords & set(key.split())) / len(queryWords)
+	return round(max(ratio, 0.7 * overlap), 4)
+
+
+async def _search_one(name, query, deadline):
+	formatQuery = SEARCH_SOURCES[name]
+	try:
+		data = await asyncio.wait_for(get_source(name)().search(query=formatQuery(query)), deadline)
+	except asyncio.TimeoutError:
+		return name, "timeout", []
+	except Saturated:
+		return name, "busy", []
+	except Exception:
+		return name, "error", []
+	if not data.ok or not isinstance(data.results, list):
+		return name, "error", []
+	return name, "ok", [hit for hit in data.results if isinstance(hit, SearchHit) and hit.title]
+
+
+async def federated_search(query, sources=None, deadline=DEFAULT_DEADLINE):
+	"""
+	Search every source at once and yield events as they come in:
+	  {"type": "result", "key", "title", "score", "sources": [...]}  new series
+	  {"type": "merge", "key", "score", "source": {...}}  another site has it too
+	  {"type": "source", "source", "status", "count"}  one site finished
+	  {"type": "done", "results": [...]}  everything, deduped and ranked
+	Each source gets `deadline` seconds; one that overruns or fails is
+	reported and skipped, never waited on.
+	"""
+	normalizedQuery = normalize_title(query)
+	names = [name for name in (sources or SEARCH_SOURCES) if name in SEARCH_SOURCES]
+	tasks = [asyncio.ensure_future(_search_one(name, query, deadline)) for name in names]
+	merged = {}
+
+	try:
+		for finished in asyncio.as_completed(tasks):
+			name, status, hits = await finished
+			for hit in hits:
+				key = normalize_title(hit.title)
+				entry = {"source": name, **hit.to_builtins()}
+				if key in merged:
+					series = merged[key]
+					if any(s["source"] == name for s in series["sources"]):
+						continue
+					series["sources"].append(entry)
+					# Being listed by more sites is a decent sign it's the series people mean.
+					series["score"] = round(series["match"] + 0.02 * (len(series["sources"]) - 1), 4)
+					yield {"type": "merge", "key": key, "score": series["score"], "source": entry}
+				else:
+					match = score(normalizedQuery, key)
+					merged[key] = {"key": key, "title": hit.title, "match": match, "score": match, "sources": [entry]}
+					yield {"type": "result", "key": key, "title": hit.title, "score": match, "sources": [entry]}
+			yield {"type": "source", "source": name, "status": status, "count": len(hits)}
+	finally:
+		for task in tasks:
+			task.cancel()
+
+	ranked = sorted(merged.values(), key=lambda s: (-s["score"], -len(s["sources"]), s["key"]))
+	for series in ranked:
+		del series["match"]
+	yield {"type": "done", "results": ranked}
@@ -1,114 +1,88 @@
-from bs4 import BeautifulSoup
-import requests
-
-class Flamescans:
-	def __init__(self) -> None:
-		self.proxy_url = "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url="
+from .base import Source, AsyncSource
+from .cache import cached, TTL_PAGES, TTL_INFO, TTL_LISTING
+from .scheduler import background
+from .models import Result, SeriesInfo, PageList, hits
+from .plans import Plan, Record, text, attr, texts, attrs
+from .session import PROXY_URL
+
+CARD = dict(
+	title=attr("a", "title"),
+	id=attr("a", "href", then=lambda href: href.rsplit("/", 2)[-2]),
+	image=attr("img.ts-post-image.wp-post-image.attachment-medium.size-medium", "src"),
+	status=text("a div.bigor div.extra-info div.imptdt div.status i"),
+)
+SEARCH = Plan("div.wrapper > div.postbody > div > div.listupd > div > div", **CARD)
+SORT = Plan("div.wrapper > div.postbody > div.bixbox.seriesearch > div.mrgn > div.listupd > div > div.bsx", **CARD)
+
+MORE_INFO = "div.main-info > div.second-half > div.left-side > div"
+INFO = Record(
+	image=attr("div.main-info > div.first-half > div.thumb-half > div.thumb > img", "src"),
+	title=text("div.main-info > div.first-half > div.info-half div.titles h1.entry-title"),
+	genres=texts("div.main-info > div.first-half > div.info-half > div.genres-container > div > span > a", then=lambda names: ", ".join(names).split(", ")),
+	description=text("div.main-info > div.first-half > div.info-half div.summary div.wd-full div.entry-content.entry-content-single", then=str.strip),
+	type=text(f"{MORE_INFO} div:nth-child(1) > i"),
+	status=text(f"{MORE_INFO} div:nth-child(2) > i"),
+	year=text(f"{MORE_INFO} div:nth-child(3) > i"),
+	author=text(f"{MORE_INFO} div:nth-child(4) > i"),
+	artist=text(f"{MORE_INFO} div:nth-child(5) > i"),
+	serialization=text(f"{MORE_INFO} div:nth-child(6) > i"),
+	chapters=Plan("#chapterlist > ul > li",
+		id=attr("a", "href", then=lambda href: href.rsplit("/", 2)[-2]),
+		title=text("div.chbox div.eph-num span.chapternum", then=lambda t: t.strip().replace("\n", " ")),
+	),
+)
+
+PAGES = attrs("#readerarea > p > img", "src")
+
+class Flamescans(Source):
+	def __init__(self, session=None) -> None:
+		super().__init__(session)
+		self.proxy_url = PROXY_URL
 		self.parent_url = "https://flamecomics.me"
-		self.results  = {
-			"status": "",
-			"results": []
-		}
+		self.results = Result()
 	
 	def search(self, query:str):
-		try:
-			newQuery = query.replace(" ", "+")
-			url = f"{self.proxy_url}{self.parent_url}/?s={newQuery}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cards = soup.select("div.wrapper > div.postbody > div > div.listupd > div > div")
+		newQuery = query.replace(" ", "+")
+		url = f"{self.proxy_url}{self.parent_url}/?s={newQuery}"
+		return self._scrape(url, self._parse_search)
 
-			for items in cards:
-				tempContent = {}
-				tempContent["title"] = items.find("a").get("title")
-				tempContent["id"] = items.find("a").get("href").rsplit("/", 2)[-2]
-				tempContent["image"] = items.find("img", class_="ts-post-image wp-post-image attachment-medium size-medium").get("src")
-				tempContent["status"] = items.find("a").find("div", class_="bigor").find("div", class_="extra-info").find("div", class_="imptdt").find("div", class_="status").find("i").get_text()
-				self.results["results"].append(tempContent)
-
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+	def _parse_search(self, response):
+		self.results.results.extend(hits(SEARCH(self._tree(response))))
+		return self.results
 
+	@cached(TTL_INFO)
 	def info(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/series/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			content = {}
-			content["image"] = soup.select_one("div.main-info > div.first-half > div.thumb-half > div.thumb > img").get("src")
+		url = f"{self.proxy_url}{self.parent_url}/series/{id}"
+		return self._scrape(url, self._parse_info)
 
-			infoSelector = soup.select_one("div.main-info > div.first-half > div.info-half")
-			content["title"] = infoSelector.find("div", class_="titles").find("h1", class_="entry-title").get_text()
-			
-			genreSelector = soup.select("div.main-info > div.first-half > div.info-half > div.genres-container > div > span > a")
-			content["genres"] = ", ".join(i.get_text() for i in genreSelector).split(", ")
+	def _parse_info(self, response):
+		content = INFO(self._tree(response))
+		content["chapters"] = content["chapters"][::-1]
 
-			content["description"] = infoSelector.find("div", class_="summary").find("div", class_="wd-full").find("div", class_="entry-content entry-content-single").get_text().strip()
+		self.results.results = SeriesInfo.from_row(content)
+		return self.results
 
-			moreInfoSelector = soup.select_one("div.main-info > div.second-half > div.left-side > div")
-			content["type"] = moreInfoSelector.select_one("div:nth-child(1) > i").get_text()
-			content["status"] = moreInfoSelector.select_one("div:nth-child(2) > i").get_text()
-			content["year"] = moreInfoSelector.select_one("div:nth-child(3) > i").get_text()
-			content["author"] = moreInfoSelector.select_one("div:nth-child(4) > i").get_text()
-			content["artist"] = moreInfoSelector.select_one("div:nth-child(5) > i").get_text()
-			content["serialization"] = moreInfoSelector.select_one("div:nth-child(6) > i").get_text()
-
-			chapterSelector = soup.select("#chapterlist > ul > li")
-			chapter = []
-			for chap in chapterSelector:
-				tempChapter = {}
-				tempChapter["id"] = chap.find("a").get("href").rsplit("/", 2)[-2]
-				tempChapter["title"] = chap.find("div", class_="chbox").find("div", class_="eph-num").find("span", class_="chapternum").get_text().strip().replace("\n", " ")
-				chapter.append(tempChapter)
-			content["chapters"] = chapter[::-1]
-
-			self.results["results"] = content
-			return self.results
-
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
 	
+	@cached(TTL_PAGES)
 	def pages(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
+		url = f"{self.proxy_url}{self.parent_url}/{id}"
+		return self._scrape(url, self._parse_pages)
 
-			imageSelector = soup.select("#readerarea > p > img")
-			self.results["results"] = [i.get("src") for i in imageSelector]
+	def _parse_pages(self, response):
+		self.results.results = PageList(PAGES(self._tree(response)))
 
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		return self.results
 	
+	@cached(TTL_LISTING)
+	@background
 	def sort(self, type:str = ""):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/series/?order={type}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cardsSelector = soup.select("div.wrapper > div.postbody > div.bixbox.seriesearch > div.mrgn > div.listupd > div > div.bsx")
+		url = f"{self.proxy_url}{self.parent_url}/series/?order={type}"
+		return self._scrape(url, self._parse_sort)
 
-			for items in cardsSelector:
-				tempContent = {}
-				tempContent["title"] = items.find("a").get("title")
-				tempContent["id"] = items.find("a").get("href").rsplit("/", 2)[-2]
-				tempContent["image"] = items.find("img", class_="ts-post-image wp-post-image attachment-medium size-medium").get("src")
-				tempContent["status"] = items.find("a").find("div", class_="bigor").find("div", class_="extra-info").find("div", class_="imptdt").find("div", class_="status").find("i").get_text()
-				self.results["results"].append(tempContent)
+	def _parse_sort(self, response):
+		self.results.results.extend(hits(SORT(self._tree(response))))
+		return self.results
 
-			return self.results
 
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
\ No newline at end of file
+class AsyncFlamescans(AsyncSource, Flamescans):
+	pass
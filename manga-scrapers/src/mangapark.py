@@ -1,132 +1,112 @@
-from bs4 import BeautifulSoup
-import requests
+from .base import Source, AsyncSource
+from .cache import cached, TTL_PAGES, TTL_INFO, TTL_LISTING
+from .scheduler import background
+from .models import Result, SeriesInfo, PageList, hits
+from .plans import Plan, Record, text, attr, texts, nodes
+from .session import PROXY_URL
 import json
 import re
 
-class Mangapark:
-	def __init__(self) -> None:
+SPANS = texts("span")
+LINKS = texts("a")
+
+SEARCH = Plan("#app-wrapper > main > div.grid.gap-5.grid-cols-1.border-t.border-t-base-200.pt-5 > div",
+	title=text("h3.font-bold.space-x-1"),
+	image=attr("div.shrink-0.basis-20 div.group.relative.w-full a img", "src"),
+	id=attr("h3.font-bold.space-x-1 a.link-hover.link-pri", "href", then=lambda href: href.split("/")[2]),
+	authors=text("div[q:key=6N_0]", default="?"),
+)
+
+HEADER = "#app-wrapper > main > div.flex.flex-col > div.mt-3 > div.space-y-2.hidden"
+MIDDLE = "#app-wrapper > main > div.flex.flex-col > div.mt-3 > div:nth-child(2)"
+INFO = Record(
+	image=attr("#app-wrapper > main > div.flex.flex-col > div.flex > div.w-24 > img", "src"),
+	title=text(f"{HEADER} h3"),
+	altTitle=nodes(f"{HEADER} div[q:key=tz_2]", then=lambda found: ", ".join(t for t in SPANS(found[0]) if t != " / ") if found else "?"),
+	author=nodes(f"{HEADER} div[q:key=tz_4]", then=lambda found: ", ".join(LINKS(found[0]))),
+	genres=nodes(f"{MIDDLE} div[q:key=30_2]", then=lambda found: " ".join(SPANS(found[0]))),
+	status=text(f"{MIDDLE} div[q:key=Yn_8] span[q:key=Yn_5]"),
+	description=texts("#app-wrapper > main > div.flex.flex-col > div.mt-3 > div > div > div.overflow-y-hidden.max-h-28 > div:nth-child(1) > react-island > div div", then=" ".join),
+	chapters=Plan("#app-wrapper > main > div:nth-child(5) > div:nth-child(2) > div > div > div > div.space-x-1",
+		id=attr("a", "href", then=lambda href: href.split("/", 2)[2]),
+		title=text("a"),
+	),
+)
+
+# The reader's page list lives in a JSON blob in the fourth-from-last script.
+SCRIPTS = texts("script")
+
+LATEST = Plan("#app-wrapper > main > div > div.space-y-5 > div.grid.gap-5.grid-cols-1.border-t.border-t-base-200.pt-3 > div",
+	image=attr("img", "src"),
+	title=text("div.pl-3.grow.flex.flex-col.space-y-1.group h3"),
+	id=attr("div.pl-3.grow.flex.flex-col.space-y-1.group h3 a", "href", then=lambda href: href.split("/")[2]),
+	chapterReleased=text("div[q:key=R7_8] span a"),
+)
+
+class Mangapark(Source):
+	def __init__(self, session=None) -> None:
+		super().__init__(session)
 		self.parent_url = "https://mangapark.net"
-		self.proxy_url = "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url="
-		self.results  = {
-			"status": None,
-			"results": []
-		}
+		self.proxy_url = PROXY_URL
+		self.results = Result()
 		self.pattern = r"https:\/\/xfs-n\d+\.xfspp\.com\/comic\/\d+\/[a-zA-Z0-9]+\/[a-f0-9]+\/\d+_\d+_\d+_\d+\.(?:webp|jpeg)"
 		self.pattern_two = r"https:\/\/xfs-n\d+\.xfspp\.com\/comic\/\d+\/[a-zA-Z0-9]+\/[a-zA-Z0-9]+\/[a-zA-Z0-9]+\/\d+_[a-zA-Z0-9]+_\d+_\d+\.(?:webp|jpeg)"
 		self.pattern_three = r"https:\/\/xfs-n\d+\.xfspp\.com\/comic\/\d+\/images+\/[a-zA-Z0-9]+\/[a-zA-Z0-9]+\/[a-zA-Z0-9]+_\d+_\d+_\d+\.(?:webp|jpeg|jpg)"
 		
 
 	def search(self, query:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/search?word={query}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cardSelector = soup.select("#app-wrapper > main > div.grid.gap-5.grid-cols-1.border-t.border-t-base-200.pt-5 > div")
-
-			for card in cardSelector:
-				tempContent = {}
-				tempContent["title"] = card.find("h3", class_="font-bold space-x-1").get_text()
-				tempContent["image"] = card.find("div", class_="shrink-0 basis-20 md:basis-24").find("div", class_="group relative w-full").find("a").find("img").get("src")
-				tempContent["id"] = card.find("h3", class_="font-bold space-x-1").find("a", class_="link-hover link-pri").get("href").split("/")[2]
-				try:
-					tempContent["authors"] = card.find("div", attrs={"q:key": "6N_0"}).get_text()
-				except:
-					tempContent["authors"] = "?"
-				self.results["results"].append(tempContent)
-			
-			return self.results
-
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
-		
-	def info(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/title/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			content = {}
-			content["image"] = soup.select_one("#app-wrapper > main > div.flex.flex-col > div.flex > div.w-24 > img").get("src")
+		url = f"{self.proxy_url}{self.parent_url}/search?word={query}"
+		return self._scrape(url, self._parse_search)
 
-			headerSection = soup.select_one("#app-wrapper > main > div.flex.flex-col > div.mt-3 > div.space-y-2.hidden")
-			content["title"] = headerSection.find("h3").get_text()
-			try:
-				content["altTitle"] = ", ".join(i.get_text() for i in headerSection.find("div", attrs={"q:key": "tz_2"}).find_all("span") if i.get_text() != " / ")
-			except:
-				content["altTitle"] = "?"
-			content["author"] = ", ".join(i.get_text() for i in headerSection.find("div", attrs={"q:key": "tz_4"}).find_all("a"))
-
-			middleSection = soup.select_one("#app-wrapper > main > div.flex.flex-col > div.mt-3 > div:nth-child(2)")
-			content["genres"] = " ".join(i.get_text() for i in middleSection.find("div", attrs={"q:key": "30_2"}).find_all("span"))
-			content["status"] = middleSection.find("div", attrs={"q:key": "Yn_8"}).find("span", attrs={"q:key": "Yn_5"}).get_text()
-
-			content["description"] = " ".join(i.get_text() for i in soup.select_one("#app-wrapper > main > div.flex.flex-col > div.mt-3 > div > div > div.overflow-y-hidden.max-h-28 > div:nth-child(1) > react-island > div").find_all("div"))
+	def _parse_search(self, response):
+		self.results.results.extend(hits(SEARCH(self._tree(response))))
+		
+		return self.results
 
-			chapterSelector = soup.select("#app-wrapper > main > div:nth-child(5) > div:nth-child(2) > div > div > div > div.space-x-1")
-			chapters = []
+		
+	@cached(TTL_INFO)
+	def info(self, id:str):
+		url = f"{self.proxy_url}{self.parent_url}/title/{id}"
+		return self._scrape(url, self._parse_info)
 
-			for chapter in chapterSelector:
-				tempChapter = {}
-				tempChapter["id"] = chapter.find("a").get("href").split("/", 2)[2]
-				tempChapter["title"] = chapter.find("a").get_text()
-				chapters.append(tempChapter)
-			
-			content["chapters"] = chapters[::-1]
+	def _parse_info(self, response):
+		content = INFO(self._tree(response))
+		content["chapters"] = content["chapters"][::-1]
 
-			self.results["results"] = content
-			return self.results
+		self.results.results = SeriesInfo.from_row(content)
+		return self.results
 		
 
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
 		
+	@cached(TTL_PAGES)
 	def pages(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/title/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			scriptTags = soup.find_all("script")
-			jsonify = json.loads(scriptTags[-4].text)			
-			pages = []
-			
-			for i in jsonify["objs"]:
-				try:
-					if re.match(self.pattern, i) or re.match(self.pattern_two, i) or re.match(self.pattern_three, i):
-						pages.append(i)
-				except:
-					pass
-			self.results["results"] = pages
-			return self.results
-
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/title/{id}"
+		return self._scrape(url, self._parse_pages)
+
+	def _parse_pages(self, response):
+		jsonify = json.loads(SCRIPTS(self._tree(response))[-4])
+		pages = []
+		
+		for i in jsonify["objs"]:
+			try:
+				if re.match(self.pattern, i) or re.match(self.pattern_two, i) or re.match(self.pattern_three, i):
+					pages.append(i)
+			except:
+				pass
+		self.results.results = PageList(pages)
+		return self.results
+
 
+	@cached(TTL_LISTING)
+	@background
 	def latest(self, page:str = "1"):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/latest/{page}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cardSelector = soup.select("#app-wrapper > main > div > div.space-y-5 > div.grid.gap-5.grid-cols-1.border-t.border-t-base-200.pt-3 > div")
-
-			for card in cardSelector:
-				content = {}
-				content["image"] = card.find("img").get("src")
-				content["title"] = card.find("div", class_="pl-3 grow flex flex-col space-y-1 group").find("h3").get_text()
-				content["id"] = card.find("div", class_="pl-3 grow flex flex-col space-y-1 group").find("h3").find("a").get("href").split("/")[2]
-				content["chapterReleased"] = card.find("div", attrs={"q:key": "R7_8"}).find("span").find("a").get_text()
-				self.results["results"].append(content)
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/latest/{page}"
+		return self._scrape(url, self._parse_latest)
+
+	def _parse_latest(self, response):
+		self.results.results.extend(hits(LATEST(self._tree(response))))
+		return self.results
+
 
+class AsyncMangapark(AsyncSource, Mangapark):
+	pass
@@ -1,139 +1,104 @@
-from bs4 import BeautifulSoup
-import requests
-
-class Mangapill:
-	def __init__(self) -> None:
-		self.proxy_url = "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url="
+from .base import Source, AsyncSource
+from .cache import cached, TTL_PAGES, TTL_INFO, TTL_LISTING
+from .scheduler import background
+from .models import Result, SeriesInfo, PageList, hits
+from .plans import Plan, Record, text, attr, texts, attrs
+from .session import PROXY_URL
+
+# /search and /mangas/new render the same card.
+CARD = dict(
+	id=attr("a.relative.block", "href", then=lambda href: href.split("/", 1)[1]),
+	title=text("div.mt-3.font-black.leading-tight.line-clamp-2"),
+	subheading=text("div.line-clamp-2.text-xs.text-secondary.mt-1", default="?"),
+	image=attr("a.relative.block figure img", "data-src"), # MARK: Referer is required
+	type=texts("div.flex.flex-wrap.gap-1.mt-1 div", then=lambda tags: tags[0]),
+	year=texts("div.flex.flex-wrap.gap-1.mt-1 div", then=lambda tags: tags[1]),
+	status=texts("div.flex.flex-wrap.gap-1.mt-1 div", then=lambda tags: tags[2]),
+)
+SEARCH = Plan("body > div.container.py-3 > div.my-3.grid.justify-end.gap-3.grid-cols-2 > div", **CARD)
+NEW = Plan("body > div.container.py-3 > div.grid.justify-end.gap-3.grid-cols-2 > div", **CARD)
+
+DETAILS = "body > div.container > div.flex.flex-col > div.flex.flex-col"
+INFO = Record(
+	image=attr("body > div.container > div.flex.flex-col > div.text-transparent.flex-shrink-0.w-60.h-80.relative.rounded.bg-card.mr-3.mb-3 > img", "data-src"),
+	title=text(f"{DETAILS} > div:nth-child(1) > h1"),
+	description=text(f"{DETAILS} > div:nth-child(2) > p"),
+	type=text(f"{DETAILS} > div.grid.grid-cols-1 > div:nth-child(1) > div"),
+	status=text(f"{DETAILS} > div.grid.grid-cols-1 > div:nth-child(2) > div"),
+	year=text(f"{DETAILS} > div.grid.grid-cols-1 > div:nth-child(3) > div"),
+	genres=texts(f"{DETAILS} > div:nth-child(4) > a"),
+	chapters=Plan("#chapters > div > a",
+		title=text(),
+		id=attr(None, "href", then=lambda href: href.split("/", 1)[1]),
+	),
+)
+
+PAGES = attrs("body > div > chapter-page > div > div.relative.bg-card.flex.justify-center.items-center > picture > img", "data-src")
+
+RECENT = Plan("body > div.container.py-3 > div.grid.grid-cols-2 > div",
+	id=attr("div.px-1 a.leading-tight.text-secondary", "href", then=lambda href: href.split("/", 1)[1]),
+	image=attr("a figure img", "data-src"),
+	title=text("div.px-1 a.leading-tight.text-secondary div.line-clamp-2.text-sm.font-bold"),
+)
+
+class Mangapill(Source):
+	def __init__(self, session=None) -> None:
+		super().__init__(session)
+		self.proxy_url = PROXY_URL
 		self.parent_url = "https://mangapill.com"
-		self.results  = {
-			"status": "",
-			"results": []
-		}
+		self.results = Result()
 
 	def search(self, query: str):
-		try:
-			newQuery = query.replace(" ", "+")
-			url = f"{self.proxy_url}{self.parent_url}/search?q={newQuery}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cards = soup.select("body > div.container.py-3 > div.my-3.grid.justify-end.gap-3.grid-cols-2 > div")
-
-			for items in cards:
-				tempContent = {}
-				tempContent["id"] = items.find("a", class_="relative block").get("href").split("/", 1)[1]
-				tempContent["title"] = items.find("div", class_="mt-3 font-black leading-tight line-clamp-2").get_text()
-				try:
-					tempContent["subheading"] = items.find("div", class_="line-clamp-2 text-xs text-secondary mt-1").get_text()
-				except:
-					tempContent["subheading"] = "?"
-				tempContent["image"] = items.find("a", class_="relative block").find("figure").find("img").get("data-src") # MARK: Referer is required
-				genresSelector = items.find("div", class_="flex flex-wrap gap-1 mt-1").find_all("div")
-				tempContent["type"] = genresSelector[0].get_text()
-				tempContent["year"] = genresSelector[1].get_text()
-				tempContent["status"] = genresSelector[2].get_text()
-				self.results["results"].append(tempContent)
-
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		newQuery = query.replace(" ", "+")
+		url = f"{self.proxy_url}{self.parent_url}/search?q={newQuery}"
+		return self._scrape(url, self._parse_search)
+
+	def _parse_search(self, response):
+		self.results.results.extend(hits(SEARCH(self._tree(response))))
+		return self.results
 	
+	@cached(TTL_INFO)
 	def info(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")			
-
-			tempContent = {}
-			tempContent["image"] = soup.select_one("body > div.container > div.flex.flex-col > div.text-transparent.flex-shrink-0.w-60.h-80.relative.rounded.bg-card.mr-3.mb-3 > img").get("data-src")
-			tempContent["title"] = soup.select_one("body > div.container > div.flex.flex-col > div.flex.flex-col > div:nth-child(1) > h1").get_text()
-			tempContent["description"] = soup.select_one("body > div.container > div.flex.flex-col > div.flex.flex-col > div:nth-child(2) > p").get_text()
-			tempContent["type"] = soup.select_one("body > div.container > div.flex.flex-col > div.flex.flex-col > div.grid.grid-cols-1 > div:nth-child(1) > div").get_text()
-			tempContent["status"] = soup.select_one("body > div.container > div.flex.flex-col > div.flex.flex-col > div.grid.grid-cols-1 > div:nth-child(2) > div").get_text()
-			tempContent["year"] = soup.select_one("body > div.container > div.flex.flex-col > div.flex.flex-col > div.grid.grid-cols-1 > div:nth-child(3) > div").get_text()
-
-			genresSelector = soup.select("body > div.container > div.flex.flex-col > div.flex.flex-col > div:nth-child(4) > a")
-			tempContent["genres"] = [i.get_text() for i in genresSelector]
-
-			chapterSelector = soup.select("#chapters > div > a")
-			chapters = []
-			for items in chapterSelector:
-				tempChapters = {}
-				tempChapters["title"] = items.get_text()
-				tempChapters["id"] = items.get("href").split("/", 1)[1]
-				chapters.append(tempChapters)
-			tempContent["chapters"] = chapters[::-1]
-
-			self.results["results"] = tempContent
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results			
+		url = f"{self.proxy_url}{self.parent_url}/{id}"
+		return self._scrape(url, self._parse_info)
+
+	def _parse_info(self, response):
+		tempContent = INFO(self._tree(response))
+		tempContent["chapters"] = tempContent["chapters"][::-1]
+
+		self.results.results = SeriesInfo.from_row(tempContent)
+		return self.results
 
+	@cached(TTL_PAGES)
 	def pages(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")	
+		url = f"{self.proxy_url}{self.parent_url}/{id}"
+		return self._scrape(url, self._parse_pages)
 
-			imageSelector = soup.select("body > div > chapter-page > div > div.relative.bg-card.flex.justify-center.items-center > picture > img")
-			self.results["results"] = [i.get("data-src") for i in imageSelector]
-			return self.results
+	def _parse_pages(self, response):
+		self.results.results = PageList(PAGES(self._tree(response)))
+		return self.results
 
-		except Exception as e:
-			self.results["results"] = e
-			return self.results	
 
+	@cached(TTL_LISTING)
+	@background
 	def new(self, type:str): # Same as search
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/mangas/new"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")	
-
-			cards = soup.select("body > div.container.py-3 > div.grid.justify-end.gap-3.grid-cols-2 > div")
-
-			for items in cards:
-				tempContent = {}
-				tempContent["id"] = items.find("a", class_="relative block").get("href").split("/", 1)[1]
-				tempContent["title"] = items.find("div", class_="mt-3 font-black leading-tight line-clamp-2").get_text()
-				try:
-					tempContent["subheading"] = items.find("div", class_="line-clamp-2 text-xs text-secondary mt-1").get_text()
-				except:
-					tempContent["subheading"] = "?"
-				tempContent["image"] = items.find("a", class_="relative block").find("figure").find("img").get("data-src") # MARK: Referer is required
-				genresSelector = items.find("div", class_="flex flex-wrap gap-1 mt-1").find_all("div")
-				tempContent["type"] = genresSelector[0].get_text()
-				tempContent["year"] = genresSelector[1].get_text()
-				tempContent["status"] = genresSelector[2].get_text()
-				self.results["results"].append(tempContent)
-
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results	
+		url = f"{self.proxy_url}{self.parent_url}/mangas/new"
+		return self._scrape(url, self._parse_new)
 
+	def _parse_new(self, response):
+		self.results.results.extend(hits(NEW(self._tree(response))))
+		return self.results
+
+	@cached(TTL_LISTING)
+	@background
 	def recent(self): # Same as search
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/chapters"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")	
-
-			cards = soup.select("body > div.container.py-3 > div.grid.grid-cols-2 > div")
-
-			for items in cards:
-				tempContent = {}
-				tempContent["id"] = items.find("div", class_="px-1").find("a", class_="mt-1.5 leading-tight text-secondary").get("href").split("/", 1)[1]
-				tempContent["image"] = items.find("a").find("figure").find("img").get("data-src")
-				tempContent["title"] = items.find("div", class_="px-1").find("a", class_="mt-1.5 leading-tight text-secondary").find("div", class_="line-clamp-2 text-sm font-bold").get_text()
-				self.results["results"].append(tempContent)
-
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results	
\ No newline at end of file
+		url = f"{self.proxy_url}{self.parent_url}/chapters"
+		return self._scrape(url, self._parse_recent)
+
+	def _parse_recent(self, response):
+		self.results.results.extend(hits(RECENT(self._tree(response))))
+		return self.results
+
+
+class AsyncMangapill(AsyncSource, Mangapill):
+	pass
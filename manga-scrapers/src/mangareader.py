@@ -1,110 +1,97 @@
-from bs4 import BeautifulSoup
-import requests
-
-class Mangareader:
-	def __init__(self) -> None:
+from .base import Source, AsyncSource
+from .cache import cached, TTL_PAGES, TTL_INFO, TTL_LISTING
+from .scheduler import background
+from .models import Result, SearchHit, SeriesInfo, PageList
+from .plans import Plan, Record, text, attr, texts, attrs
+from .session import PROXY_URL
+
+# Cover paths are site-relative; the parsers prefix them with parent_url.
+SEARCH = Plan("#ares > div > table > tbody > tr",
+	title=text("a"),
+	id=attr("a", "href", then=lambda href: href.split("/")[2]),
+	image=attr("div.d56", "data-src"),
+	chapters=text("div.d58", then=lambda t: t.split(" ")[0]),
+	status=text("div.d58", then=lambda t: t.rsplit(" ")[3]),
+	genres=text("div.d60", then=lambda t: t.replace("\n", "").replace(" ", "").split(",")[:-1]),
+)
+
+DETAILS = "#main > div.d14 > div > div.d37"
+INFO = Record(
+	image=attr(f"{DETAILS} > div.d38 > img", "src"),
+	title=text(f"{DETAILS} > div.d39 > div.d40"),
+	status=text(f"{DETAILS} > div.d39 > table > tbody > tr:nth-child(4) > td:nth-child(2)"),
+	author=text(f"{DETAILS} > div.d39 > table > tbody > tr:nth-child(5) > td:nth-child(2)", then=lambda t: t.strip().split(",")[0]),
+	genres=texts(f"{DETAILS} > div.d39 > table > tbody > tr:nth-child(7) > td:nth-child(2) > a", then=", ".join),
+	chapters=Plan("#main > div.d14 > div > table > tbody > tr > td > a",
+		title=text(then=str.strip),
+		id=attr(None, "href", then=lambda href: href.split("/", 1)[1]),
+	),
+)
+
+PAGES = attrs("#ib > div > img", "data-src")
+
+LATEST = Plan("#main > div.d14 > div > div.d38 > div.d39 > table > tbody > tr",
+	title=text("div.d42 a"),
+	id=attr("div.d42 a", "href", then=lambda href: href.split("/")[2]),
+	image=attr("div.d41", "data-src"),
+	author=text("div.d43", then=lambda t: t.strip().replace("\n", "").split(",")[:-1]),
+	chapters=text("div.d44", then=lambda t: t.strip().split(" ")[0].replace("\xa0", " ")),
+	status=text("div.d44", then=lambda t: t.strip().split(" ")[-1][1:-1]),
+	genres=text("div.d46", then=lambda t: t.strip().replace(" ", "").replace("\n", " ").split(",")[:-1]),
+)
+
+class Mangareader(Source):
+	def __init__(self, session=None) -> None:
+		super().__init__(session)
 		self.parent_url = "https://mangareader.tv"
-		self.proxy_url = "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url="
-		self.results  = {
-			"status": None,
-			"results": []
-		}
+		self.proxy_url = PROXY_URL
+		self.results = Result()
 	def search(self, query:str):
-		try:
-			formattedQuery = query.replace(" ", "+")
-			url = f"{self.proxy_url}{self.parent_url}/search/?w={formattedQuery}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cards = soup.select("#ares > div > table > tbody > tr")
+		formattedQuery = query.replace(" ", "+")
+		url = f"{self.proxy_url}{self.parent_url}/search/?w={formattedQuery}"
+		return self._scrape(url, self._parse_search)
 
-			for items in cards:
-				tempContent = {}	
-				tempContent["title"] = items.find("a").get_text()
-				tempContent["id"] = items.find("a").get("href").split("/")[2]
-				tempContent["image"] = f"{self.parent_url}{items.find('div', class_='d56').get('data-src')}"
-				tempContent["chapters"] = items.find("div", class_="d58").get_text().split(" ")[0]
-				tempContent["status"] = items.find("div", class_="d58").get_text().rsplit(" ")[3]
-				tempContent["genres"] = items.find("div", class_="d60").get_text().replace("\n", "").replace(" ", "").split(",")[:-1]
-				self.results["results"].append(tempContent)
+	def _parse_search(self, response):
+		for tempContent in SEARCH(self._tree(response)):
+			tempContent["image"] = f"{self.parent_url}{tempContent['image']}"
+			self.results.results.append(SearchHit.from_row(tempContent))
 
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		return self.results
 
+	@cached(TTL_INFO)
 	def info(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/manga/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			tempContent = {}
-			tempContent["image"] = f"{self.parent_url}{soup.select_one('#main > div.d14 > div > div.d37 > div.d38 > img').get('src')}"
-			tempContent["title"] = soup.select_one("#main > div.d14 > div > div.d37 > div.d39 > div.d40").get_text()
-			tempContent["status"] = soup.select_one("#main > div.d14 > div > div.d37 > div.d39 > table > tbody > tr:nth-child(4) > td:nth-child(2)").get_text()
-			tempContent["author"] = soup.select_one("#main > div.d14 > div > div.d37 > div.d39 > table > tbody > tr:nth-child(5) > td:nth-child(2)").get_text().strip().split(",")[0]
+		url = f"{self.proxy_url}{self.parent_url}/manga/{id}"
+		return self._scrape(url, self._parse_info)
 
-			genresSelector = soup.select("#main > div.d14 > div > div.d37 > div.d39 > table > tbody > tr:nth-child(7) > td:nth-child(2) > a")
-			tempContent["genres"] = ", ".join(i.get_text() for i in genresSelector)
+	def _parse_info(self, response):
+		tempContent = INFO(self._tree(response))
+		tempContent["image"] = f"{self.parent_url}{tempContent['image']}"
+		self.results.results = SeriesInfo.from_row(tempContent)
+		return self.results
 
-			chapterList = []
-			chapterSelector = soup.select("#main > div.d14 > div > table > tbody > tr > td > a")
-			for items in chapterSelector:
-				tempChapter = {}
-				tempChapter["title"] = items.get_text().strip()
-				tempChapter["id"] = items.get("href").split("/", 1)[1]
-				chapterList.append(tempChapter)
-
-			tempContent["chapters"] = chapterList
-			self.results["results"] = tempContent
-			return self.results
-
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
 		
+	@cached(TTL_PAGES)
 	def pages(self, id: str):
-		try:
-			url = f"{self.parent_url}/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			imgSelectors = soup.select("#ib > div > img")
-			images = [i.get("data-src") for i in imgSelectors]
+		url = f"{self.parent_url}/{id}"
+		return self._scrape(url, self._parse_pages)
 
-			self.results["results"] = images
-			return self.results
+	def _parse_pages(self, response):
+		self.results.results = PageList(PAGES(self._tree(response)))
+		return self.results
 
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
 		
+	@cached(TTL_LISTING)
+	@background
 	def latest(self, genre: str = ""):
-		try:
-			url = f"{self.parent_url}/genre/{genre}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
+		url = f"{self.parent_url}/genre/{genre}"
+		return self._scrape(url, self._parse_latest)
 
-			cards = soup.select("#main > div.d14 > div > div.d38 > div.d39 > table > tbody > tr")
+	def _parse_latest(self, response):
+		for tempContent in LATEST(self._tree(response)):
+			tempContent["image"] = f"{self.parent_url}{tempContent['image']}"
+			self.results.results.append(SearchHit.from_row(tempContent))
+		return self.results
 
-			for card in cards:
-				tempContent = {}
-				tempContent["title"] = card.find("div", class_="d42").find("a").get_text()
-				tempContent["id"] = card.find("div", class_="d42").find("a").get("href").split("/")[2]
-				tempContent["image"] = f"{self.parent_url}{card.find('div', class_='d41').get('data-src')}"
-				tempContent["author"] = card.find("div", class_="d43").get_text().strip().replace("\n", "").split(",")[:-1]
-				tempContent["chapters"] = card.find("div", class_="d44").get_text().strip().split(" ")[0].replace("\xa0", " ")
-				tempContent["status"] = card.find("div", class_="d44").get_text().strip().split(" ")[-1][1:-1]
-				tempContent["genres"] = card.find("div", class_="d46").get_text().strip().replace(" ", "").replace("\n", " ").split(",")[:-1]
-				self.results["results"].append(tempContent)
-			return self.results
 
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
-		
\ No newline at end of file
+class AsyncMangareader(AsyncSource, Mangareader):
+	pass
@@ -1,138 +1,126 @@
-from bs4 import BeautifulSoup
-import requests
-
-class Mangaworld:
-	def __init__(self) -> None:
+from .base import Source, AsyncSource
+from .cache import cached, TTL_PAGES, TTL_INFO, TTL_LISTING
+from .scheduler import background
+from .models import Result, SeriesInfo, PageList, hits
+from .plans import Plan, Record, text, attr, texts, attrs, nodes
+from .session import PROXY_URL
+
+LINK = text("a")
+LINKS = texts("a")
+
+SEARCH = Plan("body > div.container > div > div > div.comics-grid > div.entry",
+	title=text("div.content p.name"),
+	id=attr("a.thumb.position-relative", "href", then=lambda href: href.split("/", 3)[3]),
+	image=attr("a.thumb.position-relative img", "src"),
+	type=text("div.content div.genre a"),
+	author=text("div.content div.author a"),
+	status=text("div.content div.status a"),
+	artist=text("div.content div.artist a"),
+	genres=texts("div.content div.genres a", then=", ".join),
+)
+
+COMIC = "#manga-page > div > div > div.col-sm-12.col-md-8.col-xl-9 > div > div:nth-child(1) > div.has-shadow.comic-info.d-block.d-sm-flex"
+META = f"{COMIC} > div.info div.meta-data"
+INFO = Record(
+	title=text(f"{COMIC} > div.info h1.name.bigger"),
+	**{"alt-titles": text(f"{META} div.col-12", then=lambda t: t.split(": ", 1)[1].strip())},
+	image=attr(f"{COMIC} > div.thumb.mb-3.text-center > img", "src"),
+	type=nodes(f"{META} div.col-12.col-md-6", then=lambda found: LINK(found[2])),
+	description=text("#noidungm"),
+	status=nodes(f"{META} div.col-12.col-md-6", then=lambda found: LINK(found[3])),
+	author=text(f"{META} div.col-12.col-md-6 a"),
+	artist=nodes(f"{META} div.col-12.col-md-6", then=lambda found: LINK(found[1])),
+	genres=nodes(f"{META} div.col-12", then=lambda found: ", ".join(LINKS(found[1]))),
+)
+
+# Series split into volumes nest their chapters one level deeper.
+CHAPTER = dict(
+	id=attr("a.chap", "href", then=lambda href: href.split("/", 3)[3]),
+	title=attr("a.chap", "title"),
+)
+VOLUME_CHAPTERS = Plan("#chapterList > div.chapters-wrapper.py-2.pl-0 > div > div.volume-chapters.pl-2 > div.chapter", **CHAPTER)
+CHAPTERS = Plan("#chapterList > div.chapters-wrapper.py-2.pl-0 > div", **CHAPTER)
+
+PAGES = attrs("#page > img", "src")
+
+TRENDING = Plan("#popular > div.row > div.col-12 > div.comics-flex > div.vertical",
+	title=attr("a.thumb", "title"),
+	id=attr("a.thumb", "href", then=lambda href: href.split("/", 3)[3]),
+	image=attr("a.thumb img", "src"),
+	chapterReleased=text("a.thumb div.chapter"),
+)
+
+POPULAR = Plan("body > div.container > div > div.col-sm-12.col-md-8.col-xl-9 > div.comics-grid > div",
+	title=attr("a.thumb", "title"),
+	id=attr("a.thumb", "href", then=lambda href: href.split("/", 3)[3]),
+	image=attr("a.thumb img", "src"),
+	type=text("div.content div.genre a"),
+	status=text("div.content div.status a"),
+)
+
+class Mangaworld(Source):
+	def __init__(self, session=None) -> None:
+		super().__init__(session)
 		self.parent_url = "https://www.mangaworld.ac"
-		self.proxy_url = "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url="
-		self.results  = {
-			"status": None,
-			"results": []
-		}
+		self.proxy_url = PROXY_URL
+		self.results = Result()
 
 	def search(self, query:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/archive?keyword={query}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			cardSelector = soup.select("body > div.container > div > div > div.comics-grid > div.entry")
-
-			for card in cardSelector:
-				tempContent = {}
-				tempContent["title"] = card.find("div", class_="content").find("p", class_="name").get_text()
-				tempContent["id"]  =card.find("a", class_="thumb position-relative").get("href").split("/", 3)[3]
-				tempContent["image"] = card.find("a", class_="thumb position-relative").find("img").get("src")
-				tempContent["type"] = card.find("div", class_="content").find("div", class_="genre").find("a").get_text()
-				tempContent["author"] = card.find("div", class_="content").find("div", class_="author").find("a").get_text()
-				tempContent["status"] = card.find("div", class_="content").find("div", class_="status").find("a").get_text()
-				tempContent["artist"] = card.find("div", class_="content").find("div", class_="artist").find("a").get_text()
-				tempContent["genres"] = ", ".join(i.get_text() for i in card.find("div", class_="content").find("div", class_="genres").find_all("a"))
-				
-				self.results["results"].append(tempContent)
-			
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/archive?keyword={query}"
+		return self._scrape(url, self._parse_search)
+
+	def _parse_search(self, response):
+		self.results.results.extend(hits(SEARCH(self._tree(response))))
+		
+		return self.results
 
+	@cached(TTL_INFO)
 	def info(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			content = {}
-			infoPaneSelector = soup.select_one("#manga-page > div > div > div.col-sm-12.col-md-8.col-xl-9 > div > div:nth-child(1) > div.has-shadow.comic-info.d-block.d-sm-flex > div.info")
-			content["title"] = infoPaneSelector.find("h1", class_="name bigger").get_text()
-			content["alt-titles"] = infoPaneSelector.find("div", class_="meta-data").find("div", class_="col-12").get_text().split(": ", 1)[1].strip()
-			content["image"] = soup.select_one("#manga-page > div > div > div.col-sm-12.col-md-8.col-xl-9 > div > div:nth-child(1) > div.has-shadow.comic-info.d-block.d-sm-flex > div.thumb.mb-3.text-center > img").get("src")
-			content["type"] = infoPaneSelector.find("div", class_="meta-data").find_all("div", class_="col-12 col-md-6")[2].find("a").get_text()
-			content["description"] = soup.select_one("#noidungm").get_text()
-			content["status"] = infoPaneSelector.find("div", class_="meta-data").find_all("div", class_="col-12 col-md-6")[3].find("a").get_text()
-			content["author"] = infoPaneSelector.find("div", class_="meta-data").find("div", class_="col-12 col-md-6").find("a").get_text()
-			content["artist"] = infoPaneSelector.find("div", class_="meta-data").find_all("div", class_="col-12 col-md-6")[1].find("a").get_text()
-			content["genres"] = ", ".join(i.get_text() for i in infoPaneSelector.find("div", class_="meta-data").find_all("div", class_="col-12")[1].find_all("a"))
-
-			chapterSelector = soup.select("#chapterList > div.chapters-wrapper.py-2.pl-0 > div > div.volume-chapters.pl-2 > div.chapter")
-			if len(chapterSelector) == 0:
-				chapterSelector = soup.select("#chapterList > div.chapters-wrapper.py-2.pl-0 > div")
-			chapter = []
-			
-			for item in chapterSelector:
-				tempChapter = {}
-				tempChapter["id"] = item.find("a", class_="chap").get("href").split("/", 3)[3]
-				tempChapter["title"] = item.find("a", class_="chap").get("title")
-				chapter.append(tempChapter)
-			content["chapters"] = chapter[::-1]
-
-			self.results["results"] = content
-			return self.results
-			
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/{id}"
+		return self._scrape(url, self._parse_info)
+
+	def _parse_info(self, response):
+		tree = self._tree(response)
+
+		content = INFO(tree)
+		chapter = VOLUME_CHAPTERS(tree) or CHAPTERS(tree)
+		content["chapters"] = chapter[::-1]
+
+		self.results.results = SeriesInfo.from_row(content)
+		return self.results
+		
 
+	@cached(TTL_PAGES)
 	def pages(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			imagesSelector = soup.select("#page > img")
-			for i in imagesSelector:
-				self.results["results"].append(i.get("src"))
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/{id}"
+		return self._scrape(url, self._parse_pages)
 
+	def _parse_pages(self, response):
+		self.results.results = PageList(PAGES(self._tree(response)))
+		return self.results
+
+	@cached(TTL_LISTING)
+	@background
 	def trending(self):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			trendingCardsSelector = soup.select("#popular > div.row > div.col-12 > div.comics-flex > div.vertical")
-
-			for card in trendingCardsSelector:
-				tempContent = {}
-				tempContent["title"] = card.find("a", class_="thumb").get("title")
-				tempContent["id"] = card.find("a", class_="thumb").get("href").split("/", 3)[3]
-				tempContent["image"] = card.find("a", class_="thumb").find("img").get("src")
-				tempContent["chapterReleased"] = card.find("a", class_="thumb").find("div", class_="chapter").get_text()
-				self.results["results"].append(tempContent)
-
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}"
+		return self._scrape(url, self._parse_trending)
 
-	def popular(self, page:str = "1"):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/?page={page}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
+	def _parse_trending(self, response):
+		self.results.results.extend(hits(TRENDING(self._tree(response))))
 
-			cardsSelector = soup.select("body > div.container > div > div.col-sm-12.col-md-8.col-xl-9 > div.comics-grid > div")
+		return self.results
+
+	@cached(TTL_LISTING)
+	@background
+	def popular(self, page:str = "1"):
+		url = f"{self.proxy_url}{self.parent_url}/?page={page}"
+		return self._scrape(url, self._parse_popular)
 
-			for card in cardsSelector:
-				tempContent = {}
-				tempContent["title"] = card.find("a", class_="thumb").get("title")
-				tempContent["id"] = card.find("a", class_="thumb").get("href").split("/", 3)[3]
-				tempContent["image"] = card.find("a", class_="thumb").find("img").get("src")
-				tempContent["type"] = card.find("div", class_="content").find("div", class_="genre").find("a").get_text()
-				tempContent["status"] = card.find("div", class_="content").find("div", class_="status").find("a").get_text()
+	def _parse_popular(self, response):
+		self.results.results.extend(hits(POPULAR(self._tree(response))))
 
+		return self.results
 
-				self.results["results"].append(tempContent)
 
-			return self.results
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
\ No newline at end of file
+class AsyncMangaworld(AsyncSource, Mangaworld):
+	pass
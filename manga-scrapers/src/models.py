@@ -0,0 +1,137 @@
+from dataclasses import dataclass, field
+
+try:
+	import orjson
+except ImportError:  # plain json works, it's just slower
+	orjson = None
+	import json
+
+try:
+	import msgpack
+except ImportError:  # the binary encoding is opt-in
+	msgpack = None
+
+# What every source returns, whatever the site's markup looks like:
+#
+#	Result(status=200, results=[SearchHit, ...])      search and listings
+#	Result(status=200, results=SeriesInfo)            info
+#	Result(status=200, results=PageList)              pages
+#	Result(status=..., results=None, error="...")     the scrape failed
+#
+# Each model has the fields every source can fill in; whatever else a site
+# offers (author, status, year, chapterReleased, ...) goes in `extra` and is
+# flattened back in when encoded, so the wire shape is one flat object per
+# hit. Encoding walks the models directly instead of going through FastAPI's
+# jsonable_encoder, which inspects every value on every response.
+
+JSON_TYPE = "application/json"
+BINARY_TYPE = "application/msgpack"
+
+
+@dataclass(slots=True)
+class SearchHit:
+	id: str
+	title: str
+	image: str = None
+	extra: dict = field(default_factory=dict)
+
+	@classmethod
+	def from_row(cls, row):
+		"""Build from a plan row; the row is consumed."""
+		return cls(row.pop("id", None), row.pop("title", None), row.pop("image", None), row)
+
+	def to_builtins(self):
+		return {"id": self.id, "title": self.title, "image": self.image, **self.extra}
+
+
+@dataclass(slots=True)
+class Chapter:
+	id: str
+	title: str
+	extra: dict = field(default_factory=dict)
+
+	@classmethod
+	def from_row(cls, row):
+		return cls(row.pop("id", None), row.pop("title", None), row)
+
+	def to_builtins(self):
+		return {"id": self.id, "title": self.title, **self.extra}
+
+
+@dataclass(slots=True)
+class SeriesInfo:
+	title: str
+	image: str = None
+	description: str = None
+	chapters: list = field(default_factory=list)
+	extra: dict = field(default_factory=dict)
+
+	@classmethod
+	def from_row(cls, row):
+		chapters = [Chapter.from_row(chapter) for chapter in row.pop("chapters", ())]
+		return cls(row.pop("title", None), row.pop("image", None), row.pop("description", None), chapters, row)
+
+	def to_builtins(self):
+		return {
+			"title": self.title,
+			"image": self.image,
+			"description": self.description,
+			**self.extra,
+			"chapters": [chapter.to_builtins() for chapter in self.chapters],
+		}
+
+
+@dataclass(slots=True)
+class PageList:
+	pages: list = field(default_factory=list)
+
+	def to_builtins(self):
+		return self.pages
+
+
+@dataclass(slots=True)
+class Result:
+	status: object = ""
+	results: object = field(default_factory=list)
+	error: str = None
+
+	@property
+	def ok(self):
+		return self.status == 200 and self.error is None
+
+	def fail(self, exception):
+		self.results = None
+		self.error = f"{type(exception).__name__}: {exception}"
+
+	def to_builtins(self):
+		data = {"status": self.status, "results": to_builtins(self.results)}
+		if self.error is not None:
+			data["error"] = self.error
+		return data
+
+
+def hits(rows):
+	"""SearchHits for a list of plan rows."""
+	return [SearchHit.from_row(row) for row in rows]
+
+
+def to_builtins(value):
+	"""Plain dicts and lists, in the wire shape, for a model (or a tree of them)."""
+	if isinstance(value, list):
+		return [to_builtins(item) for item in value]
+	convert = getattr(value, "to_builtins", None)
+	return value if convert is None else convert()
+
+
+def encode_json(value):
+	data = to_builtins(value)
+	if orjson is not None:
+		return orjson.dumps(data, default=str)
+	return json.dumps(data, default=str, ensure_ascii=False, separators=(",", ":")).encode()
+
+
+def encode_binary(value):
+	"""MessagePack; only available when msgpack is installed."""
+	if msgpack is None:
+		raise RuntimeError("msgpack is not installed")
+	return msgpack.packb(to_builtins(value), use_bin_type=True, default=str)
@@ -0,0 +1,173 @@
+import re
+
+from lxml import html as lxmlHtml
+from lxml.etree import XPath
+
+# Selector plans: a source declares what it pulls out of a page once, at import
+# time, as CSS selectors compiled down to lxml XPath objects. Parsing a response
+# is then one libxml2 parse plus a handful of compiled XPath evaluations,
+# instead of bs4 building a Python object per node and re-matching selector
+# chains for every card.
+#
+#	LISTING = Plan("div.panel-content-genres > div",
+#		title=text("h3 a.genres-item-name"),
+#		id=attr("h3 a.genres-item-name", "href", then=lambda h: h.rsplit("/", 1)[1]),
+#	)
+#	LISTING(tree)  ->  [{"title": ..., "id": ...}, ...]
+#
+# Supported CSS: tag, *, .class, #id, [attr], [attr=value], :nth-child(n),
+# descendant and ">" combinators, which covers every selector the sources use.
+# [class="a b"] compares the whole attribute, like bs4's find(class_="a b"),
+# where .a.b only needs both classes to be there.
+# A selector may start with ">" to match children of the current node only.
+
+REQUIRED = object()
+
+_ATTRIBUTE = r"\[([^\]=\s]+)(?:=[\"']?([^\"'\]]*)[\"']?)?\]"
+_TOKEN = re.compile(r"^([a-zA-Z][\w-]*|\*)?((?:[.#][\w-]+|:nth-child\(\d+\)|" + _ATTRIBUTE + r")*)$")
+_STEP = re.compile(r">|(?:\[[^\]]*\]|[^\s>\[])+")
+_PART = re.compile(r"[.#][\w-]+|:nth-child\((\d+)\)|" + _ATTRIBUTE)
+_compiled = {}
+
+
+class MissingField(LookupError):
+	"""A required element wasn't on the page (layout change or a bad page)."""
+
+
+def css_to_xpath(selector):
+	steps = []
+	axis = "descendant"
+	for token in _STEP.findall(selector):
+		if token == ">":
+			axis = "child"
+			continue
+		match = _TOKEN.match(token)
+		if not match:
+			raise ValueError(f"unsupported selector {token!r} in {selector!r}")
+		predicates = []
+		for part in _PART.finditer(match.group(2)):
+			if part.group(1):
+				predicates.append(f"count(preceding-sibling::*)={int(part.group(1)) - 1}")
+			elif part.group(2):
+				# name() rather than @name, so attributes like q:key work too.
+				test = f"@*[name()='{part.group(2)}']"
+				if part.group(3) is None:
+					predicates.append(test)
+				else:
+					# bs4 split class into a list, so spacing in the attribute never mattered.
+					value = f"normalize-space({test})" if part.group(2) == "class" else test
+					predicates.append(f"{value}='{part.group(3)}'")
+			elif part.group(0)[0] == ".":
+				predicates.append(f"contains(concat(' ',normalize-space(@class),' '),' {part.group(0)[1:]} ')")
+			else:
+				predicates.append(f"@id='{part.group(0)[1:]}'")
+		steps.append(f"{axis}::{(match.group(1) or '*').lower()}" + "".join(f"[{p}]" for p in predicates))
+		axis = "descendant"
+	return "/".join(steps)
+
+
+def compile_css(selector):
+	"""Compiled XPath for a CSS selector, shared between plans that reuse it."""
+	path = _compiled.get(selector)
+	if path is None:
+		path = _compiled[selector] = XPath(css_to_xpath(selector))
+	return path
+
+
+def parse(content):
+	"""lxml tree for a response body (bytes or str)."""
+	if isinstance(content, bytes):
+		# libxml2 falls back to latin-1 when a page doesn't declare its
+		# charset; bs4 sniffed UTF-8 first, and so do we.
+		try:
+			content = content.decode("utf-8")
+		except UnicodeDecodeError:
+			pass
+	return lxmlHtml.document_fromstring(content)
+
+
+class Field:
+	"""
+	One value pulled from the first node matching `selector` (or the node the
+	plan is looking at, when selector is None). A missing node raises
+	MissingField unless a default is given, the same way the old find()
+	chains blew up on None.
+	"""
+
+	__slots__ = ("selector", "path", "get", "default", "then", "many")
+
+	def __init__(self, selector, get, default=REQUIRED, then=None, many=False) -> None:
+		self.selector = selector
+		self.path = compile_css(selector) if selector else None
+		self.get = get
+		self.default = default
+		self.then = then
+		self.many = many
+
+	def __call__(self, node):
+		matches = self.path(node) if self.path is not None else [node]
+		if self.many:
+			values = [self.get(m) for m in matches]
+			return self.then(values) if self.then else values
+		if not matches:
+			if self.default is REQUIRED:
+				raise MissingField(self.selector)
+			return self.default
+		value = self.get(matches[0])
+		return self.then(value) if self.then else value
+
+
+def _text(node):
+	return node.text_content()
+
+
+def text(selector=None, default=REQUIRED, then=None):
+	return Field(selector, _text, default, then)
+
+
+def attr(selector, name, default=REQUIRED, then=None):
+	return Field(selector, lambda node: node.get(name), default, then)
+
+
+def texts(selector, then=None):
+	"""Text of every match, as a list."""
+	return Field(selector, _text, then=then, many=True)
+
+
+def attrs(selector, name, then=None):
+	"""Attribute of every match, as a list."""
+	return Field(selector, lambda node: node.get(name), then=then, many=True)
+
+
+def nodes(selector, then):
+	"""Every matching element, handed to `then` (e.g. to pick the third one)."""
+	return Field(selector, lambda node: node, then=then, many=True)
+
+
+class Record:
+	"""A dict of fields read from the first node matching `scope` (or the node itself)."""
+
+	__slots__ = ("scope", "fields")
+
+	def __init__(self, scope=None, **fields) -> None:
+		self.scope = Field(scope, lambda node: node) if scope else None
+		self.fields = tuple(fields.items())
+
+	def __call__(self, node):
+		if self.scope is not None:
+			node = self.scope(node)
+		return {name: field(node) for name, field in self.fields}
+
+
+class Plan:
+	"""A list of dicts, one per node matching `rows`, each with `fields`."""
+
+	__slots__ = ("rows", "fields")
+
+	def __init__(self, rows, **fields) -> None:
+		self.rows = compile_css(rows)
+		self.fields = tuple(fields.items())
+
+	def __call__(self, node):
+		fields = self.fields
+		return [{name: field(row) for name, field in fields} for row in self.rows(node)]
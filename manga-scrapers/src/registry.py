@@ -0,0 +1,39 @@
+import importlib
+import threading
+
+# Source name -> (module, class). Nothing here is imported until the source is
+# first asked for, so a fresh worker only pays for lxml and the scraper module
+# once a request actually needs them.
+SOURCES = {
+	"manganato": ("src.manganato", "Manganato"),
+	"mangareader": ("src.mangareader", "Mangareader"),
+	"mangapill": ("src.mangapill", "Mangapill"),
+	"asurascans": ("src.asurascans", "Asurascans"),
+	"flamescans": ("src.flamescans", "Flamescans"),
+	"mangaworld": ("src.mangaworld", "Mangaworld"),
+	"mangapark": ("src.mangapark", "Mangapark"),
+	"scanvf": ("src.scanvf", "Scanvf"),
+}
+
+_loaded = {}
+_lock = threading.Lock()
+
+
+def get_source(name, asynchronous=True):
+	"""
+	The scraper class for `name`, imported on first use. Returns the Async*
+	variant unless asynchronous=False. Raises KeyError for unknown names.
+	"""
+	key = (name, asynchronous)
+	source = _loaded.get(key)
+	if source is None:
+		moduleName, className = SOURCES[name]
+		with _lock:
+			module = importlib.import_module(moduleName)
+			source = _loaded[key] = getattr(module, ("Async" if asynchronous else "") + className)
+	return source
+
+
+def loaded():
+	"""Names of the sources imported so far."""
+	return sorted({name for name, _ in _loaded})
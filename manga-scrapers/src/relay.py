@@ -0,0 +1,88 @@
+import asyncio
+from urllib.parse import urlsplit
+
+from fastapi import Response
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+
+from .session import get_async_client
+
+# Concurrent image relays allowed per upstream host. Image CDNs start
+# throttling well before our connection pool runs out, and one chapter load
+# fires off dozens of page requests at once.
+RELAYS_PER_HOST = 16
+# How long a relay waits for a free slot before we answer 503.
+SLOT_TIMEOUT = 10.0
+RETRY_AFTER = "2"
+
+# Request headers passed through to the image host, and response headers
+# passed back to the client.
+FORWARD_REQUEST_HEADERS = ("range", "if-range", "if-none-match", "if-modified-since")
+FORWARD_RESPONSE_HEADERS = (
+	"content-type", "content-length", "content-range", "content-encoding", "accept-ranges",
+	"cache-control", "etag", "last-modified", "expires",
+)
+DEFAULT_CONTENT_TYPE = "image/jpeg"
+
+_slots = {}
+
+
+def _slot(host):
+	semaphore = _slots.get(host)
+	if semaphore is None:
+		semaphore = _slots[host] = asyncio.Semaphore(RELAYS_PER_HOST)
+	return semaphore
+
+
+async def relay_image(url, referer, request_headers=None, client=None):
+	"""
+	Stream an upstream image straight through to the client. Chunks are
+	forwarded as they arrive, so memory per request stays at one read buffer
+	no matter how big the image is. Range/conditional requests are passed on
+	and the upstream status (200, 206, 304, 416...) comes back unchanged.
+	"""
+	client = client or get_async_client()
+	slot = _slot(urlsplit(url).netloc)
+	try:
+		await asyncio.wait_for(slot.acquire(), SLOT_TIMEOUT)
+	except asyncio.TimeoutError:
+		return Response(status_code=503, headers={"Retry-After": RETRY_AFTER})
+
+	headers = {"Referer": referer}
+	for name in FORWARD_REQUEST_HEADERS:
+		if request_headers and name in request_headers:
+			headers[name] = request_headers[name]
+
+	try:
+		upstream = await client.send(client.build_request("GET", url, headers=headers), stream=True)
+	except Exception:
+		slot.release()
+		return Response(status_code=502)
+
+	released = False
+
+	async def release():
+		# Runs from whichever comes first: the body finishing (or being
+		# closed mid-stream), or the response's background task, which still
+		# runs when the client went away before the body was ever iterated.
+		nonlocal released
+		if released:
+			return
+		released = True
+		try:
+			await upstream.aclose()
+		finally:
+			slot.release()
+
+	async def body():
+		try:
+			async for chunk in upstream.aiter_raw():
+				yield chunk
+		finally:
+			await release()
+
+	forwarded = {name: upstream.headers[name] for name in FORWARD_RESPONSE_HEADERS if name in upstream.headers}
+	forwarded.setdefault("content-type", DEFAULT_CONTENT_TYPE)
+	return StreamingResponse(
+		body(), status_code=upstream.status_code, headers=forwarded, background=BackgroundTask(release),
+	)
@@ -1,94 +1,116 @@
-from bs4 import BeautifulSoup
-import requests
+from .base import Source, AsyncSource
+from .cache import cached, TTL_PAGES, TTL_INFO
+from .models import Result, SeriesInfo, PageList, hits
+from .plans import Plan, Record, text, attr, texts, nodes, parse
+from .scheduler import Saturated
+from .session import PROXY_URL
+import asyncio
 import html
 
-class Scanvf:
-	def __init__(self) -> None:
-		self.proxy_url = "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url="
+DIVS = texts("div")
+
+SEARCH = Plan("div.container-fluid > div.row > div > div.series",
+	id=attr("div.last-series-details a", "href", then=lambda href: href.split("/")[2]),
+	image=attr("div.last-series-details a div.position-relative div.series-img-wrapper img", "data-src"),
+	title=text("div.justify-content-center a.link-series h3"),
+)
+
+BOOK = "body > main > div > div > div > div:nth-child(1)"
+INFO = Record(
+	image=attr(f"{BOOK} > div.col-12.col-md-auto > div > img", "src"),
+	title=text(f"{BOOK} > div.col-12.col-md > div > div div.col-12.mb-4.align-self-center div.d-flex.justify-content-between h1"),
+	# The exact class: the title block is also .col-12.mb-4, and comes first.
+	description=text(f"{BOOK} > div.col-12.col-md > div > div div[class='col-12 mb-4'] p"),
+	author=nodes(f"{BOOK} > div.col-12.col-lg-3.mt-4.mt-lg-0 > div div.col-6.col-md-12.mb-4", then=lambda found: ", ".join(DIVS(found[0]))),
+	genres=nodes(f"{BOOK} > div.col-12.col-lg-3.mt-4.mt-lg-0 > div div.col-6.col-md-12.mb-4", then=lambda found: ", ".join(DIVS(found[1]))),
+	chapters=Plan("body > main > div > div > div > div.row.list-books > div > div > div",
+		id=attr("a", "href", then=lambda href: href.split("/")[2]),
+		title=text("a div h5", then=lambda t: t.replace("\n", " ")),
+	),
+)
+
+# One reader page per URL; running past the last page lands back on the
+# series info page, which is how we know the chapter ended.
+PAGE_IMAGE = attr("body > main > div > div > div > div > div.col.text-center.book-page > img", "src", default=None)
+IS_INFO_PAGE = nodes("body > main > div > div > div > div:nth-child(1) > div.col-12.col-md > div > div > div:nth-child(3) > p", then=bool)
+
+class Scanvf(Source):
+	def __init__(self, session=None) -> None:
+		super().__init__(session)
+		self.proxy_url = PROXY_URL
 		self.parent_url = "https://scanvf.org"
-		self.results  = {
-			"status": "",
-			"results": []
-		}
+		self.results = Result()
 	
 	def search(self, query:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/search?q={query}"
-			response = requests.get(url)
-			content = html.unescape(response.json()) # search page didn't have a separate page 
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(content, "html.parser")
-
-			cards = soup.select("div.container-fluid > div.row > div > div.series")
-
-			for card in cards:
-				tempContent = {}
-				tempContent["id"] = card.find("div", class_="last-series-details").find("a").get("href").split("/")[2]
-				tempContent["image"] = card.find("div", class_="last-series-details").find("a").find("div", class_="position-relative").find("div", class_="series-img-wrapper").find("img").get("data-src")
-				tempContent["title"] = card.find("div", class_="justify-content-center").find("a", class_="link-series").find("h3").get_text()
+		url = f"{self.proxy_url}{self.parent_url}/search?q={query}"
+		return self._scrape(url, self._parse_search)
 
-				self.results["results"].append(tempContent)
+	def _parse_search(self, response):
+		content = html.unescape(response.json()) # search page didn't have a separate page 
+		self.results.results.extend(hits(SEARCH(parse(content))))
 
-			return self.results
-
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		return self.results
 
+	@cached(TTL_INFO)
 	def info(self, id:str):
-		try:
-			url = f"{self.proxy_url}{self.parent_url}/manga/{id}"
-			response = requests.get(url)
-			self.results["status"] = response.status_code
-			soup = BeautifulSoup(response.content, "html.parser")
-
-			content = {}
-			content["image"] = soup.select_one("body > main > div > div > div > div:nth-child(1) > div.col-12.col-md-auto > div > img").get("src")
-			
-			infoSelector = soup.select_one("body > main > div > div > div > div:nth-child(1) > div.col-12.col-md > div > div")
-			content["title"] = infoSelector.find("div", class_="col-12 mb-4 align-self-center").find("div", class_="d-flex justify-content-between").find("h1").get_text()
-			content["description"] = infoSelector.find("div", class_="col-12 mb-4").find("p").get_text()
-			
-			endContentSelector = soup.select_one("body > main > div > div > div > div:nth-child(1) > div.col-12.col-lg-3.mt-4.mt-lg-0 > div")
-			content["author"] = ", ".join(i.get_text() for i in endContentSelector.find("div", class_="col-6 col-md-12 mb-4").find_all("div"))
-			content["genres"] = ", ".join(i.get_text() for i in endContentSelector.find_all("div", class_="col-6 col-md-12 mb-4")[1].find_all("div"))
-
-			chapterSelector = soup.select("body > main > div > div > div > div.row.list-books > div > div > div")
-			chapters = []
-
-			for chapter in chapterSelector:
-				tempChapter = {}
-				tempChapter["id"] = chapter.find("a").get("href").split("/")[2]
-				tempChapter["title"] = chapter.find("a").find("div").find("h5").get_text().replace("\n", " ")
-				chapters.append(tempChapter)
-			content["chapters"] = chapters
-
-			self.results["results"] = content
-			return self.results
-			
-		except Exception as e:
-			self.results["results"] = e
-			return self.results
+		url = f"{self.proxy_url}{self.parent_url}/manga/{id}"
+		return self._scrape(url, self._parse_info)
+
+	def _parse_info(self, response):
+		self.results.results = SeriesInfo.from_row(INFO(self._tree(response)))
+		return self.results
+		
 	
+	@cached(TTL_PAGES)
 	def pages(self, id:str):
+		pageList = self.results.results = PageList()
 		try:
 			for i in range(1, 1000):
 
 				url = f"{self.proxy_url}{self.parent_url}/scan/{id}/{str(i)}"
-				response = requests.get(url)
-				self.results["status"] = response.status_code
-				soup = BeautifulSoup(response.content, "html.parser")
+				response = self.session.get(url)
+				self.results.status = response.status_code
+				image, isInfoPage = self._parse_page(response)
 
-				imageSelector = soup.select_one("body > main > div > div > div > div > div.col.text-center.book-page > img")
-				infoPageChecker = soup.select_one("body > main > div > div > div > div:nth-child(1) > div.col-12.col-md > div > div > div:nth-child(3) > p")
-
-				if imageSelector:
-					self.results["results"].append(imageSelector.get("src"))
-				elif infoPageChecker:
+				if image:
+					pageList.pages.append(image)
+				elif isInfoPage:
 					break
 
 			return self.results
 
 		except Exception as e:
-			self.results["results"] = e
-			return self.results
\ No newline at end of file
+			self.results.fail(e)
+			return self.results
+
+	def _parse_page(self, response):
+		tree = self._tree(response)
+		return PAGE_IMAGE(tree), IS_INFO_PAGE(tree)
+
+
+class AsyncScanvf(AsyncSource, Scanvf):
+	# Reader pages are fetched this many at a time instead of one by one.
+	PAGE_WINDOW = 8
+
+	@cached(TTL_PAGES)
+	async def pages(self, id:str):
+		pageList = self.results.results = PageList()
+		try:
+			for start in range(1, 1000, self.PAGE_WINDOW):
+				urls = [f"{self.proxy_url}{self.parent_url}/scan/{id}/{i}" for i in range(start, min(start + self.PAGE_WINDOW, 1000))]
+				responses = await asyncio.gather(*(self._fetch(url) for url in urls))
+				for response in responses:
+					self.results.status = response.status_code
+					image, isInfoPage = self._parse_page(response)
+					if image:
+						pageList.pages.append(image)
+					elif isInfoPage:
+						return self.results
+
+			return self.results
+
+		except Saturated:
+			raise
+		except Exception as e:
+			self.results.fail(e)
+			return self.results
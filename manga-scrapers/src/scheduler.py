@@ -0,0 +1,233 @@
+import os
+import math
+import time
+import heapq
+import asyncio
+import inspect
+import itertools
+import functools
+import contextlib
+import contextvars
+
+# Every source goes out through the same sup-proxy worker, so its quota is
+# shared: without a budget one busy source starves the other seven. Limits
+# are concurrent fetches and fetches per second, for the whole process and
+# for each source; 0 means no limit.
+MAX_INFLIGHT = int(os.environ.get("SCRAPER_MAX_INFLIGHT", 64))
+MAX_RATE = float(os.environ.get("SCRAPER_MAX_RATE", 50))
+SOURCE_INFLIGHT = int(os.environ.get("SCRAPER_SOURCE_INFLIGHT", 16))
+SOURCE_RATE = float(os.environ.get("SCRAPER_SOURCE_RATE", 12))
+
+# Fetches allowed to queue for a slot before new ones are turned away. Lower
+# priorities get a smaller share (half, quarter), so they're shed first.
+QUEUE_LIMIT = 256
+# How long a fetch waits in the queue before giving up with Saturated.
+MAX_WAIT = 10.0
+
+# Priorities, most urgent first. Someone is staring at a spinner for pages,
+# info and search; listings can wait a little; crawls can wait a lot.
+INTERACTIVE = 0
+BACKGROUND = 1
+CRAWL = 2
+
+_priority = contextvars.ContextVar("scraper_priority", default=INTERACTIVE)
+
+
+class Saturated(Exception):
+	"""No upstream slot within the budget; the client should retry after `retry_after` seconds."""
+
+	def __init__(self, retry_after) -> None:
+		super().__init__(f"upstream budget exhausted, retry after {retry_after}s")
+		self.retry_after = retry_after
+
+
+@contextlib.contextmanager
+def priority(level):
+	"""Fetches made inside the block queue at `level` (never more urgent than the caller's)."""
+	token = _priority.set(max(_priority.get(), level))
+	try:
+		yield
+	finally:
+		_priority.reset(token)
+
+
+async def _at(level, awaitable):
+	with priority(level):
+		return await awaitable
+
+
+def background(method):
+	"""
+	Mark a source method as BACKGROUND work, e.g. the listing endpoints:
+
+		@cached(TTL_LISTING)
+		@background
+		def latest(self, page="1"): ...
+
+	For the Async* variants the priority is applied when the coroutine runs,
+	which is when its fetches are made.
+	"""
+
+	@functools.wraps(method)
+	def wrapper(*args, **kwargs):
+		with priority(BACKGROUND):
+			result = method(*args, **kwargs)
+		if inspect.isawaitable(result):
+			return _at(BACKGROUND, result)
+		return result
+
+	return wrapper
+
+
+class Budget:
+	"""Concurrency limit plus a token bucket refilled at `rate` per second (burst of one second's worth)."""
+
+	__slots__ = ("limit", "rate", "burst", "active", "tokens", "updated")
+
+	def __init__(self, limit, rate) -> None:
+		self.limit = limit
+		self.rate = rate
+		self.burst = max(rate, 1.0)
+		self.active = 0
+		self.tokens = self.burst
+		self.updated = time.monotonic()
+
+	def wait(self, now):
+		"""0 if a fetch can start now, seconds until a token is due, or None if all slots are busy."""
+		if self.limit and self.active >= self.limit:
+			return None
+		if not self.rate:
+			return 0.0
+		self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+		self.updated = now
+		return 0.0 if self.tokens >= 1 else (1 - self.tokens) / self.rate
+
+	def take(self):
+		self.active += 1
+		self.tokens -= 1
+
+	def release(self):
+		self.active -= 1
+
+
+class Scheduler:
+	"""
+	Admits upstream fetches against the global and per-source budgets.
+	Fetches that can't start right away wait in one priority queue (lowest
+	level first, FIFO within a level); whenever a slot frees or a token comes
+	due, the queue is walked in order and everything that fits is let
+	through, so a source that's at its own limit doesn't hold up the others.
+	A fetch that finds the queue full, or waits longer than max_wait, gets
+	Saturated. Lives on one event loop; the sync sources don't go through it.
+	"""
+
+	def __init__(self, max_inflight=MAX_INFLIGHT, max_rate=MAX_RATE, source_inflight=SOURCE_INFLIGHT,
+			source_rate=SOURCE_RATE, queue_limit=QUEUE_LIMIT, max_wait=MAX_WAIT) -> None:
+		self.total = Budget(max_inflight, max_rate)
+		self.source_inflight = source_inflight
+		self.source_rate = source_rate
+		self.queue_limit = queue_limit
+		self.max_wait = max_wait
+		self._sources = {}
+		self._waiting = []  # heap of [level, seq, budget, future]
+		self._seq = itertools.count()
+		self._timer = None
+
+	def budget(self, source):
+		budget = self._sources.get(source)
+		if budget is None:
+			budget = self._sources[source] = Budget(self.source_inflight, self.source_rate)
+		return budget
+
+	def retry_after(self):
+		"""Whole seconds until the current queue has likely drained."""
+		throughput = self.total.rate or self.total.limit or 1
+		return max(1, math.ceil(len(self._waiting) / throughput))
+
+	@contextlib.asynccontextmanager
+	async def slot(self, source, level=None):
+		"""Hold one upstream slot for `source` for the duration of the block."""
+		budget = self.budget(source)
+		await self._acquire(budget, _priority.get() if level is None else level)
+		try:
+			yield
+		finally:
+			self._release(budget)
+
+	async def _acquire(self, budget, level):
+		now = time.monotonic()
+		if not self._waiting and self.total.wait(now) == 0 and budget.wait(now) == 0:
+			self.total.take()
+			budget.take()
+			return
+		if len(self._waiting) >= self.queue_limit >> level:
+			raise Saturated(self.retry_after())
+
+		future = asyncio.get_running_loop().create_future()
+		heapq.heappush(self._waiting, [level, next(self._seq), budget, future])
+		self._dispatch()
+		try:
+			await asyncio.wait_for(future, self.max_wait)
+		except BaseException as e:
+			# Granted just as we gave up: hand the slot straight back.
+			if future.done() and not future.cancelled():
+				self._release(budget)
+			if isinstance(e, asyncio.TimeoutError):
+				raise Saturated(self.retry_after()) from None
+			raise
+
+	def _release(self, budget):
+		budget.release()
+		self.total.release()
+		if self._waiting:
+			self._dispatch()
+
+	def _dispatch(self):
+		now = time.monotonic()
+		soonest = None
+		skipped = []
+		while self._waiting:
+			entry = heapq.heappop(self._waiting)
+			level, _, budget, future = entry
+			if future.done():
+				continue  # timed out or cancelled while queued
+			wait = self.total.wait(now)
+			if wait != 0:
+				# Nothing at all can start; keep this one at the head.
+				heapq.heappush(self._waiting, entry)
+				soonest = wait
+				break
+			wait = budget.wait(now)
+			if wait == 0:
+				self.total.take()
+				budget.take()
+				future.set_result(None)
+				continue
+			skipped.append(entry)
+			if wait is not None and (soonest is None or wait < soonest):
+				soonest = wait
+		for entry in skipped:
+			heapq.heappush(self._waiting, entry)
+
+		# Rate-limited entries don't get a release to wake them; set a timer.
+		if soonest is not None and self._waiting:
+			loop = asyncio.get_running_loop()
+			due = loop.time() + soonest
+			if self._timer is None or self._timer.when() > due or self._timer.when() <= loop.time():
+				if self._timer is not None:
+					self._timer.cancel()
+				self._timer = loop.call_at(due, self._dispatch)
+
+
+_scheduler = Scheduler()
+
+
+def configure(**limits):
+	"""Swap the process-wide scheduler, e.g. configure(max_inflight=8, source_rate=2)."""
+	global _scheduler
+	_scheduler = Scheduler(**limits)
+	return _scheduler
+
+
+def get_scheduler():
+	return _scheduler
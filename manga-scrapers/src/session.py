@@ -0,0 +1,115 @@
+import os
+import asyncio
+import threading
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+# (connect, read) seconds. Without a timeout a hung upstream pins the worker
+# thread forever.
+DEFAULT_TIMEOUT = (5, 20)
+# Keep-alive pool per host. Nearly everything goes to the sup-proxy worker,
+# so this is effectively the cap on concurrent proxy connections.
+POOL_CONNECTIONS = 8
+POOL_MAXSIZE = 32
+
+# Every source fetches through this Cloudflare worker. Overridable so load
+# tests and local runs can point the sources at a stub upstream.
+PROXY_URL = os.environ.get("SCRAPER_PROXY_URL", "https://sup-proxy.zephex0-f6c.workers.dev/api-text?url=")
+
+# Async client limits. One event loop can keep this many upstream fetches in
+# flight, which is what lets a single worker serve hundreds of scrapes.
+# httpcore scans the whole pool for every queued request, so going much past
+# ~128 costs more CPU than the extra concurrency buys.
+ASYNC_MAX_CONNECTIONS = 128
+ASYNC_MAX_KEEPALIVE = 128
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_session = None
+_session_lock = threading.Lock()
+_async_client = None
+
+
+class PooledSession(requests.Session):
+	"""requests.Session that applies DEFAULT_TIMEOUT unless the caller passes one."""
+
+	def __init__(self, timeout=DEFAULT_TIMEOUT) -> None:
+		super().__init__()
+		self.timeout = timeout
+
+	def request(self, method, url, **kwargs):
+		kwargs.setdefault("timeout", self.timeout)
+		return super().request(method, url, **kwargs)
+
+
+def make_session(timeout=DEFAULT_TIMEOUT, retries: int = 3, backoff: float = 0.5) -> PooledSession:
+	"""
+	Build a keep-alive session with bounded pools and retry-with-backoff on
+	connection errors and 429/5xx from the proxy (waits 0.5s, 1s, 2s...).
+	"""
+	session = PooledSession(timeout=timeout)
+	retry = Retry(
+		total=retries,
+		connect=retries,
+		read=retries,
+		status=retries,
+		backoff_factor=backoff,
+		status_forcelist=(429, 500, 502, 503, 504),
+		allowed_methods=frozenset({"GET", "HEAD"}),
+		respect_retry_after_header=True,
+		raise_on_status=False,
+	)
+	adapter = HTTPAdapter(pool_connections=POOL_CONNECTIONS, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+	session.mount("https://", adapter)
+	session.mount("http://", adapter)
+	return session
+
+
+def get_session() -> PooledSession:
+	"""Process-wide session shared by every source."""
+	global _session
+	if _session is None:
+		with _session_lock:
+			if _session is None:
+				_session = make_session()
+	return _session
+
+
+def make_async_client(timeout=DEFAULT_TIMEOUT) -> httpx.AsyncClient:
+	connect, read = timeout
+	return httpx.AsyncClient(
+		timeout=httpx.Timeout(read, connect=connect),
+		limits=httpx.Limits(max_connections=ASYNC_MAX_CONNECTIONS, max_keepalive_connections=ASYNC_MAX_KEEPALIVE),
+		# transport-level retries cover connection failures; status retries are in fetch_async
+		transport=httpx.AsyncHTTPTransport(retries=2),
+		follow_redirects=True,
+	)
+
+
+def get_async_client() -> httpx.AsyncClient:
+	"""Process-wide async client. Created lazily so it binds to the running loop."""
+	global _async_client
+	if _async_client is None or _async_client.is_closed:
+		_async_client = make_async_client()
+	return _async_client
+
+
+async def close_async_client() -> None:
+	global _async_client
+	if _async_client is not None:
+		await _async_client.aclose()
+		_async_client = None
+
+
+async def fetch_async(client: httpx.AsyncClient, url: str, retries: int = 3, backoff: float = 0.5, **kwargs) -> httpx.Response:
+	"""GET with the same retry-on-429/5xx and backoff policy as the sync session."""
+	for attempt in range(retries + 1):
+		response = await client.get(url, **kwargs)
+		if response.status_code not in RETRY_STATUSES or attempt == retries:
+			return response
+		retry_after = response.headers.get("retry-after", "")
+		delay = float(retry_after) if retry_after.isdigit() else backoff * (2 ** attempt)
+		await asyncio.sleep(delay)
+	return response
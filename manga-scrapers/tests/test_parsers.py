@@ -0,0 +1,228 @@
+"""
+Every source's parsers against the BeautifulSoup ones they replaced.
+
+The bs4 parsers are taken from git (the revision before src/plans.py) and
+run side by side with the current ones over small pages shaped like each
+site's markup, including the spots where a selector plan could match more
+than the old find() chain did. The old parsers returned plain dicts with a
+few keys of their own ("img", "images", a list wrapped in a list); those are
+mapped onto the model shape before comparing. libxml2 also folds CRLF to LF
+in text, as browsers do, where html.parser kept the CR, so line endings are
+compared folded.
+"""
+import os
+import sys
+import json
+import html
+import shutil
+import importlib
+import subprocess
+
+import pytest
+import requests
+
+from src.models import to_builtins
+
+pytest.importorskip("bs4")
+
+MANGA_SCRAPERS = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+BASELINE = "bs4src"
+
+
+def _git(*args, **kwargs):
+	return subprocess.run(["git", *args], cwd=MANGA_SCRAPERS, capture_output=True, check=True, **kwargs).stdout
+
+
+@pytest.fixture(scope="module")
+def baseline(tmp_path_factory):
+	"""The src package from before selector plans, importable as bs4src."""
+	try:
+		added = _git("log", "--diff-filter=A", "--format=%H", "--", "src/plans.py", text=True).split()
+		archive = _git("archive", f"{added[-1]}~1", "src") if added else None
+	except (OSError, subprocess.CalledProcessError):
+		archive = None
+	if not archive:
+		pytest.skip("no git history to take the bs4 parsers from")
+
+	root = tmp_path_factory.mktemp("baseline")
+	subprocess.run(["tar", "-x", "-C", str(root)], input=archive, check=True)
+	shutil.move(str(root / "src"), str(root / BASELINE))
+	sys.path.insert(0, str(root))
+	yield lambda module: importlib.import_module(f"{BASELINE}.{module}")
+	sys.path.remove(str(root))
+
+
+def _response(body):
+	response = requests.Response()
+	response.status_code = 200
+	response.encoding = "utf-8"
+	response._content = body.encode()
+	return response
+
+
+def _hit(row):
+	row = dict(row)
+	if "img" in row:
+		row["image"] = row.pop("img")
+	for key in ("id", "title", "image"):
+		row.setdefault(key, None)
+	return row
+
+
+def _fold(value):
+	if isinstance(value, str):
+		return value.replace("\r\n", "\n")
+	if isinstance(value, list):
+		return [_fold(item) for item in value]
+	if isinstance(value, dict):
+		return {key: _fold(item) for key, item in value.items()}
+	return value
+
+
+def _old_results(results):
+	"""The model's wire shape for what a bs4 parser returned."""
+	results = _fold(results)
+	if isinstance(results, list) and results and isinstance(results[0], list):
+		results = [row for rows in results for row in rows]
+	if isinstance(results, list) and len(results) == 1 and isinstance(results[0], dict) and "chapters" in results[0]:
+		results = results[0]
+	if isinstance(results, dict):
+		info = dict(results)
+		if "images" in info:
+			info["image"] = info.pop("images")
+		for key in ("title", "image", "description"):
+			info.setdefault(key, None)
+		info["chapters"] = [{key: value for key, value in _hit(chapter).items() if key != "image"} for chapter in info.get("chapters", [])]
+		return info
+	if isinstance(results, list) and results and isinstance(results[0], dict):
+		return [_hit(row) for row in results]
+	return results
+
+
+# ── Pages ─────────────────────────────────────────────────────────────────────
+
+SCANVF_CARD = '<div class="series"><div class="last-series-details"><a href="/manga/op-{i}"><div class="position-relative"><div class="series-img-wrapper"><img data-src="c{i}.jpg"></div></div></a></div><div class="d-flex justify-content-center"><a class="link-series"><h3>OP {i}</h3></a></div></div>'
+SCANVF_SEARCH = json.dumps(html.escape('<div class="container-fluid"><div class="row"><div>' + "".join(SCANVF_CARD.format(i=i) for i in range(3)) + "</div></div></div>"))
+# The title block is .col-12.mb-4 too, comes first, and can hold a <p>.
+SCANVF_INFO = """<html><body><main><div><div><div><div><div class="col-12 col-md-auto"><div><img src="cov.jpg"></div></div><div class="col-12 col-md"><div><div><div class="col-12 mb-4 align-self-center"><div class="d-flex justify-content-between"><h1>One Piece</h1></div><p>Alt name</p></div><div class="col-12 mb-4"><p>Real description</p></div></div></div></div><div class="col-12 col-lg-3 mt-4 mt-lg-0"><div><div class="col-6 col-md-12 mb-4"><div>Oda</div></div><div class="col-6 col-md-12 mb-4"><div>Action</div><div>Aventure</div></div></div></div></div><div class="row list-books"><div><div><div><a href="/scan/op_1"><div><h5>Chapitre
+1</h5></div></a></div></div></div></div></div></div></div></main></body></html>"""
+SCANVF_PAGE = '<html><body><main><div><div><div><div><div class="col text-center book-page"><img src="p.jpg"></div></div></div></div></div></main></body></html>'
+
+MANGANATO = '<html><body><div class="body-site"><div class="container container-main">{}</div></div></body></html>'
+MANGANATO_CARD = '<div class="search-story-item"><a class="item-img" href="https://x/manga-{i}" title="H{i}"><img class="img-loading" src="i{i}.jpg"></a><div class="item-right"><h3><a class="a-h text-nowrap item-title">T &amp; {i}</a></h3><span class="item-author" title="Au{i}">a</span><span class="item-time">Updated : Jan 01,2024 - 10:00</span></div></div>'
+MANGANATO_SEARCH = MANGANATO.format('<div class="container-main-left"><div class="panel-search-story">' + "".join(MANGANATO_CARD.format(i=i) for i in range(3)) + "</div></div>")
+MANGANATO_LISTING_CARD = '<div class="content-genres-item"><a><img class="img-loading" src="l{i}.jpg"></a><div class="genres-item-info"><h3><a class="genres-item-name" href="https://x/manga-{i}">L{i}</a></h3><p class="genres-item-view-time"><span class="genres-item-time">Jan {i}</span><span class="genres-item-author">Auth{i}</span></p><div class="genres-item-description"> desc {i} </div></div></div>'
+MANGANATO_LISTING = MANGANATO.format('<div class="panel-content-genres">' + "".join(MANGANATO_LISTING_CARD.format(i=i) for i in range(3)) + "</div>")
+# The description block as the site serves it: the label, CRLF, then the indent.
+MANGANATO_INFO = MANGANATO.format('<div class="container-main-left"><div class="panel-story-info"><div class="story-info-left"><span class="info-image"><img src="cover.jpg"></span></div><div class="story-info-right"><h1>Solo</h1><table><tbody><tr><td>a</td><td class="table-value"><a class="a-h">Chugong</a></td></tr><tr><td></td><td class="table-value">x</td></tr><tr><td></td><td class="table-value">Ongoing</td></tr><tr><td></td><td class="table-value"><a class="a-h">Action</a> - <a class="a-h">Drama</a></td></tr></tbody></table></div></div><div class="panel-story-info-description" id="panel-story-info-description">\n<h3>Description :</h3>\r\n        Hello world,\r\n        second line. </div><div class="panel-story-chapter-list"><ul><li><a class="chapter-name" href="https://chapmanganato.to/manga-x/chapter-2">Ch 2</a></li><li><a class="chapter-name" href="https://chapmanganato.to/manga-x/chapter-1">Ch 1</a></li></ul></div></div>')
+MANGANATO_PAGES = '<html><body><div class="body-site"><div class="container-chapter-reader"><img src="1.jpg"><img src="2.jpg"></div></div></body></html>'
+
+ASURA_CARD = '<div class="bs"><div class="bsx"><a href="https://asurascans.io/manga/s-{i}/" title="S{i}"><img class="ts-post-image wp-post-image attachment-medium size-medium" src="s{i}.jpg" data-src="d{i}.jpg"><div class="epxs">Chapter {i}</div></a></div></div>'
+ASURA_CARDS = "".join(ASURA_CARD.format(i=i) for i in range(3))
+ASURA_ROWS = "".join(f"<tr><td>k</td><td>v{i}, w</td></tr>" for i in range(1, 7))
+ASURA_INFO = f'<html><body><div class="seriestucon"><div class="seriestucontent"><div class="seriestucontl"><div class="thumb"><img data-src="cov.jpg"></div></div><div class="seriestucontentr"><div class="seriestuhead"><div class="entry-content entry-content-single"><p>Desc</p></div></div><div class="seriestucont"><div><table><tbody>{ASURA_ROWS}</tbody></table></div><div><div><a>Action</a><a>Fantasy</a></div></div></div></div></div></div><div id="chapterlist"><ul><li><div><div><a href="https://asurascans.io/sl-1/"><span class="chapternum">Ch 1</span><span class="chapterdate">Jan</span></a></div></div></li></ul></div></body></html>'
+
+FLAME_CARD = '<div class="bs"><div class="bsx"><a href="https://f/series/s-{i}/" title="S{i}"><div class="bigor"><div class="extra-info"><div class="imptdt"><div class="status"><i>Ongoing</i></div></div></div></div><img class="ts-post-image wp-post-image attachment-medium size-medium" src="s{i}.jpg"></a></div></div>'
+FLAME_CARDS = "".join(FLAME_CARD.format(i=i) for i in range(3))
+FLAME_MORE = "".join(f"<div><b>k</b><i>v{i}</i></div>" for i in range(1, 7))
+FLAME_INFO = f'<html><body><div class="main-info"><div class="first-half"><div class="thumb-half"><div class="thumb"><img src="cov.jpg"></div></div><div class="info-half"><div class="titles"><h1 class="entry-title">ORV</h1></div><div class="genres-container"><div><span><a>Action</a></span><span><a>Drama</a></span></div></div><div class="summary"><div class="wd-full"><div class="entry-content entry-content-single"> Desc </div></div></div></div></div><div class="second-half"><div class="left-side"><div>{FLAME_MORE}</div></div></div></div><div id="chapterlist"><ul><li><a href="https://f/orv-2/"><div class="chbox"><div class="eph-num"><span class="chapternum"> Chapter\n2 </span></div></div></a></li><li><a href="https://f/orv-1/"><div class="chbox"><div class="eph-num"><span class="chapternum">Chapter 1</span></div></div></a></li></ul></div></body></html>'
+
+PILL_CARD = '<div><a class="relative block" href="/manga/{i}/t-{i}"><figure><img data-src="c{i}.jpg"></figure></a><div class="mt-3 font-black leading-tight line-clamp-2">T{i}</div>{sub}<div class="flex flex-wrap gap-1 mt-1"><div>manga</div><div>200{i}</div><div>publishing</div></div></div>'
+PILL_CARDS = "".join(PILL_CARD.format(i=i, sub='<div class="line-clamp-2 text-xs text-secondary mt-1">S</div>' if i else "") for i in range(3))
+PILL_INFO = '<html><body><div class="container"><div class="flex flex-col"><div class="text-transparent flex-shrink-0 w-60 h-80 relative rounded bg-card mr-3 mb-3"><img data-src="cov.jpg"></div><div class="flex flex-col"><div><h1>One Piece</h1></div><div><p>Pirates</p></div><div class="grid grid-cols-1"><div><label>t</label><div>Manga</div></div><div><label>s</label><div>Ongoing</div></div><div><label>y</label><div>1997</div></div></div><div><a>Action</a><a>Comedy</a></div></div></div><div id="chapters"><div><a href="/chapters/2-1/ch-2">Ch 2</a><a href="/chapters/2-0/ch-1">Ch 1</a></div></div></div></body></html>'
+PILL_PAGES = '<html><body><div>' + "".join(f'<chapter-page><div><div class="relative bg-card flex justify-center items-center"><picture><img data-src="p{i}.jpg"></picture></div></div></chapter-page>' for i in range(2)) + "</div></body></html>"
+PILL_RECENT_CARD = '<div><a href="/x"><figure><img data-src="r{i}.jpg"></figure></a><div class="px-1"><a class="mt-1.5 leading-tight text-secondary" href="/manga/{i}/x"><div class="line-clamp-2 text-sm font-bold">R{i}</div></a></div></div>'
+
+PARK_CARD = '<div><div class="shrink-0 basis-20 md:basis-24"><div class="group relative w-full"><a href="/title/1"><img src="c{i}.jpg"></a></div></div><div><h3 class="font-bold space-x-1"><a class="link-hover link-pri" href="/title/1-en-op{i}">OP{i}</a></h3>{author}</div></div>'
+PARK_CARDS = "".join(PARK_CARD.format(i=i, author='<div q:key="6N_0">Oda</div>' if i else "") for i in range(3))
+
+
+def park_info(alt):
+	return f'<html><body><div id="app-wrapper"><main><div></div><div></div><div class="flex flex-col"><div class="flex"><div class="w-24"><img src="cov.jpg"></div></div><div class="mt-3"><div class="space-y-2 hidden"><h3>One Piece</h3>{alt}<div q:key="tz_4"><a>Oda</a><a>Eiichiro</a></div></div><div><div q:key="30_2"><span>Action</span><span>Comedy</span></div><div q:key="Yn_8"><span q:key="Yn_5">Ongoing</span></div></div><div><div><div class="overflow-y-hidden max-h-28"><div><react-island><div><div>Para 1</div><div>Para 2</div></div></react-island></div></div></div></div></div></div><div></div><div><div></div><div><div><div><div><div class="space-x-1"><a href="/title/op/c2">Ch 2</a></div><div class="space-x-1"><a href="/title/op/c1">Ch 1</a></div></div></div></div></div></div></main></div></body></html>'
+
+
+PARK_OBJS = json.dumps({"objs": ["https://xfs-n01.xfspp.com/comic/7/abc/0123abcd/1_2_3_4.webp", "nope", 5]})
+PARK_LATEST_CARD = '<div><img src="l{i}.jpg"><div class="pl-3 grow flex flex-col space-y-1 group"><h3><a href="/title/l-{i}">L{i}</a></h3><div q:key="R7_8"><span><a>Ch {i}</a></span></div></div></div>'
+
+READER_ROW = '<tr><td><div class="d56" data-src="/c{i}.jpg"></div></td><td><a href="/manga/op-{i}">OP {i}</a><div class="d58">1100 chapters - Ongoing x</div><div class="d60">Action, \nComedy, </div></td></tr>'
+READER_TRS = "".join(f"<tr><td>k</td><td>v{i}, z <a>G{i}</a></td></tr>" for i in range(1, 8))
+READER_INFO = f'<html><body><div id="main"><div class="d14"><div><div class="d37"><div class="d38"><img src="/cov.jpg"></div><div class="d39"><div class="d40">One Piece</div><table><tbody>{READER_TRS}</tbody></table></div></div><table><tbody><tr><td><a href="/chapter/op/1"> Ch 1 </a></td></tr><tr><td><a href="/chapter/op/2">Ch 2</a></td></tr></tbody></table></div></div></div></body></html>'
+READER_LATEST_ROW = '<tr><td><div class="d41" data-src="/l{i}.jpg"></div></td><td><div class="d42"><a href="/manga/x-{i}">X{i}</a></div><div class="d43">\nAuthor A, Author B, </div><div class="d44"> 12\xa0chapters (Ongoing) </div><div class="d46"> Action, Drama, </div></td></tr>'
+
+WORLD_CARD = '<div class="entry"><a class="thumb position-relative" href="https://www.mangaworld.ac/manga/1/op-{i}"><img src="c{i}.jpg"></a><div class="content"><p class="name">OP{i}</p><div class="genre"><a>Manga</a></div><div class="author"><a>Oda</a></div><div class="status"><a>In corso</a></div><div class="artist"><a>Oda</a></div><div class="genres"><a>Azione</a><a>Avventura</a></div></div></div>'
+WORLD_META = '<div class="meta-data row"><div class="col-12"><span>Titoli alternativi: </span>Alt One</div><div class="col-12"><a>Azione</a><a>Shonen</a></div><div class="col-12 col-md-6"><a>Oda</a></div><div class="col-12 col-md-6"><a>OdaArt</a></div><div class="col-12 col-md-6"><a>Manga</a></div><div class="col-12 col-md-6"><a>In corso</a></div></div>'
+WORLD_CHAPTERS = '<div class="chapter"><a class="chap" href="https://www.mangaworld.ac/manga/1/op/read/2" title="Cap 2"></a></div><div class="chapter"><a class="chap" href="https://www.mangaworld.ac/manga/1/op/read/1" title="Cap 1"></a></div>'
+
+
+def world_info(chapters):
+	return f'<html><body><div id="manga-page"><div><div><div class="col-sm-12 col-md-8 col-xl-9"><div><div><div class="has-shadow comic-info d-block d-sm-flex"><div class="thumb mb-3 text-center"><img src="cov.jpg"></div><div class="info"><h1 class="name bigger">One Piece</h1>{WORLD_META}</div></div></div></div></div></div></div></div><div id="noidungm">Trama</div><div id="chapterList"><div class="chapters-wrapper py-2 pl-0">{chapters}</div></div></body></html>'
+
+
+WORLD_TRENDING_CARD = '<div class="vertical"><a class="thumb" href="https://www.mangaworld.ac/manga/1/t-{i}" title="T{i}"><img src="t{i}.jpg"><div class="chapter">Cap {i}</div></a></div>'
+WORLD_POPULAR_CARD = '<div class="entry"><a class="thumb" href="https://www.mangaworld.ac/manga/1/p-{i}" title="P{i}"><img src="p{i}.jpg"></a><div class="content"><div class="genre"><a>Manga</a></div><div class="status"><a>Finito</a></div></div></div>'
+
+# (module, class, old parser, new parser, page)
+CASES = [
+	("scanvf", "Scanvf", "_parse_search", "_parse_search", SCANVF_SEARCH),
+	("scanvf", "Scanvf", "_parse_info", "_parse_info", SCANVF_INFO),
+
+	("manganato", "Manganato", "_parse_search", "_parse_search", MANGANATO_SEARCH),
+	("manganato", "Manganato", "_parse_search", "_parse_search", "<html><body>nothing</body></html>"),
+	("manganato", "Manganato", "_parse_info", "_parse_info", MANGANATO_INFO),
+	("manganato", "Manganato", "_parse_pages", "_parse_pages", MANGANATO_PAGES),
+	("manganato", "Manganato", "_parse_latest", "_parse_listing", MANGANATO_LISTING),
+	("manganato", "Manganato", "_parse_newest", "_parse_listing", MANGANATO_LISTING),
+	("manganato", "Manganato", "_parse_hotest", "_parse_listing", MANGANATO_LISTING),
+
+	("asurascans", "Asurascans", "_parse_search", "_parse_search", f'<html><body><div id="content"><div><div class="postbody"><div><div class="listupd">{ASURA_CARDS}</div></div></div></div></div></body></html>'),
+	("asurascans", "Asurascans", "_parse_popular", "_parse_popular", f'<html><body><div id="content"><div><div class="hotslid"><div><div class="listupd popularslider"><div>{ASURA_CARDS}</div></div></div></div></div></div></body></html>'),
+	("asurascans", "Asurascans", "_parse_latest", "_parse_latest", f'<html><body><div id="content"><div><div class="postbody"><div class="bixbox seriesearch"><div class="mrgn"><div class="listupd">{ASURA_CARDS}</div></div></div></div></div></div></body></html>'),
+	("asurascans", "Asurascans", "_parse_genres", "_parse_genres", f'<html><body><div id="content"><div><div><div><div class="listupd">{ASURA_CARDS}</div></div></div></div></div></body></html>'),
+	("asurascans", "Asurascans", "_parse_info", "_parse_info", ASURA_INFO),
+	("asurascans", "Asurascans", "_parse_pages", "_parse_pages", '<html><body><div id="readerarea"><p><img data-src="1.jpg"></p><p><img data-src="2.jpg"></p></div></body></html>'),
+
+	("flamescans", "Flamescans", "_parse_search", "_parse_search", f'<html><body><div class="wrapper"><div class="postbody"><div><div class="listupd">{FLAME_CARDS}</div></div></div></div></body></html>'),
+	("flamescans", "Flamescans", "_parse_sort", "_parse_sort", f'<html><body><div class="wrapper"><div class="postbody"><div class="bixbox seriesearch"><div class="mrgn"><div class="listupd">{FLAME_CARDS}</div></div></div></div></div></body></html>'),
+	("flamescans", "Flamescans", "_parse_info", "_parse_info", FLAME_INFO),
+	("flamescans", "Flamescans", "_parse_pages", "_parse_pages", '<html><body><div id="readerarea"><p><img src="1.jpg"></p></div></body></html>'),
+
+	("mangapill", "Mangapill", "_parse_search", "_parse_search", f'<html><body><div class="container py-3"><div class="my-3 grid justify-end gap-3 grid-cols-2">{PILL_CARDS}</div></div></body></html>'),
+	("mangapill", "Mangapill", "_parse_new", "_parse_new", f'<html><body><div class="container py-3"><div class="grid justify-end gap-3 grid-cols-2">{PILL_CARDS}</div></div></body></html>'),
+	("mangapill", "Mangapill", "_parse_info", "_parse_info", PILL_INFO),
+	("mangapill", "Mangapill", "_parse_pages", "_parse_pages", PILL_PAGES),
+	("mangapill", "Mangapill", "_parse_recent", "_parse_recent", '<html><body><div class="container py-3"><div class="grid grid-cols-2">' + "".join(PILL_RECENT_CARD.format(i=i) for i in range(3)) + "</div></div></body></html>"),
+
+	("mangapark", "Mangapark", "_parse_search", "_parse_search", f'<html><body><div id="app-wrapper"><main><div class="grid gap-5 grid-cols-1 border-t border-t-base-200 pt-5">{PARK_CARDS}</div></main></div></body></html>'),
+	("mangapark", "Mangapark", "_parse_info", "_parse_info", park_info('<div q:key="tz_2"><span>OP</span><span> / </span><span>ワンピース</span></div>')),
+	("mangapark", "Mangapark", "_parse_info", "_parse_info", park_info("")),
+	("mangapark", "Mangapark", "_parse_pages", "_parse_pages", f"<html><head><script>{PARK_OBJS}</script><script>a</script><script>b</script><script>c</script></head><body></body></html>"),
+	("mangapark", "Mangapark", "_parse_latest", "_parse_latest", '<html><body><div id="app-wrapper"><main><div><div class="space-y-5"><div class="grid gap-5 grid-cols-1 border-t border-t-base-200 pt-3">' + "".join(PARK_LATEST_CARD.format(i=i) for i in range(2)) + "</div></div></div></main></div></body></html>"),
+
+	("mangareader", "Mangareader", "_parse_search", "_parse_search", '<html><body><div id="ares"><div><table><tbody>' + "".join(READER_ROW.format(i=i) for i in range(3)) + "</tbody></table></div></div></body></html>"),
+	("mangareader", "Mangareader", "_parse_info", "_parse_info", READER_INFO),
+	("mangareader", "Mangareader", "_parse_pages", "_parse_pages", '<html><body><div id="ib"><div><img data-src="a.jpg"></div><div><img data-src="b.jpg"></div></div></body></html>'),
+	("mangareader", "Mangareader", "_parse_latest", "_parse_latest", '<html><body><div id="main"><div class="d14"><div><div class="d38"><div class="d39"><table><tbody>' + "".join(READER_LATEST_ROW.format(i=i) for i in range(2)) + "</tbody></table></div></div></div></div></div></body></html>"),
+
+	("mangaworld", "Mangaworld", "_parse_search", "_parse_search", '<html><body><div class="container"><div><div><div class="comics-grid">' + "".join(WORLD_CARD.format(i=i) for i in range(3)) + "</div></div></div></div></body></html>"),
+	("mangaworld", "Mangaworld", "_parse_info", "_parse_info", world_info(f'<div><div class="volume-chapters pl-2">{WORLD_CHAPTERS}</div></div>')),
+	("mangaworld", "Mangaworld", "_parse_info", "_parse_info", world_info(WORLD_CHAPTERS)),
+	("mangaworld", "Mangaworld", "_parse_pages", "_parse_pages", '<html><body><div id="page"><img src="1.jpg"><img src="2.jpg"></div></body></html>'),
+	("mangaworld", "Mangaworld", "_parse_trending", "_parse_trending", '<html><body><div id="popular"><div class="row"><div class="col-12"><div class="comics-flex">' + "".join(WORLD_TRENDING_CARD.format(i=i) for i in range(3)) + "</div></div></div></div></body></html>"),
+	("mangaworld", "Mangaworld", "_parse_popular", "_parse_popular", '<html><body><div class="container"><div><div class="col-sm-12 col-md-8 col-xl-9"><div class="comics-grid">' + "".join(WORLD_POPULAR_CARD.format(i=i) for i in range(3)) + "</div></div></div></div></body></html>"),
+]
+
+
+@pytest.mark.parametrize("module, cls, old_parser, new_parser, page", CASES,
+	ids=[f"{case[0]}.{case[2]}" for case in CASES])
+def test_parser_matches_bs4(baseline, module, cls, old_parser, new_parser, page):
+	old = getattr(getattr(baseline(module), cls)(), old_parser)(_response(page))
+	new = getattr(getattr(importlib.import_module(f"src.{module}"), cls)(), new_parser)(_response(page))
+
+	assert new.error is None
+	assert to_builtins(new.results) == _old_results(old["results"])
+
+
+@pytest.mark.parametrize("page", [SCANVF_PAGE, SCANVF_INFO, "<html><body>x</body></html>"])
+def test_scanvf_reader_page_matches_bs4(baseline, page):
+	from src.scanvf import Scanvf
+	assert Scanvf()._parse_page(_response(page)) == baseline("scanvf").Scanvf()._parse_page(_response(page))
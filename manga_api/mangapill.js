@@ -21,8 +21,13 @@ export async function searchMangapill(title, limit = 10) {
     return r.json();
 }
 
-export async function getMangapillManga(mangaUrl) {
-    const url = `${API_BASE}/api/mangapill/manga?url=${encodeURIComponent(mangaUrl)}`;
+// Pass { since } to fetch only chapters newer than that number (update badge),
+// or { offset, limit } to page through the number-sorted chapter list.
+export async function getMangapillManga(mangaUrl, { since, limit, offset } = {}) {
+    let url = `${API_BASE}/api/mangapill/manga?url=${encodeURIComponent(mangaUrl)}`;
+    if (since != null) url += `&since=${encodeURIComponent(since)}`;
+    if (limit != null) url += `&limit=${encodeURIComponent(limit)}`;
+    if (offset != null) url += `&offset=${encodeURIComponent(offset)}`;
     const r = await fetch(url);
     if (!r.ok) {
         const text = await r.text();
@@ -2,10 +2,13 @@ from __future__ import annotations
 import os
 import sys
 import re
+import time
+import bisect
+from collections import OrderedDict
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from fastapi.middleware.cors import CORSMiddleware
 
-from typing import List, Dict
+from typing import List, Dict, Optional
 from urllib.parse import urljoin, urlencode, quote_plus
 
 import httpx
@@ -26,6 +29,13 @@ BROWSER_HEADERS = {
     "Connection": "keep-alive",
 }
 
+# How long a scraped manga page (and its chapter index) is reused before
+# re-fetching. Matches the edge s-maxage on the /manga endpoint.
+CHAPTER_INDEX_TTL = 300
+# Manga pages kept in that cache at once; the least recently used go first.
+CHAPTER_INDEX_SIZE = 256
+CHAPTER_NUM_RE = re.compile(r"chapter[-\s]*(\d+(?:\.\d+)?)", re.IGNORECASE)
+
 class MangapillScraper:
     def __init__(self) -> None:
         self.client = httpx.Client(
@@ -33,6 +43,9 @@ class MangapillScraper:
             timeout=30.0,
             follow_redirects=True,
         )
+        # url -> (fetched_at, manga dict, sorted chapter numbers, sorted chapters),
+        # least recently used first
+        self._chapter_index: "OrderedDict[str, tuple]" = OrderedDict()
 
     # ---- helpers -------------------------------------------------------------
     def _abs(self, href: str) -> str:
@@ -45,6 +58,11 @@ class MangapillScraper:
         r.raise_for_status()
         return BeautifulSoup(r.text, "html.parser")
 
+    @staticmethod
+    def _chapter_number(ch: Dict) -> Optional[float]:
+        m = CHAPTER_NUM_RE.search(ch.get("name") or "") or CHAPTER_NUM_RE.search(ch.get("url") or "")
+        return float(m.group(1)) if m else None
+
     # ---- /search -------------------------------------------------------------
     def search(self, q: str, limit: int = 20) -> List[Dict]:
         url = f"{BASE}/search?{urlencode({'q': q})}"
@@ -106,7 +124,75 @@ class MangapillScraper:
         return results
 
     # ---- /manga?url=... ------------------------------------------------------
-    def get_manga(self, url: str) -> Dict:
+    def get_manga(
+        self,
+        url: str,
+        since: Optional[float] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Dict:
+        """
+        Returns manga info plus its chapter list.
+
+        With no paging arguments the full chapter list comes back in site order,
+        exactly as before. Passing since/limit/offset switches to the cached,
+        number-sorted (ascending) chapter index:
+          - since:  only chapters numbered strictly greater than this
+          - offset/limit: slice of the (filtered) index
+        and adds "total" and "next_offset" (None when there are no more).
+        Chapters whose number can't be parsed come after the numbered ones,
+        in site order, with "number": None; since can't rule them out, so
+        they're always included.
+        """
+        manga, numbers, ordered = self._indexed_manga(url)
+        if since is None and limit is None and not offset:
+            return manga
+
+        start = bisect.bisect_right(numbers, since) if since is not None else 0
+        pool = ordered[start:]
+        offset = max(0, offset)
+        end = len(pool) if limit is None else offset + max(0, limit)
+        page = pool[offset:end]
+
+        return {
+            **manga,
+            "chapters": page,
+            "total": len(pool),
+            "next_offset": end if end < len(pool) else None,
+        }
+
+    def _indexed_manga(self, url: str):
+        """get_manga's scrape, cached for CHAPTER_INDEX_TTL with a number-sorted index."""
+        now = time.monotonic()
+        cached = self._chapter_index.get(url)
+        if cached and now - cached[0] < CHAPTER_INDEX_TTL:
+            self._chapter_index.move_to_end(url)
+            return cached[1:]
+
+        manga = self._scrape_manga(url)
+        keyed = []
+        unnumbered = []
+        for ch in manga["chapters"]:
+            num = self._chapter_number(ch)
+            if num is not None:
+                keyed.append((num, {**ch, "number": num}))
+            else:
+                unnumbered.append({**ch, "number": None})
+        keyed.sort(key=lambda kv: kv[0])
+        numbers = [num for num, _ in keyed]
+        # numbers indexes the numbered prefix, so bisecting on since keeps the tail.
+        ordered = [ch for _, ch in keyed] + unnumbered
+
+        self._chapter_index[url] = (now, manga, numbers, ordered)
+        self._chapter_index.move_to_end(url)
+        # Drop what has expired, then the least recently used past the bound.
+        for key in [k for k, v in self._chapter_index.items() if now - v[0] >= CHAPTER_INDEX_TTL]:
+            del self._chapter_index[key]
+        while len(self._chapter_index) > CHAPTER_INDEX_SIZE:
+            self._chapter_index.popitem(last=False)
+        return manga, numbers, ordered
+
+    def _scrape_manga(self, url: str) -> Dict:
         """
         Accepts an absolute or site-relative URL to a manga page.
         Extracts title, description, tags, cover image, and the list of chapters.